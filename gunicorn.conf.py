@@ -0,0 +1,31 @@
+# Gunicorn sozlamalari. `gunicorn` buyrug'i shu faylni joriy papkadan avtomatik o'qiydi (Procfile).
+#
+# SERVER_MODE=wsgi (sukut bo'yicha) - myproject.wsgi, sinxron workerlar: har bir worker bir vaqtda bitta so'rov.
+# SERVER_MODE=asgi - myproject.asgi, uvicorn workerlari: async viewlar (get_exams_by_group, select_group,
+#   student_exam_list) DB va keshni kutayotganda worker boshqa so'rovlarga xizmat qiladi.
+#
+# Workerlar soni WEB_CONCURRENCY, port PORT muhit o'zgaruvchisidan olinadi (gunicorn o'zi o'qiydi).
+# Ikki rejimni solishtirish: python manage.py bench_server_modes
+#
+# Workerlar keshni bo'lishadi: REDIS_URL berilmagan bo'lsa server ishga tushmaydi (myapp.E001).
+import os
+
+server_mode = os.getenv('SERVER_MODE', 'wsgi')
+
+if server_mode == 'asgi':
+    wsgi_app = 'myproject.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'myproject.wsgi:application'
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+
+
+def on_starting(server):
+    # Jarayon ichidagi kesh bilan har bir worker eskirgan guruhlar va ruxsatlarni ko'rsatadi
+    import django
+    from django.core.management import call_command
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+    django.setup()
+    call_command('check', deploy=True, tags=['caches'], fail_level='ERROR')
@@ -1,7 +1,10 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import FilteredSelectMultiple
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
-from myapp.models import Profile, Video, Group, Payments, Exam, ExamResult, ProfileGroup
+from myapp.membership import set_group_members
+from myapp.models import Profile, Video, Group, Payments, Exam, ExamResult, Job
 from django.urls import reverse
 from django.utils.html import format_html
 CustomUser = get_user_model()
@@ -30,22 +33,38 @@ class VideoAdmin(admin.ModelAdmin):
     filter_horizontal = ('groups',)  # Guruhlarni tanlash uchun filter
 
 
+class GuruhAdminForm(forms.ModelForm):
+    # students ProfileGroup orqali bog'langani uchun admin uni o'zi ko'rsatmaydi
+    members = forms.ModelMultipleChoiceField(
+        queryset=Profile.objects.order_by('familiya', 'ismi', 'id'),
+        required=False,
+        label="Talabalar",
+        widget=FilteredSelectMultiple("Talabalar", is_stacked=False),
+    )
+
+    class Meta:
+        model = Group
+        fields = ('name', 'information')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('members', list(
+                self.instance.students.values_list('id', flat=True)))
+
+
 # Group modelining admin interfeysi
 @admin.register(Group)
 class GuruhAdmin(admin.ModelAdmin):
+    form = GuruhAdminForm
     list_display = ('name', 'created_time')
     search_fields = ('name',)
-    filter_horizontal = ('students',)  # Guruhdagi talabalarni qo'shish/olib tashlash
     ordering = ('-created_time',)
 
     def save_related(self, request, form, formsets, change):
         super().save_related(request, form, formsets, change)
-        group = form.instance
-
-        # Guruhni yangilashda o'quvchilarni ProfileGroup modeliga qo'shish
-        ProfileGroup.objects.filter(group=group).exclude(profile__in=group.students.all()).delete()
-        for student in group.students.all():
-            ProfileGroup.objects.get_or_create(profile=student, group=group)
+        # Guruhdagi talabalarni qo'shish/olib tashlash: faqat farq, bir necha so'rovda
+        set_group_members(form.instance, form.cleaned_data['members'].values_list('id', flat=True))
 
 
 @admin.register(Profile)
@@ -97,6 +116,22 @@ class ExamResultAdmin(admin.ModelAdmin):
     ordering = ('-exam__exam_date',)
 
 
+# Fon vazifalari navbati (run_jobs) - faqat kuzatish uchun
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'subject', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('subject',)
+    ordering = ('-created_at',)
+    exclude = ('result',)
+
+    def get_readonly_fields(self, request, obj=None):
+        return [field.name for field in self.model._meta.fields if field.name != 'result']
+
+    def has_add_permission(self, request):
+        return False
+
+
 
 # CustomUser modelini admin panelga qo'shish
 admin.site.register(CustomUser, CustomUserAdmin)
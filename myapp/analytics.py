@@ -0,0 +1,83 @@
+import numpy as np
+
+from myapp.models import ExamResult
+
+
+class GroupAnalytics:
+    """
+    Bitta guruhning barcha natijalari bo'yicha NumPy massivlarida hisoblangan ko'rsatkichlar.
+    Har bir massiv `students` tartibida: i-element i-talabaga tegishli.
+    """
+
+    def __init__(self, students, counts, sums, latest_scores, latest_positions, group_mean):
+        self.students = students
+        self.counts = counts
+        self.sums = sums
+        self.latest_scores = latest_scores
+        self.latest_positions = latest_positions
+        self.group_mean = group_mean
+
+    def __len__(self):
+        return len(self.students)
+
+    @property
+    def means(self):
+        return self.sums / self.counts
+
+    @property
+    def previous_means(self):
+        # Oxirgi natijadan oldingi o'rtacha; bitta natijasi bor talabalar uchun NaN
+        previous_counts = self.counts - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(previous_counts > 0, (self.sums - self.latest_scores) / previous_counts, np.nan)
+
+    @property
+    def trends(self):
+        # Musbat - oxirgi natija oldingi o'rtachadan yuqori (tavsiyalar, myapp.recommendations)
+        return self.latest_scores - self.previous_means
+
+
+def compute_group_analytics(student_ids, scores):
+    """
+    Xronologik tartibdagi (student_id, score) ustunlaridan guruh ko'rsatkichlarini hisoblaydi.
+    Python sikllari ishlatilmaydi - hammasi massiv amallari bilan.
+    """
+    student_ids = np.asarray(student_ids, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.int64)
+
+    if not len(scores):
+        empty = np.empty(0, dtype=np.int64)
+        return GroupAnalytics(empty, empty, empty, empty, empty, None)
+
+    # Barqaror saralash har bir talaba ichidagi xronologik tartibni saqlaydi
+    order = np.argsort(student_ids, kind='stable')
+    sorted_scores = scores[order]
+    students, first_index, counts = np.unique(student_ids[order], return_index=True, return_counts=True)
+    last_index = first_index + counts - 1
+
+    return GroupAnalytics(
+        students=students,
+        counts=counts,
+        sums=np.add.reduceat(sorted_scores, first_index),
+        latest_scores=sorted_scores[last_index],
+        latest_positions=order[last_index],
+        group_mean=float(scores.mean()),
+    )
+
+
+def load_group_results(group_id):
+    """Guruh natijalarini imtihon sanasi bo'yicha tartiblangan ustunlar sifatida oladi."""
+    rows = list(ExamResult.objects.filter(
+        exam__group_id=group_id, score__isnull=False
+    ).order_by('exam__exam_date', 'exam_id').values_list('student_id', 'score', 'exam__exam_date'))
+
+    student_ids, scores, exam_dates = zip(*rows) if rows else ((), (), ())
+    return np.array(student_ids, dtype=np.int64), np.array(scores, dtype=np.int64), exam_dates
+
+
+def load_group_analytics(group_id):
+    """Guruh ko'rsatkichlari va har bir talabaning so'nggi imtihon sanasi."""
+    student_ids, scores, exam_dates = load_group_results(group_id)
+    analytics = compute_group_analytics(student_ids, scores)
+    latest_dates = [exam_dates[position] for position in analytics.latest_positions.tolist()]
+    return analytics, latest_dates
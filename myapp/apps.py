@@ -5,4 +5,5 @@ class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
 
-
+    def ready(self):
+        from myapp import checks, signals  # noqa: F401
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Jarayon ichidagi backendlar: bump_namespace faqat yozuvni bajargan worker keshini bekor qiladi
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def is_shared_cache(alias='default'):
+    """Kesh barcha worker jarayonlari uchun umumiymi (Redis, Memcached, fayl, DB)."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def namespace_version(namespace):
+    """Nom maydoni (namespace) ning joriy versiyasi. Versiya o'zgarsa, eski kalitlar ishlatilmay qoladi."""
+    key = f'ns:{namespace}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_namespace(namespace):
+    """Nom maydonidagi barcha kesh yozuvlarini bekor qiladi."""
+    key = f'ns:{namespace}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def cache_key(namespace, *parts):
+    return ':'.join([namespace, str(namespace_version(namespace)), *map(str, parts)])
@@ -0,0 +1,160 @@
+import base64
+import io
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from myapp.models import ExamResult, GroupStudentSummary
+
+
+class ChartCache:
+    """
+    Tayyor grafiklar uchun jarayon ichidagi LRU kesh.
+    Yozuvlar soni va umumiy hajmi bo'yicha chegaralangan.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = self._entry_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entry_size(self._entries.pop(key))
+            self._entries[key] = value
+            self._size += size
+            # Eng uzoq ishlatilmagan yozuvlarni chiqarib tashlash
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= self._entry_size(evicted)
+
+    def invalidate_group(self, group_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == group_id]:
+                self._size -= self._entry_size(self._entries.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @staticmethod
+    def _entry_size(value):
+        return sum(len(item) for item in value)
+
+
+chart_cache = ChartCache(
+    max_entries=getattr(settings, 'CHART_CACHE_MAX_ENTRIES', 256),
+    max_bytes=getattr(settings, 'CHART_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+)
+
+
+def _new_figure():
+    # matplotlib og'ir kutubxona - faqat birinchi grafik chizilganda yuklanadi
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 6))
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _figure_to_base64(fig):
+    """Figure ni PNG ga aylantiradi. pyplot ishlatilmaydi, shuning uchun figure xotirada qolmaydi."""
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format='png')
+        return base64.b64encode(buf.getvalue()).decode('utf-8')
+    finally:
+        buf.close()
+        fig.clear()
+
+
+def render_student_chart(student_scores):
+    # Grafik 1: Talabaning individual natijalari
+    fig = _new_figure()
+    ax = fig.subplots()
+    ax.plot(range(1, len(student_scores) + 1), student_scores, marker='o', color='#1D2D5B', label='Natijalar')
+    ax.set_title("Sizning imtihon natijalaringiz")
+    ax.set_xlabel("Imtihonlar")
+    ax.set_ylabel("Natija")
+    ax.legend()
+    return _figure_to_base64(fig)
+
+
+def render_group_chart(last_exam_results, student_id):
+    # Grafik 2: Guruhdagi barcha talabalarning eng so‘nggi imtihon natijalari
+    sorted_students = sorted(last_exam_results.keys())  # Talabalarni ID bo‘yicha saralash
+    sorted_scores = [last_exam_results[sid] for sid in sorted_students]
+
+    fig = _new_figure()
+    ax = fig.subplots()
+    ax.bar(range(len(sorted_students)), sorted_scores, color='#1D2D5B', label='Talabalar natijalari')
+
+    # Foydalanuvchining natijasi
+    if student_id in last_exam_results:
+        user_index = sorted_students.index(student_id)
+        ax.scatter(user_index, last_exam_results[student_id], color='red', s=100, label="Sizning natijangiz")
+
+    ax.set_title("Tanlagan guruhingizdagi barcha talabalarning eng so‘nggi imtihon natijalari")
+    ax.set_xlabel("Talabalar")
+    ax.set_ylabel("Natija")
+    ax.legend()
+    return _figure_to_base64(fig)
+
+
+def load_chart_data(group_id, student_id):
+    # Faqat talabaning o'z natijalari va guruhdagi so'nggi natijalar
+    student_scores = list(ExamResult.objects.filter(
+        exam__group_id=group_id, student_id=student_id, score__isnull=False
+    ).order_by('exam__exam_date').values_list('score', flat=True))
+    last_exam_results = dict(
+        GroupStudentSummary.objects.filter(group_id=group_id).values_list('student_id', 'latest_score')
+    )
+    return student_scores, last_exam_results
+
+
+def encode_charts(charts):
+    return json.dumps(list(charts)).encode()
+
+
+def decode_charts(data):
+    return tuple(json.loads(bytes(data)))
+
+
+def get_recommendation_charts(group_id, student_id, version, requested_by=None):
+    """
+    (guruh, talaba, natijalar versiyasi) bo'yicha grafiklar. Chizish fon vazifasida (myapp.jobs):
+    jarayon keshi -> shu versiyaning tayyor natijasi -> navbatga qo'yib, oxirgi tayyor (eskiroq) natija.
+    (grafiklar yoki None, kutilayotgan Job yoki None) qaytaradi.
+    """
+    from myapp.jobs import enqueue, finished_job
+
+    key = (group_id, student_id, version)
+    charts = chart_cache.get(key)
+    if charts is not None:
+        return charts, None
+
+    subject = f'group:{group_id}:student:{student_id}'
+    latest = finished_job('recommendation_charts', subject)
+    if latest is not None and latest.version == str(version):
+        charts = decode_charts(latest.result)
+        chart_cache.set(key, charts)
+        return charts, None
+
+    job = enqueue('recommendation_charts', subject, {'group_id': group_id, 'student_id': student_id},
+                  version=str(version), requested_by=requested_by)
+    return (decode_charts(latest.result) if latest else None), job
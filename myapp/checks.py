@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from myapp.caching import is_shared_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Kesh bekor qilish (bump_namespace) guruhlar ro'yxati, bosh sahifa, video lentasi va profil keshlari
+    uchun barcha workerlarga yetib borishi kerak - jarayon ichidagi kesh bilan ular TTL gacha eskiradi.
+    """
+    if settings.DEBUG or is_shared_cache():
+        return []
+    return [Error(
+        "Productionda jarayon ichidagi kesh (LocMemCache) ishlatilmoqda: kesh bekor qilish faqat "
+        "yozuvni bajargan workerga ta'sir qiladi.",
+        hint="REDIS_URL muhit o'zgaruvchisini bering (umumiy Redis kesh).",
+        id='myapp.E001',
+    )]
@@ -0,0 +1,75 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def _validators(request, state_func, args, kwargs):
+    """(ETag, Last-Modified soniyalarda) juftligi; xavfsiz bo'lmagan metodlar uchun (None, None)."""
+    if request.method not in ('GET', 'HEAD'):
+        return None, None
+    # Navbatdagi flash xabarlar (messages) faqat to'liq sahifada ko'rsatiladi - 304 ularni yo'qotardi.
+    # len() xabarlarni "o'qilgan" deb belgilamaydi
+    if len(messages.get_messages(request)):
+        return None, None
+    parts, last_modified = state_func(request, *args, **kwargs)
+
+    profile = request.profile
+    digest = hashlib.md5(repr((
+        # Sahifa foydalanuvchiga xos: sessiya, sidebar dagi profil va statik fayllar versiyasi.
+        # CSRF token cookie da (CSRF_USE_SESSIONS o'chiq); u login da almashadi, sessiya kaliti ham shunda
+        request.session.session_key,
+        (profile.id, profile.ismi, profile.familiya, profile.rasm_small.name) if profile else None,
+        getattr(staticfiles_storage, 'manifest_hash', ''),
+        request.get_full_path(),
+        *parts,
+    )).encode()).hexdigest()
+    return quote_etag(digest), int(last_modified.timestamp()) if last_modified else None
+
+
+def _finish(response, etag, last_modified):
+    if etag is None:
+        return response
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        # Brauzer har safar tekshiradi (If-None-Match), o'zgarmagan bo'lsa 304 oladi
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(state_func):
+    """
+    django.views.decorators.http.condition kabi, lekin ETag va Last-Modified bitta
+    state_func(request, *args, **kwargs) -> (qismlar, last_modified) chaqiruvidan (bitta kichik
+    so'rov) olinadi va async viewlarda ham ishlaydi. Sahifa o'zgarmagan bo'lsa view chaqirilmaydi (304).
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                etag, last_modified = await sync_to_async(_validators)(request, state_func, args, kwargs)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified)
+        else:
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                etag, last_modified = _validators(request, state_func, args, kwargs)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified)
+        return inner
+    return decorator
+
+
+def latest(*values):
+    """None bo'lmagan vaqtlar ichidagi eng kechkisi (hech biri bo'lmasa None)."""
+    return max((value for value in values if value is not None), default=None)
@@ -1,15 +1,25 @@
+import json
 from datetime import datetime
 
-from django.db.models import Prefetch
+from asgiref.sync import sync_to_async
+from django.db.models import Count, FilteredRelation, Max, Prefetch, Q
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.utils import timezone
+from django.views.decorators.http import require_POST
 
 from myapp.models import Group, Exam, Profile, ExamResult
 from django.db.models import OuterRef, Subquery
 
+from myapp.caching import namespace_version
+from myapp.conditional import conditional_page, latest
+from myapp.pagination import paginate
+from myapp.search import search_profiles
+from myapp.grade_import import GradeImportError, import_scores
+from myapp.grading import group_roster, validate_scores, save_exam_scores
+
 from myapp.views import is_teacher
 
 
@@ -56,14 +66,27 @@ def create_exam(request):
 @user_passes_test(is_teacher)
 def teacher_exams(request):
     # Faqat o'qituvchi tomonidan yaratilgan imtihonlarni olish
-    exams = Exam.objects.filter(created_by=request.user).order_by('-created_at')
+    exams = Exam.objects.filter(created_by=request.user).select_related('group').order_by('-created_at')
     return render(request, 'teacher_exams.html', {'exams': exams})
 
 
+def _student_exam_list_state(request):
+    # Guruhlar imtihonlari va talabaning o'z natijalari bitta so'rovda (LEFT JOIN faqat o'z natijasiga)
+    group_ids = request.group_ids
+    state = Exam.objects.filter(group_id__in=group_ids).annotate(
+        own_result=FilteredRelation('results', condition=Q(results__student=request.profile)),
+    ).aggregate(
+        exams=Count('id'), exams_updated=Max('updated_at'),
+        results=Count('own_result'), results_updated=Max('own_result__updated_at'),
+    ) if group_ids else {}
+    updated = latest(state.get('exams_updated'), state.get('results_updated'))
+    return (sorted(group_ids), *state.values(), namespace_version('groups')), updated
+
+
 @login_required
-def student_exam_list(request):
-    user_profile = Profile.objects.get(user=request.user)
-    user_groups = Group.objects.filter(students=user_profile)
+@conditional_page(_student_exam_list_state)
+async def student_exam_list(request):
+    user_profile = await request.aprofile()
 
     # Har bir imtihon uchun o'quvchining natijasini olish
     results_subquery = ExamResult.objects.filter(
@@ -71,31 +94,32 @@ def student_exam_list(request):
         student=user_profile
     ).values('score')[:1]
 
-    exams = Exam.objects.filter(group__in=user_groups).annotate(
+    exams = Exam.objects.filter(group_id__in=await request.agroup_ids()).select_related('group').annotate(
         student_score=Subquery(results_subquery)
     ).order_by('group__name', '-exam_date')
 
     # Imtihonlarni guruhlash
     grouped_exams = {}
-    for exam in exams:
+    async for exam in exams:
         group_name = exam.group.name
         if group_name not in grouped_exams:
             grouped_exams[group_name] = []
         grouped_exams[group_name].append(exam)
 
-    return render(request, 'student_exam_list.html', {
+    return await sync_to_async(render)(request, 'student_exam_list.html', {
         'grouped_exams': grouped_exams,
         'user_profile': user_profile
     })
 
 
 @user_passes_test(is_teacher)
-def get_exams_by_group(request):
+async def get_exams_by_group(request):
+    # exam_evaluation sahifasi har guruh tanlanganda chaqiradi - async, workerni band qilmaydi
     group_id = request.GET.get('group_id')  # Guruh ID so'rovdan olinadi
-    exams = Exam.objects.filter(group_id=group_id)
+    exams = Exam.objects.filter(group_id=group_id).values_list('id', 'exam_date')
     exam_data = [
-        {'id': exam.id, 'exam_date': exam.exam_date.strftime('%Y-%m-%d %H:%M')}
-        for exam in exams
+        {'id': exam_id, 'exam_date': exam_date.strftime('%Y-%m-%d %H:%M')}
+        async for exam_id, exam_date in exams
     ]
     return JsonResponse(exam_data, safe=False)
 
@@ -120,26 +144,17 @@ def exam_evaluation(request):
 
 @user_passes_test(is_teacher)
 def exam_results(request, exam_id, group_id):
-    # Tanlangan imtihon va guruhni olish
-    exam = get_object_or_404(Exam, id=exam_id)
+    # Tanlangan imtihon va guruhni olish; imtihon boshqa guruhniki bo'lsa 404
     group = get_object_or_404(Group, id=group_id)
+    exam = get_object_or_404(Exam, id=exam_id, group=group)
 
     search_query = request.GET.get('search', '')
 
     # Guruhdagi o'quvchilarni olish
-    students = Profile.objects.filter(
-        profile_group=group,
-        user__is_staff=False,
-        user__is_superuser=False,
-        user__is_active=True
-    )
+    students = group_roster(group)
 
     if search_query:
-        students = students.filter(
-            familiya__icontains=search_query
-        ) | students.filter(
-            ismi__icontains=search_query
-        )
+        students = search_profiles(students, search_query)
 
     students = students.prefetch_related(
         Prefetch(
@@ -150,18 +165,23 @@ def exam_results(request, exam_id, group_id):
     )
 
     if request.method == "POST":
-        # Barcha natijalarni bir martalik so‘rov bilan olish
-        existing_results = {r.student_id: r for r in ExamResult.objects.filter(exam=exam)}
-
-        for student in students:
-            score = request.POST.get(f'student_{student.id}')  # Talabaning natijasi
-            if score:
-                score = int(score)  # Ballni integer ko‘rinishga keltirish
-                if student.id in existing_results:
-                    existing_results[student.id].score = score
-                    existing_results[student.id].save()
-                else:
-                    ExamResult.objects.create(exam=exam, student=student, score=score)
+        raw_scores = {
+            student_id: request.POST.get(f'student_{student_id}')
+            for student_id in students.values_list('id', flat=True)
+        }
+        scores, errors = validate_scores(exam, raw_scores, raw_scores.keys())
+
+        if errors:
+            # Xato bo'lsa hech narsa saqlanmaydi
+            messages.error(
+                request,
+                f"Natijalar saqlanmadi: {len(errors)} ta ball noto'g'ri (0 - {exam.max_score} oralig'ida bo'lishi kerak).",
+                extra_tags='exam_message'
+            )
+            return redirect(request.get_full_path())
+
+        # Barcha ballar bitta tranzaksiyada saqlanadi
+        save_exam_scores(exam, scores)
 
         return redirect('exam_results_table', exam_id=exam.id)
 
@@ -173,6 +193,61 @@ def exam_results(request, exam_id, group_id):
     })
 
 
+@user_passes_test(is_teacher)
+@require_POST
+def exam_results_json(request, exam_id, group_id):
+    """
+    Butun baholash varag'ini bitta so'rovda qabul qiladi.
+    So'rov tanasi: {"scores": {"<student_id>": ball, ...}}
+    """
+    # Ballar imtihon guruhi ro'yxati bo'yicha tekshiriladi: boshqa guruh bilan so'rov 404
+    group = get_object_or_404(Group, id=group_id)
+    exam = get_object_or_404(Exam, id=exam_id, group=group)
+
+    try:
+        payload = json.loads(request.body)
+        raw_scores = {int(student_id): score for student_id, score in payload['scores'].items()}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({'error': "So'rov formati noto'g'ri."}, status=400)
+
+    scores, errors = validate_scores(exam, raw_scores, group_roster(group).values_list('id', flat=True))
+    if errors:
+        return JsonResponse({'saved': 0, 'errors': errors}, status=400)
+
+    saved = save_exam_scores(exam, scores)
+    return JsonResponse({'saved': saved, 'errors': []})
+
+
+# Import hisobotida sahifada ko'rsatiladigan xatolar soni
+MAX_REPORTED_IMPORT_ERRORS = 20
+
+
+@user_passes_test(is_teacher)
+@require_POST
+def import_exam_scores(request, exam_id):
+    """Imtihon ballarini CSV yoki XLSX jadvaldan yuklaydi va natijani baholash sahifasida ko'rsatadi."""
+    exam = get_object_or_404(Exam.objects.select_related('group'), id=exam_id)
+    uploaded_file = request.FILES.get('file')
+
+    if uploaded_file is None:
+        messages.error(request, "Fayl tanlanmadi.", extra_tags='import_message')
+    else:
+        try:
+            report = import_scores(exam, uploaded_file)
+        except GradeImportError as e:
+            messages.error(request, f"Fayl yuklanmadi: {e}", extra_tags='import_message')
+        else:
+            messages.success(request, f"{report['saved']} ta ball saqlandi.", extra_tags='import_message')
+            errors = report['errors']
+            for error in errors[:MAX_REPORTED_IMPORT_ERRORS]:
+                messages.warning(request, f"{error['row']}-qator: {error['error']}", extra_tags='import_message')
+            if len(errors) > MAX_REPORTED_IMPORT_ERRORS:
+                messages.warning(request, f"... va yana {len(errors) - MAX_REPORTED_IMPORT_ERRORS} ta xato.",
+                                 extra_tags='import_message')
+
+    return redirect('exam_results', exam_id=exam.id, group_id=exam.group_id)
+
+
 @user_passes_test(is_teacher)
 def exam_results_table(request, exam_id):
     # Tanlangan imtihonni olish
@@ -188,16 +263,16 @@ def exam_results_table(request, exam_id):
     ).select_related('student')
 
     # Qidiruv (ismi yoki familiya bo‘yicha)
+    ordering = ('student__familiya', 'student__ismi', 'id')
     if search_query:
-        results = results.filter(
-            student__familiya__icontains=search_query
-        ) | results.filter(
-            student__ismi__icontains=search_query
-        )
+        results = search_profiles(results, search_query, prefix='student__')
+        ordering = ('-search_rank',) + ordering
 
+    page = paginate(request, results, ordering)
     return render(request, 'exam_results_table.html', {
         'exam': exam,
-        'results': results,
+        'results': page,
+        'page': page,
         'search_query': search_query  # Qidiruv shablonga yuboriladi
     })
 
@@ -222,8 +297,8 @@ def all_exam_results(request):
 
 @user_passes_test(is_teacher)
 def exams_list(request, exam_id, group_id):
-    exam = get_object_or_404(Exam, id=exam_id)
     group = get_object_or_404(Group, id=group_id)
+    exam = get_object_or_404(Exam, id=exam_id, group=group)
 
     search_query = request.GET.get('search', '').strip()
 
@@ -236,16 +311,13 @@ def exams_list(request, exam_id, group_id):
     )
 
     if search_query:
-        students = students.filter(
-            familiya__icontains=search_query
-        ) | students.filter(
-            ismi__icontains=search_query
-        )
+        students = search_profiles(students, search_query)
 
     students = students.prefetch_related(
         Prefetch(
             'exam_results',
-            queryset=ExamResult.objects.filter(exam=exam).only('score'),
+            # student_id prefetch uchun kerak: aks holda har bir natija uchun alohida so'rov bo'ladi
+            queryset=ExamResult.objects.filter(exam=exam).only('student_id', 'score'),
             to_attr='results'
         )
     )
@@ -1,11 +1,11 @@
 from django import template
 
+from myapp.youtube import parse_youtube_id
+
 register = template.Library()
 
 
 @register.filter
 def youtube_id(value):
-    """YouTube havolasidan video ID ni ajratib oladi."""
-    if "=" in value:
-        return value.split('=')[-1]
-    return value
+    """YouTube havolasidan video ID ni ajratib oladi (Video.save bilan bir xil qoidalar)."""
+    return parse_youtube_id(value)
@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from myapp.caching import namespace_version
+from myapp.models import Exam, ExamResult, Payments, ProfileGroup
+from myapp.videos import video_feed
+
+
+DASHBOARD_TIMEOUT = 15 * 60
+DASHBOARD_EXAMS = 5
+DASHBOARD_VIDEOS = 6
+
+
+def _dashboard_keys(profile_ids):
+    # Nom maydoni versiyasi bir marta o'qiladi (guruh a'zolari uchun ko'p kalit bo'lishi mumkin)
+    version = namespace_version('dashboard')
+    return [f'dashboard:{version}:{profile_id}' for profile_id in profile_ids]
+
+
+def invalidate_dashboards(profile_ids):
+    """Berilgan talabalarning keshlangan bosh sahifa ma'lumotlarini o'chiradi."""
+    profile_ids = [profile_id for profile_id in profile_ids if profile_id]
+    if profile_ids:
+        cache.delete_many(_dashboard_keys(profile_ids))
+
+
+def invalidate_group_dashboards(group_id):
+    invalidate_dashboards(ProfileGroup.objects.filter(group_id=group_id).values_list('profile_id', flat=True))
+
+
+def build_dashboard(profile, group_ids):
+    """
+    Talaba bosh sahifasi: guruhlar, yaqinlashayotgan va so'nggi imtihonlar (ball bilan), qarzdorlik.
+    Ma'lumot hajmidan qat'i nazar ko'pi bilan 4 ta so'rov.
+    """
+    now = timezone.now()
+    groups = list(ProfileGroup.objects.filter(profile=profile).order_by('group__name').values(
+        'group_id', 'added_time', name=F('group__name'),
+    ))
+
+    upcoming = recent = []
+    if group_ids:
+        exams = Exam.objects.filter(group_id__in=group_ids).annotate(
+            group_name=F('group__name'),
+            score=Subquery(ExamResult.objects.filter(exam=OuterRef('pk'), student=profile).values('score')[:1]),
+        ).values('id', 'group_name', 'exam_date', 'question_count', 'max_score', 'teacher_name', 'score')
+        upcoming = list(exams.filter(exam_date__gt=now).order_by('exam_date', 'id')[:DASHBOARD_EXAMS])
+        recent = list(exams.filter(exam_date__lte=now).order_by('-exam_date', '-id')[:DASHBOARD_EXAMS])
+
+    debts = list(Payments.objects.filter(names_ful=profile).values('month').annotate(
+        debt=Sum('money_summ') - Sum('amount_paid'),
+    ).filter(debt__gt=0).order_by('-debt', 'month'))
+
+    return {
+        'groups': groups,
+        'upcoming_exams': upcoming,
+        'recent_exams': recent,
+        'debts': debts,
+        'balance': sum((row['debt'] for row in debts), Decimal('0')),
+    }
+
+
+def student_dashboard(profile, group_ids):
+    """
+    build_dashboard natijasi (talaba bo'yicha keshlangan) va eng yangi videolar (video_feed keshidan).
+    Kesh to'lov, baho, imtihon va a'zolik o'zgarganda bekor qilinadi (myapp.signals).
+    """
+    key = _dashboard_keys([profile.id])[0]
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = build_dashboard(profile, group_ids)
+        cache.set(key, dashboard, DASHBOARD_TIMEOUT)
+
+    # Keshlangandan keyin boshlangan imtihonlar "so'nggi" imtihonlarga o'tadi
+    now = timezone.now()
+    started = [exam for exam in dashboard['upcoming_exams'] if exam['exam_date'] <= now]
+    if started:
+        dashboard = dict(
+            dashboard,
+            upcoming_exams=dashboard['upcoming_exams'][len(started):],
+            recent_exams=(started[::-1] + dashboard['recent_exams'])[:DASHBOARD_EXAMS],
+        )
+
+    videos = [
+        {'id': video.id, 'title': video.title, 'youtube_id': video.youtube_id, 'created_time': video.created_time}
+        for video in video_feed(group_ids)[:DASHBOARD_VIDEOS]
+    ]
+    return dict(dashboard, videos=videos)
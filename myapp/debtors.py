@@ -0,0 +1,77 @@
+import csv
+
+from django.db.models import Sum, F
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.contrib.auth.decorators import user_passes_test
+
+from myapp.models import Payments
+from myapp.views import is_teacher
+
+
+MONTHS = [choice for choice, _ in Payments._meta.get_field('month').choices]
+
+
+def _payments(month=None):
+    payments = Payments.objects.filter(names_ful__isnull=False)
+    if month:
+        payments = payments.filter(month=month)
+    return payments
+
+
+def student_debts(month=None):
+    """Har bir talaba uchun SUM(money_summ) - SUM(amount_paid), bitta guruhlangan so'rovda."""
+    return _payments(month).values(
+        'names_ful', 'names_ful__familiya', 'names_ful__ismi'
+    ).annotate(
+        total_due=Sum('money_summ'),
+        total_paid=Sum('amount_paid'),
+        debt=Sum('money_summ') - Sum('amount_paid'),
+    ).filter(debt__gt=0).order_by('-debt', 'names_ful__familiya', 'names_ful__ismi')
+
+
+def group_debts(month=None):
+    """
+    Guruhlar bo'yicha qarzdorlik (ProfileGroup orqali), bitta guruhlangan so'rovda.
+    Bir nechta guruhdagi talabaning qarzi har bir guruhida hisoblanadi.
+    """
+    return _payments(month).filter(names_ful__profilegroup__isnull=False).values(
+        group_id=F('names_ful__profilegroup__group'),
+        group_name=F('names_ful__profilegroup__group__name'),
+    ).annotate(
+        total_due=Sum('money_summ'),
+        total_paid=Sum('amount_paid'),
+        debt=Sum('money_summ') - Sum('amount_paid'),
+    ).filter(debt__gt=0).order_by('-debt', 'group_name')
+
+
+def _debtors_csv(students, month):
+    response = HttpResponse(content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="qarzdorlar_{month or "barcha_oylar"}.csv"'
+    response.write('\ufeff')  # Excel UTF-8 ni to'g'ri o'qishi uchun
+    writer = csv.writer(response)
+    writer.writerow(['Familiya', 'Ism', "To'lanadigan summa", "To'langan summa", 'Qarz'])
+    for row in students:
+        writer.writerow([
+            row['names_ful__familiya'], row['names_ful__ismi'], row['total_due'], row['total_paid'], row['debt'],
+        ])
+    return response
+
+
+@user_passes_test(is_teacher)
+def debtors_report(request):
+    month = request.GET.get('month', '')
+    if month not in MONTHS:
+        month = ''
+
+    students = student_debts(month)
+
+    if request.GET.get('format') == 'csv':
+        return _debtors_csv(students, month)
+
+    return render(request, 'debtors_report.html', {
+        'students': students,
+        'groups': group_debts(month),
+        'months': MONTHS,
+        'selected_month': month,
+    })
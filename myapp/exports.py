@@ -0,0 +1,178 @@
+import csv
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import user_passes_test
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+from myapp.debtors import MONTHS
+from myapp.models import ExamResult, Payments, ProfileGroup
+from myapp.views import is_teacher
+
+
+# Bazadan bir martada o'qiladigan qatorlar soni; javob ham shu hajmdagi bo'laklarda yuboriladi
+EXPORT_CHUNK_SIZE = 2000
+
+
+class ExportFilterError(ValueError):
+    pass
+
+
+class _Echo:
+    """csv.writer uchun psevdo-bufer: yozilgan qatorni saqlamasdan qaytaradi."""
+
+    def write(self, value):
+        return value
+
+
+def _export_filters(request):
+    """GET dan guruh, sana oralig'i (YYYY-MM-DD) va oy filtrlarini o'qiydi."""
+    filters = {'group_id': None, 'date_from': None, 'date_to': None, 'month': ''}
+
+    group_id = request.GET.get('group', '')
+    if group_id:
+        if not group_id.isdigit():
+            raise ExportFilterError("Guruh ID noto'g'ri.")
+        filters['group_id'] = int(group_id)
+
+    for name in ('date_from', 'date_to'):
+        value = request.GET.get(name, '')
+        if value:
+            try:
+                filters[name] = parse_date(value)
+            except ValueError:
+                filters[name] = None
+            if filters[name] is None:
+                raise ExportFilterError("Sana YYYY-MM-DD formatida bo'lishi kerak.")
+
+    month = request.GET.get('month', '')
+    if month and month not in MONTHS:
+        raise ExportFilterError("Oy noto'g'ri.")
+    filters['month'] = month
+    return filters
+
+
+def _csv_chunks(header, rows, format_row):
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(header)  # Excel UTF-8 ni to'g'ri o'qishi uchun
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        yield ''.join(writer.writerow(format_row(row)) for row in chunk)
+
+
+async def _acsv_chunks(header, rows, format_row):
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(header)
+    # QuerySet.aiterator() values_list bilan so'rovni async oqimning o'zida bajaradi (Django 5.1),
+    # shuning uchun sinxron iterator bo'laklari sync_to_async orqali, bitta oqimda o'qiladi
+    next_chunk = sync_to_async(lambda: list(islice(rows, EXPORT_CHUNK_SIZE)))
+    while chunk := await next_chunk():
+        yield ''.join(writer.writerow(format_row(row)) for row in chunk)
+
+
+def _streaming_csv(request, filename, header, queryset, format_row):
+    """
+    CSV ni bo'laklab yuboradi: qatorlar .iterator(chunk_size) bilan o'qiladi (PostgreSQL da server
+    tomonidagi kursor), shuning uchun xotira eksport hajmiga bog'liq emas.
+    Django sinxron iteratorni ASGI da (asinxronni WSGI da) avval to'liq ro'yxatga yig'adi,
+    shuning uchun server rejimiga mos iterator beriladi.
+    """
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if isinstance(request, ASGIRequest):
+        chunks = _acsv_chunks(header, rows, format_row)
+    else:
+        chunks = _csv_chunks(header, rows, format_row)
+    response = StreamingHttpResponse(chunks, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _filename(prefix, filters):
+    parts = [prefix]
+    if filters['group_id']:
+        parts.append(f"guruh{filters['group_id']}")
+    if filters['month']:
+        parts.append(filters['month'])
+    if filters['date_from'] or filters['date_to']:
+        parts.append(f"{filters['date_from'] or ''}_{filters['date_to'] or ''}")
+    return '_'.join(parts) + '.csv'
+
+
+def exam_results_export_rows(filters):
+    """Imtihon natijalari, imtihon, guruh va o'quvchi bilan birlashtirilgan tekis qatorlar (values_list)."""
+    results = ExamResult.objects.all()
+    if filters['group_id']:
+        results = results.filter(exam__group_id=filters['group_id'])
+    # __date o'rniga oraliq: exam_date ustunidagi indeksdan foydalanish mumkin
+    if filters['date_from']:
+        results = results.filter(exam__exam_date__gte=datetime.combine(filters['date_from'], time.min))
+    if filters['date_to']:
+        results = results.filter(exam__exam_date__lt=datetime.combine(filters['date_to'] + timedelta(days=1), time.min))
+    return results.order_by('exam__exam_date', 'exam_id', 'student__familiya', 'student__ismi', 'id').values_list(
+        'exam_id', 'exam__exam_date', 'exam__group__name', 'exam__teacher_name', 'exam__max_score',
+        'student_id', 'student__familiya', 'student__ismi', 'score',
+    )
+
+
+def payments_export_rows(filters):
+    """To'lovlar va to'lovchi o'quvchi (values_list). Guruh filtri ProfileGroup orqali, takrorlarsiz."""
+    payments = Payments.objects.all()
+    if filters['group_id']:
+        payments = payments.filter(names_ful__in=ProfileGroup.objects.filter(
+            group_id=filters['group_id']).values('profile_id'))
+    if filters['month']:
+        payments = payments.filter(month=filters['month'])
+    if filters['date_from']:
+        payments = payments.filter(payment_date__gte=filters['date_from'])
+    if filters['date_to']:
+        payments = payments.filter(payment_date__lte=filters['date_to'])
+    return payments.order_by('names_ful__familiya', 'names_ful__ismi', 'names_ful_id', 'id').values_list(
+        'id', 'names_ful_id', 'names_ful__familiya', 'names_ful__ismi', 'month',
+        'money_summ', 'amount_paid', 'payment_date',
+    )
+
+
+def _exam_result_row(row):
+    exam_id, exam_date, group_name, teacher_name, max_score, student_id, familiya, ismi, score = row
+    return [exam_id, exam_date.strftime('%Y-%m-%d %H:%M'), group_name, teacher_name, max_score,
+            student_id, familiya, ismi, '' if score is None else score]
+
+
+def _payment_row(row):
+    payment_id, student_id, familiya, ismi, month, money_summ, amount_paid, payment_date = row
+    return [payment_id, student_id or '', familiya or '', ismi or '', month, money_summ, amount_paid,
+            money_summ - amount_paid, payment_date.isoformat() if payment_date else '']
+
+
+@user_passes_test(is_teacher)
+def export_exam_results(request):
+    """Barcha imtihon natijalari CSV (filtrlar: group, date_from, date_to)."""
+    try:
+        filters = _export_filters(request)
+    except ExportFilterError as e:
+        return HttpResponseBadRequest(str(e), content_type='text/plain; charset=utf-8')
+
+    return _streaming_csv(
+        request, _filename('imtihon_natijalari', filters),
+        ['Imtihon ID', 'Imtihon sanasi', 'Guruh', "O'qituvchi", 'Maksimal ball',
+         "O'quvchi ID", 'Familiya', 'Ism', 'Ball'],
+        exam_results_export_rows(filters), _exam_result_row,
+    )
+
+
+@user_passes_test(is_teacher)
+def export_payments(request):
+    """Barcha to'lovlar CSV (filtrlar: group, month, date_from, date_to - to'lov sanasi bo'yicha)."""
+    try:
+        filters = _export_filters(request)
+    except ExportFilterError as e:
+        return HttpResponseBadRequest(str(e), content_type='text/plain; charset=utf-8')
+
+    return _streaming_csv(
+        request, _filename('tolovlar', filters),
+        ["To'lov ID", "O'quvchi ID", 'Familiya', 'Ism', 'Oy', "To'lanadigan summa", "To'langan summa",
+         'Qarz', "To'lov sanasi"],
+        payments_export_rows(filters), _payment_row,
+    )
@@ -0,0 +1,271 @@
+import codecs
+import csv
+import itertools
+import re
+import zipfile
+from xml.etree.ElementTree import ParseError, fromstring, iterparse
+
+from myapp.grading import group_roster, validate_scores, save_exam_scores
+
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+# XLSX ichidagi XML fayllarning ochilgan hajmi (zip-bomba himoyasi)
+MAX_XML_SIZE = 50 * 1024 * 1024
+MAX_ROWS = 10_000
+
+# Sarlavha nomlari (kichik harfda, bo'shliq o'rniga "_", apostrofsiz)
+HEADER_ALIASES = {
+    'id': {'id', 'student_id', 'talaba_id', 'oquvchi_id'},
+    'familiya': {'familiya', 'familya', 'surname', 'last_name'},
+    'ismi': {'ismi', 'ism', 'name', 'first_name'},
+    'score': {'ball', 'score', 'baho', 'natija'},
+}
+
+APOSTROPHES_RE = re.compile("[‘’ʻʼ`´]")
+XLSX_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+
+class GradeImportError(ValueError):
+    pass
+
+
+def _normalize(value):
+    # Katta-kichik harf, ortiqcha bo'shliqlar va turli apostroflar (o‘, oʻ, o’) farq qilmaydi
+    return ' '.join(APOSTROPHES_RE.sub("'", str(value)).casefold().split())
+
+
+def _header_key(value):
+    return _normalize(value).replace("'", '').replace(' ', '_')
+
+
+def _local(tag):
+    return tag.rpartition('}')[2]
+
+
+def _csv_rows(uploaded_file):
+    def lines():
+        for number, line in enumerate(uploaded_file):
+            if number == 0:
+                line = line.removeprefix(codecs.BOM_UTF8)
+            try:
+                yield line.decode('utf-8')
+            except UnicodeDecodeError:
+                # Excel ning Windows (kirill) eksporti
+                yield line.decode('cp1251')
+
+    lines = lines()
+    first = next(lines, '')
+    try:
+        dialect = csv.Sniffer().sniff(first, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    for number, row in enumerate(csv.reader(itertools.chain([first], lines), dialect), start=1):
+        yield number, row
+
+
+def _xlsx_sheet_path(archive):
+    # Birinchi varaq: workbook.xml dagi birinchi <sheet> ning r:id si orqali
+    try:
+        workbook = fromstring(archive.read('xl/workbook.xml'))
+        rels = fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        sheet = next(elem for elem in workbook.iter() if _local(elem.tag) == 'sheet')
+        target = next(rel.get('Target') for rel in rels if rel.get('Id') == sheet.get(f'{XLSX_REL_NS}id'))
+    except (KeyError, StopIteration, ParseError):
+        return 'xl/worksheets/sheet1.xml'
+    return target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+
+
+def _xlsx_open(archive, name):
+    try:
+        info = archive.getinfo(name)
+    except KeyError:
+        return None
+    if info.file_size > MAX_XML_SIZE:
+        raise GradeImportError("XLSX fayl juda katta.")
+    return archive.open(info)
+
+
+def _xlsx_shared_strings(archive):
+    source = _xlsx_open(archive, 'xl/sharedStrings.xml')
+    if source is None:
+        return []
+    strings = []
+    with source:
+        for _event, elem in iterparse(source):
+            if _local(elem.tag) == 'si':
+                strings.append(''.join(t.text or '' for t in elem.iter() if _local(t.tag) == 't'))
+                elem.clear()
+    return strings
+
+
+def _column_index(ref):
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord('A') + 1
+    return index - 1
+
+
+def _xlsx_rows(uploaded_file):
+    try:
+        archive = zipfile.ZipFile(uploaded_file)
+    except zipfile.BadZipFile as e:
+        raise GradeImportError("XLSX fayl buzilgan.") from e
+
+    with archive:
+        shared_strings = _xlsx_shared_strings(archive)
+        source = _xlsx_open(archive, _xlsx_sheet_path(archive))
+        if source is None:
+            raise GradeImportError("XLSX faylda varaq topilmadi.")
+        with source:
+            # Qatorlar birma-bir o'qiladi va tozalanadi - butun varaq xotiraga yuklanmaydi
+            for _event, elem in iterparse(source):
+                if _local(elem.tag) != 'row':
+                    continue
+                values = {}
+                for position, cell in enumerate(c for c in elem if _local(c.tag) == 'c'):
+                    index = _column_index(cell.get('r', '')) if cell.get('r') else position
+                    cell_type = cell.get('t')
+                    if cell_type == 'inlineStr':
+                        value = ''.join(t.text or '' for t in cell.iter() if _local(t.tag) == 't')
+                    else:
+                        value = next((v.text or '' for v in cell if _local(v.tag) == 'v'), '')
+                        if cell_type == 's' and value:
+                            value = shared_strings[int(value)]
+                    values[index] = value
+                row = [values.get(i, '') for i in range(max(values) + 1)] if values else []
+                yield int(elem.get('r', 0)) or None, row
+                elem.clear()
+
+
+def read_rows(uploaded_file):
+    """
+    Yuklangan CSV yoki XLSX fayl qatorlarini (qator raqami, [katakchalar]) ko'rinishida oqim bilan o'qiydi.
+    Noto'g'ri yoki juda katta faylda GradeImportError.
+    """
+    if uploaded_file.size > MAX_UPLOAD_SIZE:
+        raise GradeImportError(f"Fayl hajmi {MAX_UPLOAD_SIZE // (1024 * 1024)} MB dan oshmasligi kerak.")
+
+    name = (uploaded_file.name or '').lower()
+    uploaded_file.seek(0)
+    is_zip = uploaded_file.read(4) == b'PK\x03\x04'
+    uploaded_file.seek(0)
+
+    if name.endswith('.xlsx') or is_zip:
+        rows = _xlsx_rows(uploaded_file)
+    elif name.endswith(('.csv', '.txt')):
+        rows = _csv_rows(uploaded_file)
+    else:
+        raise GradeImportError("Faqat CSV yoki XLSX fayl qabul qilinadi.")
+
+    try:
+        for count, (number, row) in enumerate(rows, start=1):
+            if count > MAX_ROWS:
+                raise GradeImportError(f"Faylda {MAX_ROWS} tadan ortiq qator bor.")
+            yield number or count, [str(cell).strip() for cell in row]
+    except GradeImportError:
+        raise
+    except (ParseError, csv.Error, IndexError, ValueError) as e:
+        raise GradeImportError(f"Faylni o'qib bo'lmadi: {e}") from e
+
+
+def _columns(header):
+    """Sarlavha qatoridan ustunlar joylashuvini aniqlaydi; sarlavha bo'lmasa None."""
+    keys = [_header_key(cell) for cell in header]
+    columns = {}
+    for field, aliases in HEADER_ALIASES.items():
+        index = next((i for i, key in enumerate(keys) if key in aliases), None)
+        if index is not None:
+            columns[field] = index
+    if 'score' in columns and ('id' in columns or {'familiya', 'ismi'} <= columns.keys()):
+        return columns
+    return None
+
+
+def _parse_number(value):
+    # XLSX raqamlari "87" yoki "87.0" ko'rinishida keladi; vergulli kasr ham qabul qilinadi
+    number = float(value.replace(',', '.'))
+    if not number.is_integer():
+        raise ValueError(value)
+    return int(number)
+
+
+def import_scores(exam, uploaded_file):
+    """
+    Jadvaldagi ballarni imtihon guruhi ro'yxati bilan xotirada moslab, to'g'rilarini bitta
+    tranzaksiyada (bitta bulk upsert) saqlaydi.
+
+    Ustunlar sarlavha bo'yicha aniqlanadi (id yoki familiya + ismi, ball). Sarlavha bo'lmasa:
+    2 ustun - (id, ball), 3 va undan ko'p - (familiya, ismi, ball).
+    {'saved': n, 'skipped': n, 'errors': [{'row': n, 'error': ...}]} qaytaradi.
+    """
+    roster = list(group_roster(exam.group).values_list('id', 'familiya', 'ismi'))
+    roster_ids = {student_id for student_id, _familiya, _ismi in roster}
+    by_name = {}
+    for student_id, familiya, ismi in roster:
+        by_name.setdefault((_normalize(familiya), _normalize(ismi)), []).append(student_id)
+
+    raw_scores = {}
+    row_numbers = {}
+    errors = []
+    skipped = 0
+    columns = None
+
+    for number, row in read_rows(uploaded_file):
+        if not any(row):
+            continue
+        if columns is None:
+            columns = _columns(row)
+            if columns is not None:
+                continue
+            columns = {'id': 0, 'score': 1} if len(row) == 2 else {'familiya': 0, 'ismi': 1, 'score': 2}
+
+        def cell(field):
+            index = columns.get(field)
+            return row[index] if index is not None and index < len(row) else ''
+
+        raw_score = cell('score')
+        if not raw_score:
+            skipped += 1
+            continue
+
+        if cell('id'):
+            try:
+                student_id = _parse_number(cell('id'))
+            except ValueError:
+                errors.append({'row': number, 'error': f"ID noto'g'ri: {cell('id')!r}."})
+                continue
+            if student_id not in roster_ids:
+                errors.append({'row': number, 'error': f"ID {student_id} bu guruhda topilmadi."})
+                continue
+        else:
+            familiya, ismi = _normalize(cell('familiya')), _normalize(cell('ismi'))
+            # Ustunlar almashib ketgan bo'lsa (ism, familiya) ham tekshiriladi
+            matches = by_name.get((familiya, ismi)) or by_name.get((ismi, familiya)) or []
+            if not matches:
+                errors.append({'row': number,
+                               'error': f"O'quvchi guruhda topilmadi: {cell('familiya')} {cell('ismi')}."})
+                continue
+            if len(matches) > 1:
+                errors.append({'row': number, 'error': f"Guruhda bir nechta {cell('familiya')} {cell('ismi')} bor, "
+                                                      f"ID ustunini ishlating."})
+                continue
+            student_id = matches[0]
+
+        if student_id in row_numbers:
+            errors.append({'row': number, 'error': f"O'quvchi {row_numbers[student_id]}-qatorda allaqachon bor."})
+            continue
+
+        try:
+            raw_scores[student_id] = _parse_number(raw_score)
+        except ValueError:
+            errors.append({'row': number, 'error': f"Ball butun son bo'lishi kerak: {raw_score!r}."})
+            continue
+        row_numbers[student_id] = number
+
+    scores, score_errors = validate_scores(exam, raw_scores, roster_ids)
+    errors.extend({'row': row_numbers[error['student_id']], 'error': error['error']} for error in score_errors)
+    errors.sort(key=lambda error: error['row'])
+
+    return {'saved': save_exam_scores(exam, scores), 'skipped': skipped, 'errors': errors}
@@ -0,0 +1,75 @@
+from django.db import transaction
+
+from myapp.dashboard import invalidate_dashboards
+from myapp.models import ExamResult, Profile
+from myapp.summaries import refresh_group_summaries
+
+
+def group_roster(group):
+    """Baholanadigan (aktiv, xodim bo'lmagan) guruh o'quvchilari."""
+    return Profile.objects.filter(
+        profile_group=group,
+        user__is_staff=False,
+        user__is_superuser=False,
+        user__is_active=True
+    )
+
+
+def _parse_score(raw_score):
+    # JSON dagi true/false (bool - int ning quyi sinfi) va kasr sonlar ball emas: int() ularni
+    # jimgina 1/0 ga yoki 87.9 ni 87 ga aylantirardi. 87.0 kabi butun qiymatli son qabul qilinadi
+    if isinstance(raw_score, bool):
+        raise ValueError(raw_score)
+    if isinstance(raw_score, float):
+        if not raw_score.is_integer():
+            raise ValueError(raw_score)
+        return int(raw_score)
+    return int(raw_score)
+
+
+def validate_scores(exam, raw_scores, allowed_student_ids):
+    """
+    {student_id: ball} lug'atini tekshiradi.
+    Bo'sh qiymatlar o'tkazib yuboriladi. (scores, errors) juftligini qaytaradi.
+    """
+    allowed_student_ids = set(allowed_student_ids)
+    scores = {}
+    errors = []
+
+    for student_id, raw_score in raw_scores.items():
+        if raw_score is None or raw_score == '':
+            continue
+
+        if student_id not in allowed_student_ids:
+            errors.append({'student_id': student_id, 'error': "O'quvchi bu guruhda topilmadi."})
+            continue
+
+        try:
+            score = _parse_score(raw_score)
+        except (TypeError, ValueError):
+            errors.append({'student_id': student_id, 'error': f"Ball butun son bo'lishi kerak: {raw_score!r}."})
+            continue
+
+        if not 0 <= score <= exam.max_score:
+            errors.append({'student_id': student_id, 'error': f"Ball 0 va {exam.max_score} oralig'ida bo'lishi kerak."})
+            continue
+
+        scores[student_id] = score
+
+    return scores, errors
+
+
+@transaction.atomic
+def save_exam_scores(exam, scores):
+    """Barcha ballarni bitta tranzaksiyada, bitta bulk upsert bilan saqlaydi."""
+    if scores:
+        ExamResult.objects.bulk_create(
+            [ExamResult(exam=exam, student_id=student_id, score=score) for student_id, score in scores.items()],
+            update_conflicts=True,
+            unique_fields=['exam', 'student'],
+            update_fields=['score', 'updated_at'],
+        )
+        refresh_group_summaries(exam.group_id)
+        # bulk_create signal yubormaydi
+        invalidate_dashboards(scores)
+    return len(scores)
@@ -0,0 +1,128 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+
+from myapp.models import Profile
+
+
+UPLOAD_DIR = 'users_img'
+
+# Variant: eng katta tomoni (px). Kichik rasm 50px avatarlar uchun 2x zichlikda.
+PROFILE_IMAGE_SIZES = getattr(settings, 'PROFILE_IMAGE_SIZES', {
+    'original': 1024,
+    'medium': 320,
+    'small': 96,
+})
+PROFILE_IMAGE_QUALITY = getattr(settings, 'PROFILE_IMAGE_QUALITY', 82)
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def _output_format():
+    from PIL import features
+
+    # Pillow libwebp siz yig'ilgan bo'lsa JPEG ishlatiladi
+    return ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+
+def _encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == 'JPEG':
+        image.save(buffer, 'JPEG', quality=PROFILE_IMAGE_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, image_format, quality=PROFILE_IMAGE_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _normalize(uploaded_file, image_format):
+    """Rasmni ochadi, EXIF bo'yicha buradi, rang rejimini moslaydi va o'lchamini cheklaydi."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(uploaded_file)
+        # JPEG ni to'g'ridan-to'g'ri kichraytirilgan holda o'qish (dekodlash ancha tez)
+        image.draft('RGB', (PROFILE_IMAGE_SIZES['original'],) * 2)
+        image = ImageOps.exif_transpose(image)
+
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        if has_alpha and image_format == 'WEBP':
+            image = image.convert('RGBA')
+        elif has_alpha:
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', image.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            image = image.convert('RGB')
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImage(str(e)) from e
+
+    # Yangi rasm obyekti yaratilganda EXIF/ICC va boshqa metama'lumotlar o'tmaydi
+    image.info = {}
+    image.thumbnail((PROFILE_IMAGE_SIZES['original'],) * 2, Image.LANCZOS, reducing_gap=3.0)
+    return image
+
+
+def build_profile_images(uploaded_file):
+    """
+    Yuklangan rasmdan asosiy, o'rta va kichik variantlarni yaratadi.
+    {'original': (nom, baytlar), 'medium': ..., 'small': ...} qaytaradi.
+    Nomlar asosiy rasm mazmunining xeshidan olinadi, shuning uchun bir xil rasm bir marta saqlanadi.
+    """
+    from PIL import Image
+
+    image_format, extension = _output_format()
+    image = _normalize(uploaded_file, image_format)
+
+    data = {'original': _encode(image, image_format)}
+    # Har bir keyingi o'lcham oldingi (kichikroq) rasmdan olinadi
+    for variant in ('medium', 'small'):
+        size = PROFILE_IMAGE_SIZES[variant]
+        image = image.copy()
+        image.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+        data[variant] = _encode(image, image_format)
+
+    stem = hashlib.sha256(data['original']).hexdigest()[:32]
+    return {
+        variant: (f'{UPLOAD_DIR}/{stem}.{extension}' if variant == 'original'
+                  else f'{UPLOAD_DIR}/{stem}_{variant}.{extension}', content)
+        for variant, content in data.items()
+    }
+
+
+def _store(name, content):
+    # Xuddi shu mazmun avval saqlangan bo'lsa qayta yozilmaydi
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+    return name
+
+
+def delete_unused_images(profile, names):
+    """Boshqa hech bir profil ishlatmayotgan rasm fayllarini o'chiradi (profil saqlangandan keyin chaqiriladi)."""
+    others = Profile.objects.exclude(pk=profile.pk)
+    for name in filter(None, names):
+        if name.endswith(('/user.png', '/users.png')):
+            continue
+        in_use = others.filter(Q(rasm=name) | Q(rasm_medium=name) | Q(rasm_small=name)).exists()
+        if not in_use and default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def set_profile_image(profile, uploaded_file):
+    """
+    Profil rasmini normallashtirib, barcha o'lchamlarini saqlaydi va profil maydonlariga yozadi.
+    Endi ishlatilmaydigan eski fayl nomlarini qaytaradi. Rasm yaroqsiz bo'lsa InvalidImage.
+    """
+    images = build_profile_images(uploaded_file)
+    previous = {profile.rasm.name, profile.rasm_medium.name, profile.rasm_small.name}
+
+    profile.rasm = _store(*images['original'])
+    profile.rasm_medium = _store(*images['medium'])
+    profile.rasm_small = _store(*images['small'])
+
+    return previous - {profile.rasm.name, profile.rasm_medium.name, profile.rasm_small.name}
@@ -0,0 +1,146 @@
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from myapp.models import Job, Payments, Profile
+
+
+# Qayta urinishlar orasidagi kechikish (soniya), har urinishda ikki barobar oshadi
+RETRY_DELAY = 30
+# Shuncha vaqt RUNNING holatida qolgan vazifa worker to'xtab qolgan deb hisoblanadi
+STALE_AFTER = timedelta(minutes=10)
+# Muvaffaqiyatsiz vazifalar (xato matni bilan) shuncha vaqt saqlanadi
+FAILED_RETENTION = timedelta(days=7)
+
+# Vazifa turi -> bajaruvchi funksiya. Funksiya payload ni kalit so'zli argumentlar sifatida oladi
+# va (natija baytlari, content_type, version) qaytaradi. version - natija aynan qaysi ma'lumotdan
+# yaratilgani (navbatga qo'yilgandan keyin o'zgargan bo'lishi mumkin); None bo'lsa o'zgarmaydi.
+HANDLERS = {}
+
+
+class UnknownJob(Exception):
+    pass
+
+
+def job_handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, subject, payload=None, version='', requested_by=None, max_attempts=3):
+    """
+    Vazifani navbatga qo'yadi. Xuddi shu (kind, subject, version) uchun navbatda yoki bajarilayotgan
+    vazifa bo'lsa, yangisi yaratilmaydi - o'sha qaytariladi.
+    """
+    active = Job.objects.filter(kind=kind, subject=subject, version=version, status__in=[Job.QUEUED, Job.RUNNING])
+    job = active.first()
+    if job is None:
+        try:
+            with transaction.atomic():
+                job = Job.objects.create(
+                    kind=kind, subject=subject, version=version, payload=payload or {},
+                    requested_by=requested_by if getattr(requested_by, 'is_authenticated', False) else None,
+                    max_attempts=max_attempts,
+                )
+        except IntegrityError:
+            # Parallel so'rov bir lahza oldin qo'ygan (job_unique_active)
+            job = active.first()
+    return job
+
+
+def finished_job(kind, subject, version=None):
+    """Eng so'nggi tayyor natija; version berilsa - faqat aynan shu versiya."""
+    jobs = Job.objects.filter(kind=kind, subject=subject, status=Job.DONE)
+    if version is not None:
+        jobs = jobs.filter(version=version)
+    return jobs.order_by('-finished_at').first()
+
+
+def claim_jobs(limit):
+    """
+    Bajarish vaqti kelgan vazifalarni RUNNING holatiga o'tkazib, ID larini qaytaradi.
+    Holat sharti bilan yangilanadi, shuning uchun bir nechta worker bitta vazifani ikki marta olmaydi.
+    """
+    claimed = []
+    with transaction.atomic():
+        candidates = Job.objects.filter(status=Job.QUEUED, run_after__lte=now()).order_by('run_after', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        for job_id in candidates.values_list('id', flat=True)[:limit]:
+            if Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+                status=Job.RUNNING, started_at=now(), attempts=F('attempts') + 1,
+            ):
+                claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs():
+    """To'xtab qolgan worker vazifalari: urinishlar qolgan bo'lsa qayta navbatga, aks holda FAILED."""
+    stale = Job.objects.filter(status=Job.RUNNING, started_at__lt=now() - STALE_AFTER)
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(status=Job.QUEUED, run_after=now())
+    failed = stale.update(status=Job.FAILED, finished_at=now(), error="Worker javob bermay qoldi.")
+    return requeued, failed
+
+
+def prune_failed_jobs():
+    """FAILED_RETENTION dan eski muvaffaqiyatsiz vazifalarni o'chiradi (jadval cheksiz o'smasligi uchun)."""
+    deleted, _ = Job.objects.filter(status=Job.FAILED, finished_at__lt=now() - FAILED_RETENTION).delete()
+    return deleted
+
+
+def run_job(job_id):
+    """
+    Bitta vazifani bajaradi (odatda run_jobs jarayonlar hovuzida). Muvaffaqiyatda natija saqlanadi;
+    xatoda kechiktirib qayta urinish, urinishlar tugagan bo'lsa FAILED.
+    (job_id, muvaffaqiyatli) qaytaradi.
+    """
+    job = Job.objects.get(id=job_id)
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise UnknownJob(job.kind)
+        result, content_type, version = handler(**job.payload)
+    except Exception as e:
+        error = traceback.format_exc()
+        if isinstance(e, UnknownJob) or job.attempts >= job.max_attempts:
+            Job.objects.filter(id=job.id).update(status=Job.FAILED, finished_at=now(), error=error)
+        else:
+            delay = timedelta(seconds=RETRY_DELAY * 2 ** max(job.attempts - 1, 0))
+            Job.objects.filter(id=job.id).update(status=Job.QUEUED, run_after=now() + delay, error=error)
+        return job_id, False
+
+    with transaction.atomic():
+        Job.objects.filter(id=job.id).update(
+            status=Job.DONE, finished_at=now(), result=result, content_type=content_type, error='',
+            version=job.version if version is None else version,
+        )
+        # Shu obyektning eski natijalari va oldingi xatolari saqlanmaydi
+        Job.objects.filter(
+            kind=job.kind, subject=job.subject, status__in=[Job.DONE, Job.FAILED],
+        ).exclude(id=job.id).delete()
+    return job_id, True
+
+
+@job_handler('payments_pdf')
+def payments_pdf_job(student_id):
+    from myapp.pdf_cache import build_cached_payments_pdf
+
+    student = Profile.objects.get(id=student_id)
+    payments = list(Payments.objects.filter(names_ful=student).order_by('id'))
+    # Digest navbatga qo'yilgandagi emas, PDF aynan yaratilgan to'lovlar bo'yicha saqlanadi
+    digest, pdf = build_cached_payments_pdf(student, payments)
+    return pdf, 'application/pdf', digest
+
+
+@job_handler('recommendation_charts')
+def recommendation_charts_job(group_id, student_id):
+    from myapp.charts import encode_charts, load_chart_data, render_group_chart, render_student_chart
+
+    student_scores, last_exam_results = load_chart_data(group_id, student_id)
+    charts = (render_student_chart(student_scores), render_group_chart(last_exam_results, student_id))
+    return encode_charts(charts), 'application/json', None
@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from myapp.analytics import compute_group_analytics
+
+
+def python_group_analytics(student_ids, scores):
+    """Avvalgi usul: natijalar ustidan Python sikli (taqqoslash uchun)."""
+    totals = {}
+    latest = {}
+    for student_id, score in zip(student_ids, scores):
+        count, score_sum = totals.get(student_id, (0, 0))
+        totals[student_id] = (count + 1, score_sum + score)
+        latest[student_id] = score
+    group_mean = sum(scores) / len(scores)
+    return totals, latest, group_mean
+
+
+class Command(BaseCommand):
+    help = "Guruh analitikasini NumPy va Python sikli bilan hisoblash vaqtini taqqoslaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000],
+                            help="Natijalar soni (bir nechta qiymat)")
+        parser.add_argument('--students', type=int, default=40, help="Guruhdagi talabalar soni")
+        parser.add_argument('--repeat', type=int, default=5, help="Har bir o'lcham uchun takrorlar soni")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        self.stdout.write(f"{'natijalar':>10} {'numpy, ms':>12} {'python, ms':>12} {'tezlanish':>10}")
+
+        for size in options['sizes']:
+            student_ids = rng.integers(1, options['students'] + 1, size=size)
+            scores = rng.integers(0, 101, size=size)
+            id_list, score_list = student_ids.tolist(), scores.tolist()
+
+            numpy_time = self._best_time(lambda: compute_group_analytics(student_ids, scores), options['repeat'])
+            python_time = self._best_time(lambda: python_group_analytics(id_list, score_list), options['repeat'])
+
+            self.stdout.write(
+                f"{size:>10} {numpy_time * 1000:>12.3f} {python_time * 1000:>12.3f} {python_time / numpy_time:>9.1f}x"
+            )
+
+    @staticmethod
+    def _best_time(func, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.urls import reverse
+
+from myapp.models import CustomUser, Exam, Profile
+from myapp.perf import _percentile
+
+
+class Command(BaseCommand):
+    help = ("WSGI (sinxron gunicorn) va ASGI (gunicorn + uvicorn) rejimlarida async endpointlarning "
+            "bir vaqtdagi so'rovlardagi o'tkazuvchanligi va kechikishini taqqoslaydi")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi', 'asgi'])
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50],
+                            help="Bir vaqtdagi so'rovlar soni (bir nechta qiymat)")
+        parser.add_argument('--requests', type=int, default=200, help="Har bir daraja uchun so'rovlar soni")
+        parser.add_argument('--workers', type=int, default=2, help="Gunicorn workerlari soni")
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--teacher', help="get_exams_by_group uchun o'qituvchi logini")
+        parser.add_argument('--student', help="select_group va student_exam_list uchun talaba logini")
+
+    def handle(self, *args, **options):
+        targets = self._targets(options['teacher'], options['student'])
+        sessions = {user: self._session_cookie(user) for user in {user for user, _path in targets}}
+        try:
+            self.stdout.write(f"{'rejim':<6} {'endpoint':<40} {'parallel':>8} {'so‘rov/s':>10} "
+                              f"{'p50, ms':>9} {'p95, ms':>9} {'xato':>5}")
+            for mode in options['modes']:
+                with self._server(mode, options['port'], options['workers']):
+                    for user, path in targets:
+                        for concurrency in options['concurrency']:
+                            row = asyncio.run(self._load(
+                                f"http://127.0.0.1:{options['port']}{path}", sessions[user],
+                                concurrency, options['requests'],
+                            ))
+                            self.stdout.write(
+                                f"{mode:<6} {path:<40} {concurrency:>8} {row['rps']:>10.1f} "
+                                f"{row['p50']:>9.1f} {row['p95']:>9.1f} {row['errors']:>5}"
+                            )
+        finally:
+            engine = import_module(settings.SESSION_ENGINE)
+            for session_key in sessions.values():
+                engine.SessionStore(session_key).delete()
+
+    def _targets(self, teacher_username, student_username):
+        teachers = CustomUser.objects.filter(is_teacher=True)
+        teacher = teachers.filter(username=teacher_username).first() if teacher_username else teachers.first()
+        students = Profile.objects.filter(user__is_teacher=False, user__is_superuser=False,
+                                          profile_group__isnull=False).select_related('user').distinct()
+        student = (students.filter(user__username=student_username) if student_username else students).first()
+        if teacher is None or student is None:
+            raise CommandError("O'qituvchi va guruhga a'zo talaba topilmadi (generate_school_data bilan yarating)")
+
+        # Eng ko'p imtihonli guruh - JSON javob eng "og'ir" bo'lgan holat
+        busiest = Exam.objects.values('group_id').annotate(total=Count('id')).order_by('-total').first()
+        group_id = busiest['group_id'] if busiest else student.profile_group.values_list('id', flat=True).first()
+        return [
+            (teacher, f"{reverse('get_exams_by_group')}?group_id={group_id}"),
+            (student.user, reverse('select_group')),
+            (student.user, reverse('student_exam_list')),
+        ]
+
+    @staticmethod
+    def _session_cookie(user):
+        # django.test.Client.force_login kabi: serverlar shu sessiya kaliti bilan foydalanuvchini taniydi
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session.session_key
+
+    @contextmanager
+    def _server(self, mode, port, workers):
+        # gunicorn.conf.py dagi profil: SERVER_MODE=wsgi yoki asgi
+        env = dict(os.environ, SERVER_MODE=mode, PERF_SAMPLE_RATE='0')
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(settings.BASE_DIR / 'gunicorn.conf.py'),
+             '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning'],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        try:
+            self._wait_for_port(port, process)
+            yield process
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    @staticmethod
+    def _wait_for_port(port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server ishga tushmadi (chiqish kodi {process.returncode})")
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server {timeout} soniyada javob bermadi")
+
+    @staticmethod
+    async def _load(url, session_key, concurrency, total):
+        import httpx
+
+        latencies = []
+        errors = 0
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        async with httpx.AsyncClient(
+            cookies={settings.SESSION_COOKIE_NAME: session_key},
+            limits=httpx.Limits(max_connections=concurrency), timeout=60,
+        ) as client:
+            # Isitish: workerlar ilovani yuklab oladi, kesh to'ladi
+            for _ in range(min(concurrency, 5)):
+                await client.get(url)
+
+            async def worker():
+                nonlocal errors
+                while not queue.empty():
+                    queue.get_nowait()
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                        if response.status_code != 200:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            'rps': total / elapsed,
+            'p50': _percentile(latencies, 0.50),
+            'p95': _percentile(latencies, 0.95),
+            'errors': errors,
+        }
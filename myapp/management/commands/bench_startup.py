@@ -0,0 +1,52 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+
+# Alohida jarayonda "bo'sh" worker ishga tushishini o'lchaydigan skript
+WORKER_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'heavy_modules': sorted(m for m in %r if m in sys.modules),
+}))
+"""
+
+HEAVY_MODULES = ('numpy', 'matplotlib', 'sklearn', 'reportlab', 'PIL')
+
+
+class Command(BaseCommand):
+    help = "Worker ishga tushish vaqti va xotirasini o'lchaydi (WSGI ilova + URL konfiguratsiyasi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Necha marta yangi jarayon ishga tushiriladi")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        script = WORKER_SCRIPT % (HEAVY_MODULES,)
+        samples = []
+
+        for _ in range(options['runs']):
+            output = subprocess.run(
+                [sys.executable, '-c', script], env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+
+        seconds = [sample['seconds'] for sample in samples]
+        rss = [sample['max_rss_kb'] / 1024 for sample in samples]
+        self.stdout.write(f"Ishga tushish vaqti: median {statistics.median(seconds) * 1000:.1f} ms, "
+                          f"min {min(seconds) * 1000:.1f} ms ({len(samples)} ta jarayon)")
+        self.stdout.write(f"Xotira (max RSS): median {statistics.median(rss):.1f} MB")
+        heavy = samples[-1]['heavy_modules']
+        self.stdout.write(f"Yuklangan og'ir modullar: {', '.join(heavy) if heavy else 'yo‘q'}")
@@ -0,0 +1,183 @@
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from myapp.models import CustomUser, Exam, ProfileGroup, Video
+
+
+# URL parametri nomi -> namunaviy obyektdan olinadigan qiymat
+URL_KWARGS = {
+    'group_id': lambda sample: sample['group'].id,
+    'exam_id': lambda sample: sample['exam'].id,
+    'video_id': lambda sample: sample['video'].id,
+    'student_id': lambda sample: sample['student'].id,
+    'user_id': lambda sample: sample['student'].user_id,
+}
+SQLITE_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)\b(?! USING| VIRTUAL TABLE)')
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _url_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            # admin va boshqa ilovalar (namespace) tekshirilmaydi
+            if not pattern.namespace:
+                yield from _url_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern
+
+
+def _postgres_seq_scans(plan):
+    """EXPLAIN (FORMAT JSON) rejasidagi filtrli Seq Scan tugunlari: [(jadval, taxminiy qatorlar)]."""
+    found = []
+    if plan.get('Node Type') == 'Seq Scan' and 'Filter' in plan:
+        found.append((plan['Relation Name'], plan.get('Plan Rows')))
+    for child in plan.get('Plans', []):
+        found.extend(_postgres_seq_scans(child))
+    return found
+
+
+class Command(BaseCommand):
+    help = ("Har bir sahifa (URL) bajaradigan SELECT so'rovlari uchun EXPLAIN ishga tushiradi va indekssiz "
+            "to'liq jadval o'qishlarini (sequential scan) ko'rsatadi. Barcha o'zgarishlar bekor qilinadi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--url', action='append', dest='urls', default=[],
+                            help="Faqat shu URL nomlari (bir necha marta berish mumkin)")
+        parser.add_argument('--search', default='', help="Qidiruvli sahifalarni shu so'z bilan ham tekshirish")
+        parser.add_argument('--ignore-table', action='append', default=[],
+                            help="Bu jadvaldagi to'liq o'qishlar e'tiborga olinmaydi")
+        parser.add_argument('--planner-defaults', action='store_true',
+                            help="PostgreSQL: enable_seqscan o'chirilmaydi (kichik bazada Seq Scan tabiiy)")
+        parser.add_argument('--verbose-plans', action='store_true', help="Har bir so'rov rejasini chiqarish")
+        parser.add_argument('--strict', action='store_true',
+                            help="To'liq o'qish topilsa xato bilan tugash (CI uchun)")
+
+    def handle(self, *args, **options):
+        self.connection = connections[options['database']]
+        if self.connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f"{self.connection.vendor} qo'llab-quvvatlanmaydi (PostgreSQL yoki SQLite).")
+        self.options = options
+        self.ignored = set(options['ignore_table'])
+        self.tables = set(self.connection.introspection.table_names())
+
+        flagged = 0
+        try:
+            with transaction.atomic(using=options['database']):
+                if self.connection.vendor == 'postgresql' and not options['planner_defaults']:
+                    # Indeks bo'lsa planner undan foydalanadi; qolgan Seq Scan - mos indeks yo'q degani
+                    with self.connection.cursor() as cursor:
+                        cursor.execute('SET LOCAL enable_seqscan = off')
+                sample = self._sample()
+                for name, queries in self._collect(sample):
+                    flagged += self._report(name, queries)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if flagged:
+            message = f"{flagged} ta so'rovda indekssiz to'liq o'qish topildi."
+            if options['strict']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("To'liq jadval o'qishlari topilmadi."))
+
+    def _sample(self):
+        teacher = CustomUser.objects.filter(is_teacher=True).first() or CustomUser.objects.filter(
+            is_superuser=True).first()
+        membership = ProfileGroup.objects.filter(
+            profile__user__is_teacher=False, profile__user__is_superuser=False, group__exams__isnull=False,
+        ).select_related('profile__user', 'group').first()
+        if teacher is None or membership is None:
+            raise CommandError("O'qituvchi va imtihoni bor guruhdagi talaba topilmadi "
+                               "(generate_school_data bilan yarating).")
+        return {
+            'teacher': teacher,
+            'student': membership.profile,
+            'group': membership.group,
+            'exam': Exam.objects.filter(group=membership.group).latest('exam_date'),
+            'video': Video.objects.first() or Video.objects.create(title='explain', youtube_link=''),
+        }
+
+    def _collect(self, sample):
+        """Har bir URL ni o'qituvchi va talaba sifatida ochib, bajarilgan (sql, params) larni yig'adi."""
+        names = set(self.options['urls'])
+        clients = []
+        for user in (sample['teacher'], sample['student'].user):
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            clients.append(client)
+
+        params = {'group': sample['group'].id, 'group_id': sample['group'].id}
+        variants = [params]
+        if self.options['search']:
+            variants.append(dict(params, search=self.options['search']))
+
+        for pattern in _url_patterns(get_resolver().url_patterns):
+            if names and pattern.name not in names:
+                continue
+            try:
+                url = reverse(pattern.name, kwargs={
+                    key: URL_KWARGS[key](sample) for key in pattern.pattern.converters
+                })
+            except KeyError:
+                self.stderr.write(f"{pattern.name}: URL parametrlari uchun namuna yo'q, o'tkazib yuborildi")
+                continue
+
+            queries = {}
+
+            def capture(execute, sql, sql_params, many, context):
+                if not many and sql.lstrip().upper().startswith('SELECT'):
+                    queries.setdefault(sql, sql_params)
+                return execute(sql, sql_params, many, context)
+
+            with self.connection.execute_wrapper(capture):
+                for client in clients:
+                    for variant in variants:
+                        response = client.get(url, variant)
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+            yield pattern.name, list(queries.items())
+
+    def _explain(self, sql, params):
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']
+                return _postgres_seq_scans(plan), json.dumps(plan, indent=2)
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            rows = cursor.fetchall()
+            # SQLite: "SCAN jadval" (USING INDEX siz) - butun jadval o'qiladi; WHERE siz so'rovlar tabiiy
+            scans = []
+            if ' WHERE ' in sql.upper():
+                for row in rows:
+                    match = SQLITE_SCAN_RE.match(row[-1])
+                    if match and match.group(1) in self.tables:
+                        scans.append((match.group(1), None))
+            return scans, '\n'.join(row[-1] for row in rows)
+
+    def _report(self, name, queries):
+        flagged = 0
+        self.stdout.write(f"{name}: {len(queries)} ta SELECT")
+        for sql, params in queries:
+            scans, plan = self._explain(sql, params)
+            scans = [(table, rows) for table, rows in scans if table not in self.ignored]
+            if self.options['verbose_plans']:
+                self.stdout.write(f"  {sql}\n{plan}")
+            if scans:
+                flagged += 1
+                tables = ', '.join(f"{table}" + (f" (~{rows} qator)" if rows is not None else '')
+                                   for table, rows in scans)
+                self.stdout.write(self.style.WARNING(f"  SEQ SCAN: {tables}"))
+                self.stdout.write(f"    {sql[:300]}")
+        return flagged
@@ -0,0 +1,115 @@
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp.models import CustomUser, Group, Profile, ProfileGroup, Video, Payments, Exam, ExamResult
+from myapp.summaries import rebuild_all_summaries
+
+
+FAMILIYALAR = ['Adilov', 'Karimov', 'Rahimov', 'Yusupov', 'Aliyev', 'Toshmatov', 'Qodirov', 'Saidov',
+               'Nazarov', 'Ergashev', 'Usmonov', 'Xolmatov', 'Mirzayev', 'Sobirov', 'Abdullayev']
+ISMLAR = ['Eldor', 'Jamshid', 'Aziz', 'Dilnoza', 'Madina', 'Bekzod', 'Sardor', 'Nodira', 'Shahzoda',
+          'Javohir', 'Kamola', 'Otabek', 'Gulnora', 'Farrux', 'Malika']
+OYLAR = [choice for choice, _ in Payments._meta.get_field('month').choices]
+
+
+class Command(BaseCommand):
+    help = "Sinov va benchmark uchun sun'iy maktab ma'lumotlarini yaratadi (bulk_create bilan)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument('--groups-per-student', type=int, default=2)
+        parser.add_argument('--exams-per-group', type=int, default=5)
+        parser.add_argument('--payment-months', type=int, default=6)
+        parser.add_argument('--videos', type=int, default=100)
+        parser.add_argument('--teachers', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--prefix', default='gen', help="Yaratilgan foydalanuvchi nomlari uchun prefiks")
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        prefix = options['prefix']
+        password = make_password('parol12345')  # Bitta xesh barcha foydalanuvchilar uchun (tezlik uchun)
+        now = datetime.now().replace(microsecond=0)
+
+        teachers = CustomUser.objects.bulk_create([
+            CustomUser(username=f'{prefix}_teacher_{i}', password=password, is_teacher=True)
+            for i in range(options['teachers'])
+        ], batch_size=batch_size)
+        teachers = list(CustomUser.objects.filter(username__in=[t.username for t in teachers]))
+
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'{prefix}_student_{i}', password=password)
+            for i in range(options['students'])
+        ], batch_size=batch_size)
+        users = list(CustomUser.objects.filter(username__in=[u.username for u in users]).order_by('id'))
+
+        Profile.objects.bulk_create([
+            Profile(user=user, familiya=rng.choice(FAMILIYALAR), ismi=rng.choice(ISMLAR),
+                    telefon=f'+99890{rng.randint(1000000, 9999999)}')
+            for user in teachers + users
+        ], batch_size=batch_size)
+        profiles = list(Profile.objects.filter(user__in=users).order_by('id'))
+
+        groups = Group.objects.bulk_create([
+            Group(name=f'{prefix.upper()}-{i + 1}', information=f"{i + 1}-guruh")
+            for i in range(options['groups'])
+        ], batch_size=batch_size)
+        groups = list(Group.objects.filter(name__in=[g.name for g in groups]).order_by('id'))
+
+        # A'zolik: har bir talaba bir nechta guruhda
+        members = {group.id: [] for group in groups}
+        for profile in profiles:
+            for group in rng.sample(groups, min(options['groups_per_student'], len(groups))):
+                members[group.id].append(profile.id)
+        ProfileGroup.objects.bulk_create([
+            ProfileGroup(group_id=group_id, profile_id=profile_id)
+            for group_id, profile_ids in members.items() for profile_id in profile_ids
+        ], batch_size=batch_size)
+
+        Exam.objects.bulk_create([
+            Exam(group=group, question_count=30, max_score=100, teacher_name='Sinov o‘qituvchi',
+                 exam_date=now - timedelta(days=7 * (options['exams_per_group'] - i)),
+                 created_by=rng.choice(teachers) if teachers else None)
+            for group in groups for i in range(options['exams_per_group'])
+        ], batch_size=batch_size)
+        exams = Exam.objects.filter(group__in=groups).values_list('id', 'group_id')
+
+        ExamResult.objects.bulk_create([
+            ExamResult(exam_id=exam_id, student_id=profile_id, score=rng.randint(30, 100))
+            for exam_id, group_id in exams for profile_id in members[group_id]
+        ], batch_size=batch_size)
+
+        Payments.objects.bulk_create([
+            Payments(names_ful=profile, month=month, money_summ=Decimal('500000'),
+                     amount_paid=Decimal(rng.choice([0, 250000, 500000])),
+                     payment_date=now.date() - timedelta(days=30 * i))
+            for profile in profiles for i, month in enumerate(OYLAR[:options['payment_months']])
+        ], batch_size=batch_size)
+
+        # bulk_create Video.save ni chaqirmaydi, shuning uchun youtube_id shu yerda beriladi
+        videos = Video.objects.bulk_create([
+            Video(title=f'Dars {i + 1}', youtube_link=f'https://www.youtube.com/watch?v=vid{i:08d}',
+                  youtube_id=f'vid{i:08d}', is_general=(i % 4 == 0))
+            for i in range(options['videos'])
+        ], batch_size=batch_size)
+        videos = Video.objects.filter(youtube_link__in=[v.youtube_link for v in videos], is_general=False)
+        Video.groups.through.objects.bulk_create([
+            Video.groups.through(video_id=video.id, group_id=group.id)
+            for video in videos for group in rng.sample(groups, min(3, len(groups)))
+        ], batch_size=batch_size, ignore_conflicts=True)
+
+        rebuild_all_summaries()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Yaratildi: {len(profiles)} talaba, {len(groups)} guruh, {len(exams)} imtihon, "
+            f"{options['videos']} video."
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from myapp.perf import perf_stats, METRICS
+
+
+class Command(BaseCommand):
+    help = ("Workerlar yig'gan so'rov statistikasini (p50/p95/p99) chiqaradi. "
+            "Bir nechta jarayon uchun umumiy kesh (REDIS_URL) kerak.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=METRICS, default='view_ms', help="Qaysi ko'rsatkich p95 bo'yicha saralash")
+
+    def handle(self, *args, **options):
+        summary = perf_stats.collect()
+        if not summary:
+            self.stdout.write("Statistika yo'q. PERF_SAMPLE_RATE > 0 ekanini tekshiring.")
+            return
+
+        header = f"{'view':<40} {'n':>5}" + ''.join(f" {metric + ' p50/p95/p99':>28}" for metric in METRICS)
+        self.stdout.write(header)
+        rows = sorted(summary.items(), key=lambda item: item[1][options['sort']]['p95'] or 0, reverse=True)
+        for view_name, row in rows:
+            line = f"{view_name:<40} {row['count']:>5}"
+            for metric in METRICS:
+                values = row[metric]
+                line += f" {values['p50']:>8.1f} /{values['p95']:>8.1f} /{values['p99']:>8.1f}"
+            self.stdout.write(line)
@@ -0,0 +1,29 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from myapp.images import InvalidImage, set_profile_image, delete_unused_images
+from myapp.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Avval yuklangan (kichraytirilmagan) profil rasmlarini qayta ishlaydi va o'lchamlarini yaratadi"
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        profiles = Profile.objects.exclude(rasm='').exclude(rasm=None).filter(rasm_small__in=['', None])
+        for profile in profiles.iterator():
+            if not default_storage.exists(profile.rasm.name):
+                failed += 1
+                continue
+            try:
+                with default_storage.open(profile.rasm.name, 'rb') as original:
+                    stale_images = set_profile_image(profile, original)
+            except InvalidImage as e:
+                self.stderr.write(f"{profile} ({profile.rasm.name}): {e}")
+                failed += 1
+                continue
+            profile.save(update_fields=['rasm', 'rasm_medium', 'rasm_small'])
+            delete_unused_images(profile, stale_images)
+            processed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Qayta ishlandi: {processed}, o'tkazib yuborildi: {failed}."))
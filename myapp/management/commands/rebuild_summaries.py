@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from myapp.summaries import rebuild_all_summaries
+
+
+class Command(BaseCommand):
+    help = "Imtihon natijalari bo'yicha guruh yig'ma jadvallarini va tavsiyalarni qayta quradi"
+
+    def handle(self, *args, **options):
+        rebuild_all_summaries()
+        self.stdout.write(self.style.SUCCESS("Yig'ma jadvallar qayta qurildi."))
@@ -0,0 +1,127 @@
+import multiprocessing
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+# myapp.jobs (modellar) funksiyalar ichida import qilinadi: spawn jarayoni bu modulni
+# django.setup() dan oldin yuklaydi
+
+CLEANUP_INTERVAL = 60
+
+
+def _init_worker():
+    # spawn bilan ochilgan jarayon Django ni qaytadan sozlaydi
+    import django
+    django.setup()
+
+
+def _run(job_id):
+    from myapp.jobs import run_job
+
+    # Jarayonlar hovuzidagi ulanish vazifalar orasida yopilib, kerak bo'lsa qayta ochiladi
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = ("Fon vazifalari navbatini (PDF, grafiklar) jarayonlar hovuzida bajaradi. "
+            "Veb jarayonlar enqueue() bilan vazifa qo'yadi, natija Job jadvalida saqlanadi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help="Jarayonlar soni; 0 - shu jarayonning o'zida ketma-ket bajarish")
+        parser.add_argument('--batch', type=int, default=0,
+                            help="Bir marta olinadigan vazifalar soni (standart: workers yoki 1)")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Navbat bo'sh bo'lganda tekshirish oralig'i (soniya)")
+        parser.add_argument('--once', action='store_true', help="Navbatdagi tayyor vazifalarni bajarib chiqish")
+        parser.add_argument('--max-tasks-per-child', type=int, default=100,
+                            help="Xotira o'sib ketmasligi uchun jarayon shuncha vazifadan keyin almashtiriladi")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+
+        workers = max(options['workers'], 0)
+        batch = options['batch'] or max(workers, 1)
+        done = failed = 0
+        try:
+            if workers == 0:
+                done, failed = self._run_inline(batch, options)
+            else:
+                done, failed = self._run_pool(workers, batch, options)
+        except KeyboardInterrupt:
+            self.stopping = True
+        self.stdout.write(f"Bajarildi: {done}, muvaffaqiyatsiz urinishlar: {failed}")
+
+    def _stop(self, signum, frame):
+        # Joriy vazifalar tugatiladi, yangilari olinmaydi
+        self.stopping = True
+
+    def _cleanup(self):
+        from myapp.jobs import prune_failed_jobs, requeue_stale_jobs
+
+        requeued, failed = requeue_stale_jobs()
+        if requeued or failed:
+            self.stderr.write(f"To'xtab qolgan vazifalar: {requeued} qayta navbatda, {failed} bekor qilindi")
+        pruned = prune_failed_jobs()
+        if pruned:
+            self.stderr.write(f"Eski muvaffaqiyatsiz vazifalar o'chirildi: {pruned}")
+
+    def _run_inline(self, batch, options):
+        from myapp.jobs import claim_jobs, run_job
+
+        done = failed = 0
+        last_cleanup = 0
+        while not self.stopping:
+            if time.monotonic() - last_cleanup > CLEANUP_INTERVAL:
+                self._cleanup()
+                last_cleanup = time.monotonic()
+            job_ids = claim_jobs(batch)
+            for job_id in job_ids:
+                _, ok = run_job(job_id)
+                done, failed = done + ok, failed + (not ok)
+            if not job_ids:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        return done, failed
+
+    def _run_pool(self, workers, batch, options):
+        from myapp.jobs import claim_jobs
+
+        done = failed = 0
+        last_cleanup = 0
+        running = set()
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, max_tasks_per_child=options['max_tasks_per_child'],
+        ) as pool:
+            while running or not self.stopping:
+                if not self.stopping:
+                    if time.monotonic() - last_cleanup > CLEANUP_INTERVAL:
+                        self._cleanup()
+                        last_cleanup = time.monotonic()
+                    # Bo'sh jarayonlar soniga qarab vazifa olinadi, qolganlari navbatda kutadi
+                    free = min(batch, workers - len(running))
+                    if free > 0:
+                        running.update(pool.submit(_run, job_id) for job_id in claim_jobs(free))
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                finished, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in finished:
+                    _, ok = future.result()
+                    done, failed = done + ok, failed + (not ok)
+        close_old_connections()
+        return done, failed
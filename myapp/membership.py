@@ -0,0 +1,35 @@
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+
+from myapp.models import Profile, ProfileGroup
+
+
+def set_group_members(group, profile_ids):
+    """
+    Guruh a'zolarini berilgan o'quvchilar ro'yxatiga tenglashtiradi.
+
+    Joriy a'zolar bitta so'rovda o'qiladi, farq xotirada hisoblanadi va bitta bulk_create
+    (ignore_conflicts) hamda bitta DELETE bilan qo'llanadi - guruh hajmiga bog'liq emas.
+    Keshlar uchun m2m_changed (post_add / post_remove) signallari yuboriladi.
+    (qo'shilganlar, olib tashlanganlar) ID to'plamlarini qaytaradi.
+    """
+    wanted = {int(profile_id) for profile_id in profile_ids}
+    db = router.db_for_write(ProfileGroup, instance=group)
+
+    with transaction.atomic(using=db):
+        current = set(ProfileGroup.objects.using(db).filter(group=group).values_list('profile_id', flat=True))
+        added, removed = wanted - current, current - wanted
+        if removed:
+            ProfileGroup.objects.using(db).filter(group=group, profile_id__in=removed).delete()
+        if added:
+            # Parallel tahrirda qo'shilgan juftliklar unique cheklov tufayli e'tiborsiz qoldiriladi
+            ProfileGroup.objects.using(db).bulk_create(
+                [ProfileGroup(group=group, profile_id=profile_id) for profile_id in added],
+                batch_size=1000, ignore_conflicts=True,
+            )
+
+    for action, pk_set in (('post_remove', removed), ('post_add', added)):
+        if pk_set:
+            m2m_changed.send(sender=ProfileGroup, instance=group, action=action, reverse=False,
+                             model=Profile, pk_set=pk_set, using=db)
+    return added, removed
@@ -0,0 +1,251 @@
+import random
+import time
+from contextlib import ExitStack
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from myapp.caching import cache_key, is_shared_cache
+from myapp.models import Profile, Group
+from myapp.perf import perf_stats, render_time
+
+
+PROFILE_CACHE_TIMEOUT = 60 * 60
+
+
+def profile_cache_key(user_id):
+    return cache_key('profiles', user_id)
+
+
+def invalidate_profile_cache(*user_ids):
+    cache.delete_many([profile_cache_key(user_id) for user_id in user_ids if user_id])
+
+
+def _load_profile_context(request):
+    # Bir so'rov ichida faqat bir marta hisoblanadi (django.contrib.auth get_user kabi)
+    if not hasattr(request, '_cached_profile_context'):
+        user = request.user
+        context = (None, frozenset())
+        if user.is_authenticated:
+            # group_ids ruxsatlarni belgilaydi (videolar, imtihonlar): jarayon ichidagi keshda boshqa
+            # workerlar a'zolik o'zgarganini bilmaydi, shuning uchun u holda har so'rovda hisoblanadi
+            key = profile_cache_key(user.pk) if is_shared_cache() else None
+            context = cache.get(key) if key else None
+            if context is None:
+                profile = Profile.objects.filter(user=user).first()
+                group_ids = frozenset(
+                    Group.objects.filter(students=profile).values_list('id', flat=True)
+                ) if profile else frozenset()
+                context = (profile, group_ids)
+                if key:
+                    cache.set(key, context, PROFILE_CACHE_TIMEOUT)
+        request._cached_profile_context = context
+    return request._cached_profile_context
+
+
+def get_profile(request):
+    """Joriy foydalanuvchi profili (profili bo'lmasa None)."""
+    return _load_profile_context(request)[0]
+
+
+def get_group_ids(request):
+    """
+    Joriy foydalanuvchi a'zo bo'lgan guruhlar ID lari.
+    frozenset: SimpleLazyObject ichida ham ORM `__in` filtrlarida to'g'ri ishlaydi (list/tuple ishlamaydi).
+    """
+    return _load_profile_context(request)[1]
+
+
+async def _aload_profile_context(request):
+    # _load_profile_context ning async varianti: natija o'sha atributga yoziladi,
+    # shuning uchun keyin shablonda request.profile ga murojaat DB ga bormaydi
+    if not hasattr(request, '_cached_profile_context'):
+        user = await request.auser()
+        context = (None, frozenset())
+        if user.is_authenticated:
+            key = profile_cache_key(user.pk) if is_shared_cache() else None
+            context = await cache.aget(key) if key else None
+            if context is None:
+                profile = await Profile.objects.filter(user=user).afirst()
+                group_ids = frozenset([
+                    group_id async for group_id in Group.objects.filter(students=profile).values_list('id', flat=True)
+                ]) if profile else frozenset()
+                context = (profile, group_ids)
+                if key:
+                    await cache.aset(key, context, PROFILE_CACHE_TIMEOUT)
+        request._cached_profile_context = context
+    return request._cached_profile_context
+
+
+async def aget_profile(request):
+    return (await _aload_profile_context(request))[0]
+
+
+async def aget_group_ids(request):
+    return (await _aload_profile_context(request))[1]
+
+
+async def _auser(request, auser):
+    # request.auser() va request.user alohida keshlanadi; async view render qilgan shablondagi
+    # {{ user }} foydalanuvchini qayta so'ramasligi uchun natija request.user ga ham yoziladi
+    user = await auser()
+    request._cached_user = user
+    return user
+
+
+class ProfileMiddleware:
+    """
+    request.profile va request.group_ids ni dangasa (lazy) tarzda qo'shadi.
+    Async viewlar uchun await request.aprofile() va await request.agroup_ids() (request.auser kabi).
+    Kesh umumiy bo'lsa (Redis) qiymatlar keshda saqlanadi va profil yoki guruh a'zoligi o'zgarganda
+    bekor qilinadi, shuning uchun har bir sahifada Profile so'rovi takrorlanmaydi.
+    AuthenticationMiddleware dan keyin turishi kerak.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        request.group_ids = SimpleLazyObject(lambda: get_group_ids(request))
+        request.aprofile = partial(aget_profile, request)
+        request.agroup_ids = partial(aget_group_ids, request)
+        if hasattr(request, 'auser'):
+            request.auser = partial(_auser, request, request.auser)
+        # Async rejimda get_response korutina qaytaradi, uni chaqiruvchi kutadi
+        return self.get_response(request)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware ning sync va async rejimda ishlaydigan varianti.
+    Asl middleware faqat sinxron: ASGI da u butun zanjirni oqimga (thread) o'tkazadi va
+    async viewlar baribir alohida oqimni band qiladi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+def _wrap_connections(stack, wrapper):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+class PerformanceMiddleware:
+    """
+    Tanlangan (PERF_SAMPLE_RATE) so'rovlar uchun SQL so'rovlar soni va vaqti, view va
+    shablon render vaqtini o'lchaydi. Natija URL nomi bo'yicha aylanma statistikaga yoziladi
+    (myapp.perf.perf_stats); Server-Timing sarlavhasi faqat xodimlarga yoki DEBUG rejimida qaytariladi.
+    Iloji boricha yuqorida turishi kerak, shunda sessiya va auth so'rovlari ham hisoblanadi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PERF_SAMPLE_RATE', 0.0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @staticmethod
+    def _query_recorder(sql):
+        def record_query(execute, sql_text, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql_text, params, many, context)
+            finally:
+                sql['queries'] += 1
+                sql['ms'] += (time.perf_counter() - start) * 1000
+        return record_query
+
+    @staticmethod
+    def _finish(request, response, sql, render_ms, view_ms, show_timing):
+        match = request.resolver_match
+        perf_stats.record(
+            match.view_name if match else 'unresolved',
+            queries=sql['queries'], sql_ms=sql['ms'], view_ms=view_ms, render_ms=render_ms,
+        )
+        # Ichki vaqtlar (DB, shablon) faqat xodimlarga ko'rinadi - perf_stats sahifasi kabi
+        if show_timing:
+            response['Server-Timing'] = (
+                f'db;dur={sql["ms"]:.1f};desc="{sql["queries"]} queries", '
+                f'tpl;dur={render_ms:.1f}, view;dur={view_ms:.1f}'
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        sql = {'queries': 0, 'ms': 0.0}
+        timer = [0.0]
+        token = render_time.set(timer)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                _wrap_connections(stack, self._query_recorder(sql))
+                response = self.get_response(request)
+        finally:
+            render_time.reset(token)
+        view_ms = (time.perf_counter() - start) * 1000
+        user = getattr(request, 'user', None)
+        show_timing = settings.DEBUG or (user is not None and user.is_staff)
+        return self._finish(request, response, sql, timer[0], view_ms, show_timing)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        sql = {'queries': 0, 'ms': 0.0}
+        timer = [0.0]
+        token = render_time.set(timer)
+        start = time.perf_counter()
+        stack = ExitStack()
+        # Async ORM so'rovlari ham sync_to_async(thread_sensitive=True) orqali so'rovning umumiy
+        # oqimida bajariladi - o'ramlar o'sha oqimdagi ulanishlarga o'rnatiladi
+        await sync_to_async(_wrap_connections)(stack, self._query_recorder(sql))
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            render_time.reset(token)
+        view_ms = (time.perf_counter() - start) * 1000
+        # Async kontekstda request.user ni o'qib bo'lmaydi (sessiya so'rovi) - auser() kutiladi
+        show_timing = settings.DEBUG or (hasattr(request, 'auser') and (await request.auser()).is_staff)
+        return self._finish(request, response, sql, timer[0], view_ms, show_timing)
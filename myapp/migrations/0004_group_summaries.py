@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_summaries(apps, schema_editor):
+    # Mavjud natijalar bo'yicha yig'ma jadvallar to'ldiriladi (manage.py rebuild_summaries bilan bir xil).
+    # Tarixiy modellar ishlatiladi: myapp.summaries keyingi migratsiyalardagi ustunlarni kutadi
+    db = schema_editor.connection.alias
+    ExamResult = apps.get_model('myapp', 'ExamResult')
+    GroupStudentSummary = apps.get_model('myapp', 'GroupStudentSummary')
+
+    results = ExamResult.objects.using(db).filter(score__isnull=False)
+    # Natijalar xronologik tartibda: har bir (guruh, talaba) uchun oxirgisi "so'nggi natija"
+    students = {}
+    for group_id, student_id, score, exam_date in results.order_by('exam__exam_date', 'exam_id').values_list(
+        'exam__group_id', 'student_id', 'score', 'exam__exam_date',
+    ).iterator():
+        count, total, _latest, _date = students.get((group_id, student_id), (0, 0, None, None))
+        students[(group_id, student_id)] = (count + 1, total + score, score, exam_date)
+
+    GroupStudentSummary.objects.using(db).bulk_create([
+        GroupStudentSummary(
+            group_id=group_id,
+            student_id=student_id,
+            result_count=count,
+            score_sum=total,
+            score_mean=total / count,
+            latest_score=latest_score,
+            latest_exam_date=latest_date,
+        )
+        for (group_id, student_id), (count, total, latest_score, latest_date) in students.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_alter_profilegroup_added_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStudentSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('result_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('score_mean', models.FloatField(blank=True, null=True)),
+                ('latest_score', models.IntegerField(blank=True, null=True)),
+                ('latest_exam_date', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_summaries', to='myapp.group')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_summaries', to='myapp.profile')),
+            ],
+            options={
+                'unique_together': {('group', 'student')},
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:07
+
+from django.db import migrations
+
+
+# PostgreSQL: familiya va ismi bo'yicha icontains qidiruvi uchun pg_trgm GIN indekslari.
+# Ifoda Django icontains yaratadigan UPPER("ustun"::text) bilan bir xil bo'lishi kerak.
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS myapp_profile_familiya_trgm ON myapp_profile "
+    "USING gin (UPPER(familiya::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS myapp_profile_ismi_trgm ON myapp_profile "
+    "USING gin (UPPER(ismi::text) gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS myapp_profile_familiya_trgm",
+    "DROP INDEX IF EXISTS myapp_profile_ismi_trgm",
+]
+
+# SQLite (lokal ishga tushirish): myapp_profile ustidan FTS5 jadvali va uni yangilab turuvchi triggerlar
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE myapp_profile_fts USING fts5("
+    "familiya, ismi, content='myapp_profile', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER myapp_profile_fts_ai AFTER INSERT ON myapp_profile BEGIN "
+    "INSERT INTO myapp_profile_fts(rowid, familiya, ismi) VALUES (new.id, new.familiya, new.ismi); END",
+    "CREATE TRIGGER myapp_profile_fts_ad AFTER DELETE ON myapp_profile BEGIN "
+    "INSERT INTO myapp_profile_fts(myapp_profile_fts, rowid, familiya, ismi) "
+    "VALUES ('delete', old.id, old.familiya, old.ismi); END",
+    "CREATE TRIGGER myapp_profile_fts_au AFTER UPDATE ON myapp_profile BEGIN "
+    "INSERT INTO myapp_profile_fts(myapp_profile_fts, rowid, familiya, ismi) "
+    "VALUES ('delete', old.id, old.familiya, old.ismi); "
+    "INSERT INTO myapp_profile_fts(rowid, familiya, ismi) VALUES (new.id, new.familiya, new.ismi); END",
+    "INSERT INTO myapp_profile_fts(myapp_profile_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS myapp_profile_fts_ai",
+    "DROP TRIGGER IF EXISTS myapp_profile_fts_ad",
+    "DROP TRIGGER IF EXISTS myapp_profile_fts_au",
+    "DROP TABLE IF EXISTS myapp_profile_fts",
+]
+
+
+def _sqlite_has_fts5(cursor):
+    cursor.execute("PRAGMA compile_options")
+    return any('FTS5' in row[0] for row in cursor.fetchall())
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            statements = SQLITE_FORWARD if _sqlite_has_fts5(cursor) else []
+    else:
+        statements = []
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_group_summaries'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_profile_name_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['familiya', 'ismi', 'id'], name='profile_name_order_idx'),
+        ),
+    ]
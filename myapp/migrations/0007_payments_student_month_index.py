@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_profile_name_order_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payments',
+            index=models.Index(fields=['names_ful', 'month'], name='payments_student_month_idx'),
+        ),
+    ]
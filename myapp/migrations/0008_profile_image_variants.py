@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_payments_student_month_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='rasm_medium',
+            field=models.ImageField(blank=True, null=True, upload_to='users_img'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rasm_small',
+            field=models.ImageField(blank=True, null=True, upload_to='users_img'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+from myapp.youtube import parse_youtube_id
+
+
+def fill_youtube_ids(apps, schema_editor):
+    # Mavjud videolar uchun ID bir marta hisoblanadi
+    Video = apps.get_model('myapp', 'Video')
+    videos = list(Video.objects.only('id', 'youtube_link'))
+    for video in videos:
+        video.youtube_id = parse_youtube_id(video.youtube_link)
+    Video.objects.bulk_update(videos, ['youtube_id'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_profile_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='youtube_id',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(fill_youtube_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['is_general', '-created_time'], name='video_general_created_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('myapp', '0009_video_youtube_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('is_superuser', False), ('is_teacher', False)), fields=['id'], name='user_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_staff', False), ('is_superuser', False)), fields=['id'], name='user_active_learner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['group', 'exam_date'], name='exam_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['created_by', '-created_at'], name='exam_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profilegroup',
+            index=models.Index(fields=['group', 'profile'], name='profilegroup_group_profile_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:04
+
+from django.db import migrations
+from django.db.models import Min
+
+
+def merge_memberships(apps, schema_editor):
+    # Group.students (eski avtomatik jadval) dagi a'zoliklar ProfileGroup ga ko'chiriladi
+    db = schema_editor.connection.alias
+    ProfileGroup = apps.get_model('myapp', 'ProfileGroup')
+    GroupStudents = apps.get_model('myapp', 'Group').students.through
+
+    # Takroriy ProfileGroup qatorlaridan eng birinchisi (eng kichik id) qoladi
+    first_ids = (ProfileGroup.objects.using(db).values('group_id', 'profile_id')
+                 .annotate(first_id=Min('id')).values('first_id'))
+    ProfileGroup.objects.using(db).exclude(id__in=first_ids).delete()
+
+    existing = set(ProfileGroup.objects.using(db).values_list('group_id', 'profile_id'))
+    ProfileGroup.objects.using(db).bulk_create([
+        ProfileGroup(group_id=group_id, profile_id=profile_id)
+        for group_id, profile_id in GroupStudents.objects.using(db).values_list('group_id', 'profile_id')
+        if (group_id, profile_id) not in existing
+    ], batch_size=1000)
+
+
+def split_memberships(apps, schema_editor):
+    # Orqaga qaytarish: qayta yaratilgan eski jadval ProfileGroup dan to'ldiriladi
+    db = schema_editor.connection.alias
+    ProfileGroup = apps.get_model('myapp', 'ProfileGroup')
+    GroupStudents = apps.get_model('myapp', 'Group').students.through
+    GroupStudents.objects.using(db).bulk_create([
+        GroupStudents(group_id=group_id, profile_id=profile_id)
+        for group_id, profile_id in ProfileGroup.objects.using(db).values_list('group_id', 'profile_id').distinct()
+    ], batch_size=1000)
+
+
+# Faqat ma'lumot, sxema o'zgarishlari 0012 da: PostgreSQL da bitta tranzaksiyada qator
+# qo'shilgandan keyin shu jadvalni ALTER qilib bo'lmaydi ("pending trigger events")
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_memberships, split_memberships),
+    ]
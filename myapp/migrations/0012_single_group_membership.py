@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_merge_group_memberships'),
+    ]
+
+    operations = [
+        # Bazada eski myapp_group_students jadvali o'chiriladi, modelda esa Group.students
+        # endi ProfileGroup orqali ishlaydi
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RemoveField(
+                    model_name='group',
+                    name='students',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='group',
+                    name='students',
+                    field=models.ManyToManyField(blank=True, related_name='profile_group', through='myapp.ProfileGroup', to='myapp.profile'),
+                ),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='profile',
+            name='guruhlar',
+        ),
+        migrations.RemoveIndex(
+            model_name='profilegroup',
+            name='profilegroup_group_profile_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='profilegroup',
+            constraint=models.UniqueConstraint(fields=('group', 'profile'), name='profilegroup_unique_membership'),
+        ),
+    ]
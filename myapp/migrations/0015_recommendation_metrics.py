@@ -0,0 +1,132 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_legacy_recommendations(apps, schema_editor):
+    # Eski qatorlar guruhsiz va hech qayerda yozilmagan; yangilari baholashdan keyin hisoblanadi
+    Recommendation = apps.get_model('myapp', 'Recommendation')
+    Recommendation.objects.using(schema_editor.connection.alias).all().delete()
+
+
+def _suggestion(latest_score, previous_mean, trend, above_group_mean):
+    # myapp.recommendations.build_suggestion ning shu migratsiya vaqtidagi nusxasi
+    if trend == 'up':
+        suggestion = (
+            f"So‘nggi natijangiz ({latest_score}) oldingi o‘rtacha ({previous_mean:.1f}) natijangizdan yuqori! "
+            "O‘zlashtirishingiz yaxshilanmoqda. Davom eting!"
+        )
+    elif trend == 'down':
+        suggestion = (
+            f"So‘nggi natijangiz ({latest_score}) oldingi o‘rtacha ({previous_mean:.1f}) natijangizdan past. "
+            "Mavzularni qayta ko‘rib chiqishingizni tavsiya qilamiz."
+        )
+    else:
+        suggestion = (
+            f"So‘nggi natijangiz ({latest_score}) oldingi o‘rtacha ({previous_mean:.1f}) natijangizga teng. "
+            "O‘zlashtirishni davom ettiring va yuqori natijalarga erishishga harakat qiling."
+        )
+
+    if above_group_mean is True:
+        suggestion += (
+            " Guruhingizdagi o'quvchilardan o'zlashtirishingiz yaxshi. Agar shu tarzda ketsangiz, muvaffaqiyatlaringiz yanada oshadi!"
+        )
+    elif above_group_mean is False:
+        suggestion += (
+            " Guruhingizdagi o'quvchilarning o'rtacha natijasidan biroz pastroqdasiz. Harakatni kuchaytirishingiz kerak!"
+        )
+    return suggestion
+
+
+def build_recommendations(apps, schema_editor):
+    # Natijasi bor har bir guruh uchun tavsiyalar baholashdagi kabi hisoblanadi (manage.py rebuild_summaries).
+    # Tarixiy modellar ishlatiladi: myapp.recommendations keyingi migratsiyalardagi ustunlarni kutadi
+    db = schema_editor.connection.alias
+    ExamResult = apps.get_model('myapp', 'ExamResult')
+    Recommendation = apps.get_model('myapp', 'Recommendation')
+
+    # Natijalar xronologik tartibda: har bir (guruh, talaba) uchun oxirgisi "so'nggi natija"
+    groups = {}
+    for group_id, student_id, score in ExamResult.objects.using(db).filter(score__isnull=False).order_by(
+        'exam__exam_date', 'exam_id',
+    ).values_list('exam__group_id', 'student_id', 'score').iterator():
+        students = groups.setdefault(group_id, {})
+        count, total, _latest = students.get(student_id, (0, 0, None))
+        students[student_id] = (count + 1, total + score, score)
+
+    recommendations = []
+    for group_id, students in groups.items():
+        result_count = sum(count for count, _total, _latest in students.values())
+        # Guruh o'rtachasi bilan solishtirish kamida 3 ta natijada
+        group_mean = (sum(total for _count, total, _latest in students.values()) / result_count
+                      if result_count >= 3 else None)
+        for student_id, (count, total, latest_score) in students.items():
+            if count < 2:
+                continue
+            previous_mean = (total - latest_score) / (count - 1)
+            trend = 'up' if latest_score > previous_mean else 'down' if latest_score < previous_mean else 'same'
+            above = latest_score > group_mean if group_mean is not None else None
+            recommendations.append(Recommendation(
+                group_id=group_id,
+                student_id=student_id,
+                suggestion=_suggestion(latest_score, previous_mean, trend, above),
+                latest_score=latest_score,
+                previous_mean=previous_mean,
+                trend=trend,
+                group_mean=group_mean,
+                above_group_mean=above,
+            ))
+    Recommendation.objects.using(db).bulk_create(recommendations, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_job_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_legacy_recommendations, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='recommendation',
+            name='group',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='myapp.group'),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='latest_score',
+            field=models.IntegerField(),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='previous_mean',
+            field=models.FloatField(),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='trend',
+            field=models.CharField(choices=[('up', "O'smoqda"), ('down', 'Pasaymoqda'), ('same', "O'zgarmagan")], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='group_mean',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='above_group_mean',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddConstraint(
+            model_name='recommendation',
+            constraint=models.UniqueConstraint(fields=('group', 'student'), name='recommendation_unique_student'),
+        ),
+        # Qatorlar sxema o'zgarishlaridan keyin yoziladi (PostgreSQL: ALTER dan oldin pending trigger bo'lmasligi kerak)
+        migrations.RunPython(build_recommendations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations
+
+
+# SQLite: FTS5 jadvali trigram tokenizatori bilan qayta yaratiladi - unicode61 faqat so'z boshidan
+# (prefiks) topardi, trigram esa icontains kabi istalgan qismdan ("ov" -> "Karimov")
+TRIGRAM_FORWARD = [
+    "CREATE VIRTUAL TABLE myapp_profile_fts USING fts5("
+    "familiya, ismi, content='myapp_profile', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER myapp_profile_fts_ai AFTER INSERT ON myapp_profile BEGIN "
+    "INSERT INTO myapp_profile_fts(rowid, familiya, ismi) VALUES (new.id, new.familiya, new.ismi); END",
+    "CREATE TRIGGER myapp_profile_fts_ad AFTER DELETE ON myapp_profile BEGIN "
+    "INSERT INTO myapp_profile_fts(myapp_profile_fts, rowid, familiya, ismi) "
+    "VALUES ('delete', old.id, old.familiya, old.ismi); END",
+    "CREATE TRIGGER myapp_profile_fts_au AFTER UPDATE ON myapp_profile BEGIN "
+    "INSERT INTO myapp_profile_fts(myapp_profile_fts, rowid, familiya, ismi) "
+    "VALUES ('delete', old.id, old.familiya, old.ismi); "
+    "INSERT INTO myapp_profile_fts(rowid, familiya, ismi) VALUES (new.id, new.familiya, new.ismi); END",
+    "INSERT INTO myapp_profile_fts(myapp_profile_fts) VALUES ('rebuild')",
+]
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS myapp_profile_fts_ai",
+    "DROP TRIGGER IF EXISTS myapp_profile_fts_ad",
+    "DROP TRIGGER IF EXISTS myapp_profile_fts_au",
+    "DROP TABLE IF EXISTS myapp_profile_fts",
+]
+# trigram tokenizatori SQLite 3.34 dan boshlab mavjud
+TRIGRAM_MIN_SQLITE_VERSION = (3, 34)
+
+
+def _has_fts_table(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'myapp_profile_fts'")
+    return cursor.fetchone() is not None
+
+
+def use_trigram_tokenizer(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if not _has_fts_table(cursor):
+            # FTS5 siz SQLite - qidiruv icontains bilan ishlaydi
+            return
+    statements = DROP_FTS
+    if connection.Database.sqlite_version_info >= TRIGRAM_MIN_SQLITE_VERSION:
+        statements = statements + TRIGRAM_FORWARD
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def use_unicode61_tokenizer(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if not _has_fts_table(cursor):
+            return
+    for statement in DROP_FTS + [statement.replace("tokenize='trigram'", "tokenize='unicode61 remove_diacritics 2'")
+                                 for statement in TRIGRAM_FORWARD]:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_recommendation_metrics'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_trigram_tokenizer, use_unicode61_tokenizer),
+    ]
@@ -2,17 +2,30 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.timezone import now
 
+from myapp.youtube import parse_youtube_id
+
 
 class CustomUser(AbstractUser):
     bio = models.TextField(blank=True, null=True)
     is_teacher = models.BooleanField(default=False)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Qisman indekslar: talabalar ro'yxatlari (o'qituvchi va admin emas)
+            models.Index(fields=['id'], condition=models.Q(is_teacher=False, is_superuser=False),
+                         name='user_student_idx'),
+            # Baholanadigan o'quvchilar (group_roster, guruh a'zolari soni)
+            models.Index(fields=['id'], condition=models.Q(is_active=True, is_staff=False, is_superuser=False),
+                         name='user_active_learner_idx'),
+        ]
+
 
 class Group(models.Model):
     name = models.CharField(max_length=100)
     information = models.TextField(blank=True, null=True)
     created_time = models.DateTimeField(auto_now_add=True)
-    students = models.ManyToManyField('Profile', related_name='profile_group', blank=True)
+    # Guruh a'zoligining yagona manbai - ProfileGroup jadvali (myapp.membership)
+    students = models.ManyToManyField('Profile', through='ProfileGroup', related_name='profile_group', blank=True)
     objects = models.Manager()
 
     def __str__(self):
@@ -26,15 +39,30 @@ class Profile(models.Model):
     telefon = models.CharField(max_length=15, blank=True, null=True)
     added_time = models.DateTimeField(default=now)
     rasm = models.ImageField(upload_to='users_img', blank=True, null=True)
-
-    # Guruhlarni ManyToMany orqali bog'lash, va 'through' parametri bilan ProfileGroup modelini ko'rsatish
-    guruhlar = models.ManyToManyField(Group, through='ProfileGroup', related_name='group_profiles', blank=True)
+    # Yuklashda bir marta yaratiladigan kichraytirilgan nusxalar (myapp.images)
+    rasm_medium = models.ImageField(upload_to='users_img', blank=True, null=True)
+    rasm_small = models.ImageField(upload_to='users_img', blank=True, null=True)
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Ro'yxatlardagi (familiya, ismi, id) tartibi va kursorli sahifalash uchun
+            models.Index(fields=['familiya', 'ismi', 'id'], name='profile_name_order_idx'),
+        ]
+
     def __str__(self):
         return f"{self.ismi} {self.familiya}"
 
+    @property
+    def avatar_small(self):
+        # Eski (qayta ishlanmagan) rasmlar uchun asl rasm ishlatiladi
+        return self.rasm_small or self.rasm
+
+    @property
+    def avatar_medium(self):
+        return self.rasm_medium or self.rasm
+
     # Guruhlar bilan bog‘lanish
     def add_to_group(self, group):
         ProfileGroup.objects.get_or_create(profile=self, group=group)
@@ -47,6 +75,12 @@ class ProfileGroup(models.Model):
 
     objects = models.Manager()
 
+    class Meta:
+        constraints = [
+            # Takroriy a'zolik bo'lmaydi; guruh a'zolari (group -> profile) ham shu indeksdan o'qiladi
+            models.UniqueConstraint(fields=['group', 'profile'], name='profilegroup_unique_membership'),
+        ]
+
     def __str__(self):
         return f"{self.profile} - {self.group}"
 
@@ -54,15 +88,33 @@ class ProfileGroup(models.Model):
 class Video(models.Model):
     title = models.CharField(max_length=255)  # Video sarlavhasi
     youtube_link = models.URLField()  # YouTube havolasi
+    youtube_id = models.CharField(max_length=64, blank=True, editable=False)  # Saqlashda havoladan olinadi
     is_general = models.BooleanField(default=False)  # Umumiy video yoki yo'q
     groups = models.ManyToManyField('Group', blank=True)  # Tanlangan guruhlar
     created_time = models.DateTimeField(auto_now_add=True)  # Video yuklangan vaqt
+    updated_at = models.DateTimeField(auto_now=True)  # Shartli javoblar (ETag/Last-Modified) uchun
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Talaba video lentasi: umumiy videolar, yangilari birinchi
+            models.Index(fields=['is_general', '-created_time'], name='video_general_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.youtube_id = parse_youtube_id(self.youtube_link)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # auto_now maydoni update_fields da ko'rsatilmasa yangilanmaydi
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+            if 'youtube_link' in update_fields:
+                kwargs['update_fields'].add('youtube_id')
+        super().save(*args, **kwargs)
+
 
 class Payments(models.Model):
     names_ful = models.ForeignKey(Profile, on_delete=models.SET_NULL, null=True)
@@ -83,9 +135,16 @@ class Payments(models.Model):
     money_summ = models.DecimalField(max_digits=10, decimal_places=2)  # To'lanadigan summa
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # To'langan summa
     payment_date = models.DateField(null=True, blank=True)  # To'lov qilingan sana
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Talaba (va oy) bo'yicha to'lovlar hamda qarzdorlar hisoboti uchun
+            models.Index(fields=['names_ful', 'month'], name='payments_student_month_idx'),
+        ]
+
     def __str__(self):
         # To'lov qiluvchi va oyni matn sifatida qaytarish
         if self.names_ful:
@@ -101,9 +160,18 @@ class Exam(models.Model):
     exam_date = models.DateTimeField()
     created_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Guruh imtihonlari sana bo'yicha (get_exams_by_group, talaba imtihonlari, eng oxirgi imtihon)
+            models.Index(fields=['group', 'exam_date'], name='exam_group_date_idx'),
+            # O'qituvchi yaratgan imtihonlar, yangilari birinchi (teacher_exams)
+            models.Index(fields=['created_by', '-created_at'], name='exam_creator_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.group.name} - {self.exam_date.strftime('%Y-%m-%d %H:%M')}"
 
@@ -112,6 +180,7 @@ class ExamResult(models.Model):
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='results')
     student = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='exam_results')
     score = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = models.Manager()
 
@@ -123,11 +192,102 @@ class ExamResult(models.Model):
 
 
 class Recommendation(models.Model):
+    """Talabaning guruhdagi natijalari bo'yicha tavsiya; baholashdan keyin butun guruh uchun hisoblanadi."""
+    TREND_UP = 'up'
+    TREND_DOWN = 'down'
+    TREND_SAME = 'same'
+    TREND_CHOICES = [
+        (TREND_UP, "O'smoqda"),
+        (TREND_DOWN, 'Pasaymoqda'),
+        (TREND_SAME, "O'zgarmagan"),
+    ]
+
     student = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='recommendations')
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='recommendations')
     suggestion = models.TextField()
+    latest_score = models.IntegerField()
+    previous_mean = models.FloatField()  # Oxirgi natijadan oldingi imtihonlar o'rtachasi
+    trend = models.CharField(max_length=10, choices=TREND_CHOICES)
+    group_mean = models.FloatField(null=True, blank=True)  # Guruhda natijalar kam bo'lsa hisoblanmaydi
+    above_group_mean = models.BooleanField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = models.Manager()
 
+    class Meta:
+        constraints = [
+            # Talaba va guruh uchun bitta (eng so'nggi) tavsiya; tavsiyalar sahifasi shu indeks bo'yicha o'qiydi
+            models.UniqueConstraint(fields=['group', 'student'], name='recommendation_unique_student'),
+        ]
+
     def __str__(self):
         return f"Recommendation for {self.student.ismi} {self.student.familiya}"
+
+
+class GroupStudentSummary(models.Model):
+    """Talabaning guruhdagi barcha imtihonlari bo'yicha yig'ma ko'rsatkichlari."""
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='student_summaries')
+    student = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='group_summaries')
+    result_count = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    score_mean = models.FloatField(null=True, blank=True)
+    latest_score = models.IntegerField(null=True, blank=True)
+    latest_exam_date = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        unique_together = ('group', 'student')
+
+    def __str__(self):
+        return f"{self.student} - {self.group} ({self.score_mean})"
+
+
+class Job(models.Model):
+    """Fon vazifasi (PDF, grafiklar): navbat jadvali, `manage.py run_jobs` bajaradi (myapp.jobs)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Navbatda'),
+        (RUNNING, 'Bajarilmoqda'),
+        (DONE, 'Tayyor'),
+        (FAILED, 'Xato'),
+    ]
+
+    kind = models.CharField(max_length=50)  # Bajaruvchi funksiya nomi (myapp.jobs.HANDLERS)
+    subject = models.CharField(max_length=100)  # Natija kimga/nimaga tegishli, masalan "student:12"
+    version = models.CharField(max_length=100, blank=True)  # Kirish ma'lumotlari versiyasi (digest)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=now)  # Qayta urinish kechiktirilganda
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    result = models.BinaryField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Worker navbatdagi vazifalarni oladi
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+            # Ma'lum obyekt uchun eng so'nggi natija
+            models.Index(fields=['kind', 'subject', 'status', '-finished_at'], name='job_subject_latest_idx'),
+        ]
+        constraints = [
+            # Bir xil vazifa bir vaqtda navbatda faqat bitta bo'ladi
+            models.UniqueConstraint(fields=['kind', 'subject', 'version'],
+                                    condition=models.Q(status__in=['queued', 'running']), name='job_unique_active'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.subject} ({self.get_status_display()})"
@@ -0,0 +1,140 @@
+import base64
+import json
+from functools import reduce
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def _encode_cursor(direction, values):
+    raw = json.dumps([direction, values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, size):
+    """(yo'nalish, qiymatlar) yoki buzilgan/soxta kursor uchun (None, None) - unda birinchi sahifa ochiladi."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None, None
+    if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != size:
+        return None, None
+    # Filtrga faqat oddiy qiymatlar (satr, son) tushadi: [{}, 1] kabi qiymatlar ORM da xato beradi
+    if not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in values):
+        return None, None
+    return direction, values
+
+
+def _resolve(obj, field):
+    for attr in field.split('__'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_query = None
+        self.previous_query = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Kursor (keyset) asosidagi sahifalash. OFFSET ishlatilmaydi: har bir sahifa
+    oldingi sahifaning oxirgi qatoridan keyingi qatorlarni indeks bo'yicha oladi,
+    shuning uchun 200-sahifa ham 1-sahifa kabi tez ochiladi.
+    `ordering` oxirida yagona maydon (masalan 'id') bo'lishi shart.
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.page_size = page_size
+
+    def _seek(self, values, forward):
+        # (a, b, c) > (x, y, z) shartini ustunlar bo'yicha yoyish
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            ascending = not field.startswith('-')
+            lookup = 'gt' if ascending == forward else 'lt'
+            equal = {f.lstrip('-'): value for f, value in zip(self.ordering[:index], values)}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': values[index]}))
+        return reduce(lambda a, b: a | b, conditions)
+
+    def _reversed_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def _values(self, obj):
+        return [_resolve(obj, field.lstrip('-')) for field in self.ordering]
+
+    def page(self, cursor=None):
+        direction, values = _decode_cursor(cursor, len(self.ordering)) if cursor else (None, None)
+        if direction is not None:
+            try:
+                seek = self.queryset.filter(self._seek(values, forward=direction == 'next'))
+            except (ValueError, TypeError, ValidationError):
+                # Qiymat maydon turiga mos emas (masalan, id o'rnida satr) - birinchi sahifa
+                direction = None
+
+        if direction == 'prev':
+            queryset = seek.order_by(*self._reversed_ordering())
+            rows = list(queryset[:self.page_size + 1])
+            has_more = len(rows) > self.page_size
+            rows = rows[:self.page_size][::-1]
+            has_previous, has_next = has_more, True
+        else:
+            queryset = (seek if direction == 'next' else self.queryset).order_by(*self.ordering)
+            rows = list(queryset[:self.page_size + 1])
+            has_next = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+            has_previous = direction == 'next'
+
+        next_cursor = _encode_cursor('next', self._values(rows[-1])) if rows and has_next else None
+        previous_cursor = _encode_cursor('prev', self._values(rows[0])) if rows and has_previous else None
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+def paginate(request, queryset, ordering):
+    """
+    So'rovdagi `cursor` va `page_size` parametrlari bo'yicha sahifani qaytaradi.
+    Sahifa havolalari boshqa GET parametrlarini (qidiruv va h.k.) saqlaydi.
+    """
+    default_size = getattr(settings, 'PAGINATION_PAGE_SIZE', 50)
+    max_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 200)
+    try:
+        page_size = int(request.GET.get('page_size', default_size))
+    except ValueError:
+        page_size = default_size
+    page_size = min(max(page_size, 1), max_size)
+
+    page = KeysetPaginator(queryset, ordering, page_size).page(request.GET.get('cursor'))
+
+    for attr, cursor in (('next_query', page.next_cursor), ('previous_query', page.previous_cursor)):
+        if cursor:
+            params = request.GET.copy()
+            params['cursor'] = cursor
+            setattr(page, attr, params.urlencode())
+    return page
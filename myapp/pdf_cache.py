@@ -0,0 +1,58 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+PDF_CACHE_TIMEOUT = getattr(settings, 'PAYMENTS_PDF_CACHE_TIMEOUT', 60 * 60 * 24 * 30)
+
+
+def payments_digest(student, payments):
+    """To'lov qatorlari va talaba ismidan hisoblangan kontent xeshi (PDF mazmunini to'liq belgilaydi)."""
+    digest = hashlib.sha256()
+    digest.update(f"{student.ismi}|{student.familiya}".encode())
+    for payment in payments:
+        digest.update(
+            f"\n{payment.id}|{payment.month}|{payment.money_summ}|{payment.amount_paid}|{payment.payment_date}".encode()
+        )
+    return digest.hexdigest()
+
+
+def _pdf_key(digest):
+    return f'payments_pdf:{digest}'
+
+
+def _student_key(student_id):
+    return f'payments_pdf_student:{student_id}'
+
+
+def cached_payments_pdf(digest):
+    return cache.get(_pdf_key(digest))
+
+
+def store_payments_pdf(student_id, digest, pdf):
+    cache.set(_pdf_key(digest), pdf, PDF_CACHE_TIMEOUT)
+    cache.set(_student_key(student_id), digest, PDF_CACHE_TIMEOUT)
+
+
+def build_cached_payments_pdf(student, payments):
+    """
+    PDF ni keshdan oladi, bo'lmasa yaratib keshga yozadi (fon vazifasi - myapp.jobs).
+    (digest, pdf) qaytaradi: digest aynan shu PDF yaratilgan to'lov qatorlariniki.
+    """
+    digest = payments_digest(student, payments)
+    pdf = cached_payments_pdf(digest)
+    if pdf is None:
+        # reportlab faqat PDF birinchi marta yaratilganda yuklanadi
+        from myapp.reports import build_payments_pdf
+
+        pdf = build_payments_pdf(student, payments).getvalue()
+        store_payments_pdf(student.id, digest, pdf)
+    return digest, pdf
+
+
+def invalidate_payments_pdf(student_id):
+    """Talabaning keshdagi PDF ini o'chiradi (to'lov saqlanganda yoki o'chirilganda)."""
+    digest = cache.get(_student_key(student_id))
+    if digest:
+        cache.delete_many([_pdf_key(digest), _student_key(student_id)])
@@ -0,0 +1,118 @@
+import contextvars
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.backends.django import DjangoTemplates
+
+
+METRICS = ('queries', 'sql_ms', 'view_ms', 'render_ms')
+PIDS_KEY = 'perf:pids'
+PUBLISH_INTERVAL = 10  # soniya
+
+# Joriy so'rovdagi shablon render vaqti (ms) uchun [qiymat] konteyner; None - so'rov o'lchanmayapti
+render_time = contextvars.ContextVar('render_time', default=None)
+
+
+class TimedTemplate:
+    """Backend shablonini o'rab, render vaqtini joriy so'rov hisobiga qo'shadi."""
+
+    def __init__(self, template):
+        self.template = template
+        self.backend = template.backend
+        self.origin = template.origin
+
+    def render(self, context=None, request=None):
+        timer = render_time.get()
+        if timer is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            timer[0] += (time.perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Render vaqtini o'lchaydigan DjangoTemplates backendi."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples_by_view):
+    """{view: [namuna, ...]} dan har bir ko'rsatkich uchun p50/p95/p99 hisoblaydi."""
+    summary = {}
+    for view_name, samples in samples_by_view.items():
+        row = {'count': len(samples)}
+        for metric in METRICS:
+            values = sorted(sample[metric] for sample in samples)
+            row[metric] = {
+                'p50': _percentile(values, 0.50),
+                'p95': _percentile(values, 0.95),
+                'p99': _percentile(values, 0.99),
+            }
+        summary[view_name] = row
+    return summary
+
+
+class PerfStats:
+    """
+    Har bir URL nomi uchun oxirgi N ta namunani saqlaydi (aylanma oyna).
+    Namunalar vaqti-vaqti bilan keshga yoziladi, shunda boshqa jarayonlar
+    (staff sahifasi, manage.py perf_stats) barcha workerlar statistikasini ko'ra oladi.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+        self._last_publish = 0.0
+
+    def record(self, view_name, **metrics):
+        with self._lock:
+            self._samples[view_name].append(metrics)
+            should_publish = time.monotonic() - self._last_publish > PUBLISH_INTERVAL
+            if should_publish:
+                self._last_publish = time.monotonic()
+                snapshot = {name: list(samples) for name, samples in self._samples.items()}
+        if should_publish:
+            self._publish(snapshot)
+
+    def local_samples(self):
+        with self._lock:
+            return {name: list(samples) for name, samples in self._samples.items()}
+
+    @staticmethod
+    def _publish(snapshot):
+        pid = os.getpid()
+        cache.set(f'perf:samples:{pid}', snapshot, 60 * 60 * 24)
+        pids = cache.get(PIDS_KEY) or []
+        if pid not in pids:
+            cache.set(PIDS_KEY, (pids + [pid])[-64:], 60 * 60 * 24)
+
+    def collect(self):
+        """Barcha workerlar namunalarini birlashtirib, foizlik ko'rsatkichlarni qaytaradi."""
+        merged = defaultdict(list)
+        snapshots = cache.get_many([f'perf:samples:{pid}' for pid in cache.get(PIDS_KEY) or []])
+        snapshots[f'perf:samples:{os.getpid()}'] = self.local_samples()
+        for snapshot in snapshots.values():
+            for view_name, samples in snapshot.items():
+                merged[view_name].extend(samples)
+        return summarize(merged)
+
+
+perf_stats = PerfStats(window=getattr(settings, 'PERF_WINDOW', 500))
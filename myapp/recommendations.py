@@ -0,0 +1,94 @@
+from myapp.models import Recommendation
+
+
+NOT_ENOUGH_RESULTS = "Imtihon natijalaringiz hali yetarli emas. Iltimos, yangi imtihonlarga qatnashing."
+# Guruh o'rtachasi bilan solishtirish uchun guruhdagi natijalar soni kamida shuncha bo'lishi kerak
+MIN_GROUP_RESULTS = 3
+
+# np.sign(oxirgi natija - oldingi o'rtacha) -> trend
+TRENDS = {1: Recommendation.TREND_UP, -1: Recommendation.TREND_DOWN, 0: Recommendation.TREND_SAME}
+
+RECOMMENDATION_FIELDS = [
+    'suggestion', 'latest_score', 'previous_mean', 'trend', 'group_mean', 'above_group_mean', 'updated_at',
+]
+
+
+def build_suggestion(latest_score, previous_mean, trend, above_group_mean):
+    """Tavsiya matni; above_group_mean None bo'lsa guruh o'rtachasi bilan solishtirilmaydi."""
+    if trend == Recommendation.TREND_UP:
+        suggestion = (
+            f"So‘nggi natijangiz ({latest_score}) oldingi o‘rtacha ({previous_mean:.1f}) natijangizdan yuqori! "
+            "O‘zlashtirishingiz yaxshilanmoqda. Davom eting!"
+        )
+    elif trend == Recommendation.TREND_DOWN:
+        suggestion = (
+            f"So‘nggi natijangiz ({latest_score}) oldingi o‘rtacha ({previous_mean:.1f}) natijangizdan past. "
+            "Mavzularni qayta ko‘rib chiqishingizni tavsiya qilamiz."
+        )
+    else:
+        suggestion = (
+            f"So‘nggi natijangiz ({latest_score}) oldingi o‘rtacha ({previous_mean:.1f}) natijangizga teng. "
+            "O‘zlashtirishni davom ettiring va yuqori natijalarga erishishga harakat qiling."
+        )
+
+    if above_group_mean is True:
+        suggestion += (
+            " Guruhingizdagi o'quvchilardan o'zlashtirishingiz yaxshi. Agar shu tarzda ketsangiz, muvaffaqiyatlaringiz yanada oshadi!"
+        )
+    elif above_group_mean is False:
+        suggestion += (
+            " Guruhingizdagi o'quvchilarning o'rtacha natijasidan biroz pastroqdasiz. Harakatni kuchaytirishingiz kerak!"
+        )
+    return suggestion
+
+
+def refresh_recommendations(group_id, analytics=None):
+    """
+    Guruhdagi barcha talabalar tavsiyalarini bitta o'tishda qayta hisoblaydi: trend, oldingi o'rtacha
+    va guruh o'rtachasi bilan solishtirish GroupAnalytics massivlaridan, natija bitta DELETE va bitta
+    bulk upsert bilan yoziladi. Kamida ikki natijasi bor talabalar uchungina tavsiya yoziladi.
+    """
+    # NumPy faqat baholash vaqtida kerak, ishga tushishda yuklanmaydi
+    import numpy as np
+
+    if analytics is None:
+        from myapp.analytics import load_group_analytics
+
+        analytics, _latest_dates = load_group_analytics(group_id)
+
+    group_mean = analytics.group_mean if int(analytics.counts.sum()) >= MIN_GROUP_RESULTS else None
+    # Bitta natijasi bor talabalarda oldingi o'rtacha yo'q (NaN)
+    eligible = analytics.counts >= 2
+    latest_scores = analytics.latest_scores[eligible]
+    above_group_mean = (latest_scores > group_mean).tolist() if group_mean is not None else [None] * len(latest_scores)
+
+    recommendations = []
+    for student_id, latest_score, previous_mean, trend, above in zip(
+        analytics.students[eligible].tolist(),
+        latest_scores.tolist(),
+        analytics.previous_means[eligible].tolist(),
+        np.sign(analytics.trends[eligible]).astype(int).tolist(),
+        above_group_mean,
+    ):
+        trend = TRENDS[trend]
+        recommendations.append(Recommendation(
+            group_id=group_id,
+            student_id=student_id,
+            suggestion=build_suggestion(latest_score, previous_mean, trend, above),
+            latest_score=latest_score,
+            previous_mean=previous_mean,
+            trend=trend,
+            group_mean=group_mean,
+            above_group_mean=above,
+        ))
+
+    Recommendation.objects.filter(group_id=group_id).exclude(
+        student_id__in=[recommendation.student_id for recommendation in recommendations]
+    ).delete()
+    Recommendation.objects.bulk_create(
+        recommendations,
+        update_conflicts=True,
+        unique_fields=['group', 'student'],
+        update_fields=RECOMMENDATION_FIELDS,
+    )
+    return len(recommendations)
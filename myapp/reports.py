@@ -0,0 +1,56 @@
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+
+
+def build_payments_pdf(student, payments):
+    """Talabaning to'lovlar ro'yxatini PDF ko'rinishida tayyorlaydi va buferni qaytaradi."""
+    # PDF faylni yaratish uchun bufer
+    buffer = BytesIO()
+    pdf = SimpleDocTemplate(buffer, pagesize=letter)
+
+    # Sarlavha matni
+    styles = getSampleStyleSheet()
+    title = f"{student.ismi} {student.familiya} - To\'lov Ro'yxati"
+    title_paragraph = Paragraph(title, styles['Title'])
+
+    # Jadval uchun sarlavha va ma'lumotlar
+    data = [
+        ["No", "Oy", "To\'lanadigan summa", "To\'langan summa", "To\'lov sanasi"]
+    ]
+
+    for idx, payment in enumerate(payments, start=1):
+        data.append([
+            idx,
+            payment.month,
+            f"{payment.money_summ} so\'m",
+            f"{payment.amount_paid} so\'m",
+            payment.payment_date.strftime('%d-%m-%Y') if payment.payment_date else "—",
+        ])
+
+    # Jadvalni yaratish
+    table = Table(data, colWidths=[30, 100, 150, 150, 150])
+
+    # Jadval stilini o'rnatish
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),  # Sarlavha qatori foni
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),  # Sarlavha matni rangi
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),  # Markazlashgan matn
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),  # Sarlavha uchun shrift
+        ('FONTSIZE', (0, 0), (-1, 0), 12),  # Sarlavha shrift o'lchami
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),  # Sarlavha pastki bo'shligi
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),  # Jadval satrlari foni
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),  # Chegara chiziqlari
+    ])
+    table.setStyle(style)
+
+    # PDF elementlarini yig'ish
+    elements = [title_paragraph, table]
+
+    # PDFni yaratish
+    pdf.build(elements)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,103 @@
+import operator
+from functools import reduce
+
+from django.db import connections
+from django.db.models import Q, Value, IntegerField, Case, When, F
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat
+
+
+PROFILE_FTS_TABLE = 'myapp_profile_fts'
+
+
+def _sqlite_fts_available(connection):
+    # FTS5 jadvali migratsiyada yaratiladi; SQLite FTS5 siz yig'ilgan bo'lsa jadval bo'lmaydi
+    if not hasattr(connection, '_profile_fts_available'):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [PROFILE_FTS_TABLE])
+            connection._profile_fts_available = cursor.fetchone() is not None
+    return connection._profile_fts_available
+
+
+# O'zbekcha o‘ va g‘ dagi tutuq belgisi turlicha yoziladi - qidiruvda hammasi bir xil hisoblanadi
+APOSTROPHES = "'‘’ʻʼ`"
+
+# FTS5 trigram indeksi 3 belgidan qisqa bo'lakni topa olmaydi - bunday so'zlar icontains bilan qidiriladi
+FTS_MIN_TOKEN_LENGTH = 3
+
+# PostgreSQL trigram o'xshashligi (0..1) shu ko'paytuvchi bilan butun songa aylantiriladi
+RANK_SCALE = 1000
+
+
+def _variants(token):
+    """So'zning tutuq belgisi har xil yozilgan variantlari (belgisi bo'lmasa so'zning o'zi)."""
+    if not any(char in APOSTROPHES for char in token):
+        return [token]
+    canonical = token.translate({ord(char): "'" for char in APOSTROPHES})
+    return [canonical.replace("'", char) for char in APOSTROPHES]
+
+
+def _fts_match_expression(tokens):
+    # Har bir so'z ism yoki familiyaning istalgan joyida (trigram); qo'shtirnoqlar ikkilantiriladi
+    return ' AND '.join(
+        '({})'.format(' OR '.join('"{}"'.format(variant.replace('"', '""')) for variant in _variants(token)))
+        for token in tokens
+    )
+
+
+def _any_variant(token, lookups):
+    return reduce(operator.or_, (Q(**{lookup: variant}) for variant in _variants(token) for lookup in lookups))
+
+
+def search_profiles(queryset, query, prefix=''):
+    """
+    Ism va familiya bo'yicha qidiruv: har bir so'z ism yoki familiyaning istalgan qismida bo'lishi kerak
+    ("ov" - "Karimov"), shuning uchun "ismi familiya" har qanday tartibda mos keladi.
+    queryset Profile yoki Profile ga bog'langan model bo'lishi mumkin (prefix='student__', 'profile__').
+    Natijalarga `search_rank` qo'shiladi va ular moslik darajasi bo'yicha saralanadi.
+    """
+    tokens = query.split()
+    if not tokens:
+        return queryset
+
+    connection = connections[queryset.db]
+    familiya, ismi = f'{prefix}familiya', f'{prefix}ismi'
+
+    if connection.vendor == 'sqlite' and _sqlite_fts_available(connection):
+        indexed = [token for token in tokens if len(token) >= FTS_MIN_TOKEN_LENGTH]
+        if indexed:
+            queryset = queryset.filter(**{f'{prefix}id__in': RawSQL(
+                f"SELECT rowid FROM {PROFILE_FTS_TABLE} WHERE {PROFILE_FTS_TABLE} MATCH %s",
+                [_fts_match_expression(indexed)],
+            )})
+        tokens_to_filter = [token for token in tokens if len(token) < FTS_MIN_TOKEN_LENGTH]
+    else:
+        tokens_to_filter = tokens
+    # PostgreSQL da UPPER(...) LIKE shartlari pg_trgm GIN indeksidan foydalanadi
+    for token in tokens_to_filter:
+        queryset = queryset.filter(_any_variant(token, [f'{familiya}__icontains', f'{ismi}__icontains']))
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db.models.functions import Cast, Greatest, Round
+
+        # Kursorli sahifalash rank ni JSON kursorda qaytaradi: float4 o'xshashlik Python float dan qaytib
+        # aniq taqqoslanmaydi (sahifa chegarasida qator tushib qoladi yoki takrorlanadi), shuning uchun butun son
+        rank = Cast(Round(Greatest(
+            TrigramSimilarity(Concat(F(familiya), Value(' '), F(ismi)), query),
+            TrigramSimilarity(Concat(F(ismi), Value(' '), F(familiya)), query),
+        ) * RANK_SCALE), IntegerField())
+    else:
+        # Boshqa bazalarda: so'z ism yoki familiyaning o'zi bo'lsa 2, boshidan mos kelsa 1 ball.
+        # Shunda "Aziz Karimov" so'rovida Karimov Aziz, Karimova Aziza dan oldin turadi
+        rank = sum(
+            Case(
+                When(_any_variant(token, [f'{familiya}__iexact', f'{ismi}__iexact']), then=Value(2)),
+                When(_any_variant(token, [f'{familiya}__istartswith', f'{ismi}__istartswith']), then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            for token in tokens
+        )
+
+    return queryset.annotate(search_rank=rank).order_by('-search_rank', familiya, ismi, f'{prefix}id')
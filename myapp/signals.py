@@ -0,0 +1,158 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+# ProfileGroup uchun post_delete qabul qiluvchisi yo'q: shunda a'zoliklarni o'chirish bitta DELETE
+# bilan bajariladi (myapp.membership), keshlar esa m2m_changed orqali yangilanadi
+
+from myapp.caching import bump_namespace
+from myapp.dashboard import invalidate_dashboards, invalidate_group_dashboards
+from myapp.middleware import invalidate_profile_cache
+from myapp.models import CustomUser, Exam, ExamResult, Group, Profile, ProfileGroup, Payments, Video
+from myapp.pdf_cache import invalidate_payments_pdf
+from myapp.summaries import refresh_group_summaries
+
+
+@receiver([post_save, post_delete], sender=Group)
+@receiver(post_delete, sender=Profile)
+@receiver(post_save, sender=ProfileGroup)
+@receiver(m2m_changed, sender=Group.students.through)
+def invalidate_group_directory(sender, **kwargs):
+    # Guruhlar ro'yxati va a'zolar soni o'zgardi
+    bump_namespace('groups')
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_group_directory_on_user_status(sender, instance, update_fields=None, **kwargs):
+    # Kirishda faqat last_login yangilanadi - bu guruhlar ro'yxatiga ta'sir qilmaydi
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_namespace('groups')
+
+
+@receiver([post_save, post_delete], sender=Payments)
+def invalidate_student_payments_pdf(sender, instance, **kwargs):
+    if instance.names_ful_id:
+        invalidate_payments_pdf(instance.names_ful_id)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_request_profile(sender, instance, **kwargs):
+    invalidate_profile_cache(instance.user_id)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=ProfileGroup)
+@receiver(m2m_changed, sender=Group.students.through)
+def invalidate_request_group_ids(sender, **kwargs):
+    # Guruh a'zoligi o'zgardi - keshdagi guruhlar ro'yxatlari eskiradi
+    bump_namespace('profiles')
+
+
+@receiver([post_save, post_delete], sender=Video)
+@receiver(m2m_changed, sender=Video.groups.through)
+@receiver(post_delete, sender=Group)
+def invalidate_video_feeds(sender, **kwargs):
+    # Video yoki uning guruhlari o'zgardi - barcha talabalar lentasi qayta hisoblanadi
+    bump_namespace('videos')
+
+
+@receiver([post_save, post_delete], sender=Payments)
+def invalidate_payer_dashboard(sender, instance, **kwargs):
+    invalidate_dashboards([instance.names_ful_id])
+
+
+class _ResultsChanged:
+    """
+    Bitta tranzaksiyadagi natija va imtihon o'zgarishlari. Commit dan keyin har bir guruh yig'malari
+    bir marta qayta hisoblanadi (imtihon o'chirilganda har bir natija uchun alohida signal keladi).
+    """
+
+    def __init__(self):
+        self.group_ids = set()
+        self.exam_ids = set()
+        self.student_ids = set()
+        self.dashboard_group_ids = set()
+
+    def __call__(self):
+        # O'chirilgan imtihonlar topilmaydi - ularning guruhi group_ids da
+        exam_group_ids = set(Exam.objects.filter(id__in=self.exam_ids).values_list('group_id', flat=True))
+        for group_id in self.group_ids | exam_group_ids:
+            refresh_group_summaries(group_id)
+
+        invalidate_dashboards(self.student_ids)
+        for group_id in self.dashboard_group_ids:
+            invalidate_group_dashboards(group_id)
+
+
+def _after_results_commit(using, group_ids=(), exam_ids=(), student_ids=(), dashboard_group_ids=()):
+    connection = transaction.get_connection(using)
+    batch = getattr(connection, 'myapp_results_changed', None)
+    # Shu savepoint darajasida kutayotgan callback bo'lsa, o'zgarishlar unga qo'shiladi. Orqaga
+    # qaytarilgan tranzaksiyaning callback i ro'yxatdan chiqariladi - unda yangisi ochiladi
+    savepoint_ids = set(connection.savepoint_ids)
+    pending = batch is not None and any(
+        func is batch and sids == savepoint_ids for sids, func, _robust in connection.run_on_commit
+    )
+    if not pending:
+        batch = connection.myapp_results_changed = _ResultsChanged()
+
+    batch.group_ids.update(group_ids)
+    batch.exam_ids.update(exam_ids)
+    batch.student_ids.update(student_ids)
+    batch.dashboard_group_ids.update(dashboard_group_ids)
+    if not pending:
+        # Tranzaksiyadan tashqarida darhol bajariladi
+        transaction.on_commit(batch, using=using)
+
+
+@receiver([post_save, post_delete], sender=ExamResult)
+def refresh_result_summaries(sender, instance, using, **kwargs):
+    # Admin yoki boshqa tahrir (save_exam_scores bulk_create signal yubormaydi va o'zi yangilaydi)
+    _after_results_commit(using, exam_ids=[instance.exam_id], student_ids=[instance.student_id])
+
+
+@receiver(post_save, sender=Exam)
+def refresh_exam_summaries(sender, instance, created, using, **kwargs):
+    # Yangi imtihonda hali natija yo'q - faqat bosh sahifadagi yaqinlashayotgan imtihonlar o'zgaradi.
+    # Sana o'zgarsa talabalarning "so'nggi natija"si boshqa bo'lishi mumkin
+    _after_results_commit(using, exam_ids=[] if created else [instance.id], dashboard_group_ids=[instance.group_id])
+
+
+@receiver(post_delete, sender=Exam)
+def refresh_deleted_exam_group(sender, instance, using, **kwargs):
+    _after_results_commit(using, group_ids=[instance.group_id], dashboard_group_ids=[instance.group_id])
+
+
+@receiver(post_save, sender=ProfileGroup)
+def invalidate_member_dashboard(sender, instance, **kwargs):
+    invalidate_dashboards([instance.profile_id])
+
+
+@receiver(m2m_changed, sender=Group.students.through)
+def invalidate_member_dashboards(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        invalidate_dashboards([instance.pk])
+    elif pk_set:
+        invalidate_dashboards(pk_set)
+    elif action == 'post_clear':
+        bump_namespace('dashboard')
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_all_dashboards(sender, **kwargs):
+    # Guruh nomi o'zgardi yoki guruh o'chirildi - a'zolar ro'yxati endi mavjud bo'lmasligi mumkin
+    bump_namespace('dashboard')
+
+
+@receiver(m2m_changed, sender=Video.groups.through)
+def touch_regrouped_videos(sender, instance, action, reverse, pk_set, **kwargs):
+    # Guruhlar o'zgarishi videoni saqlamaydi - updated_at (ETag uchun) qo'lda yangilanadi
+    if not action.startswith('post_'):
+        return
+    video_ids = pk_set if reverse else [instance.pk]
+    if video_ids:
+        Video.objects.filter(pk__in=video_ids).update(updated_at=timezone.now())
@@ -0,0 +1,29 @@
+// Fon vazifasi (myapp.jobs) tayyor bo'lguncha holatini so'rab turadi.
+// <div data-job-status-url="..." data-job-done-url="..."> - tayyor bo'lsa done-url ga o'tadi (yo'q bo'lsa sahifa yangilanadi)
+
+document.querySelectorAll('[data-job-status-url]').forEach(function (element) {
+    var delay = 1000;
+
+    function poll() {
+        fetch(element.dataset.jobStatusUrl, {headers: {'Accept': 'application/json'}})
+            .then(function (response) { return response.json(); })
+            .then(function (job) {
+                if (job.status === 'done') {
+                    element.textContent = element.dataset.jobDoneText || 'Tayyor.';
+                    if (element.dataset.jobDoneUrl) {
+                        window.location.href = element.dataset.jobDoneUrl;
+                    } else {
+                        window.location.reload();
+                    }
+                } else if (job.status === 'failed') {
+                    element.textContent = "Xato yuz berdi. Birozdan so'ng qayta urinib ko'ring.";
+                } else {
+                    delay = Math.min(delay * 1.5, 10000);
+                    setTimeout(poll, delay);
+                }
+            })
+            .catch(function () { setTimeout(poll, 10000); });
+    }
+
+    setTimeout(poll, delay);
+});
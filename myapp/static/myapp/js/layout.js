@@ -0,0 +1,41 @@
+// Barcha sahifalar uchun umumiy: yon menyu, profil menyusi va imtihonlar ro'yxati
+
+function closeStudentList() {
+    var menu = document.querySelector('.infor_1');
+    var studentList = document.getElementById('student-list');
+
+    menu.classList.remove('open'); // `infor_1` ni yopish
+    studentList.style.display = 'block'; // `infor_3` ni qayta ko'rsatish
+}
+
+function toggleMenu() {
+    var menu = document.querySelector('.infor_1');
+    var container = document.querySelector('.container');
+
+    if (menu.classList.contains('open')) {
+        menu.classList.remove('open'); // Infor_1 ni yopish
+        container.classList.remove('shifted'); // Container marginni qaytarish
+    } else {
+        menu.classList.add('open'); // Infor_1 ni ochish
+        container.classList.add('shifted'); // Containerni siljitish
+    }
+}
+
+function togglemenu() {
+    const menu = document.getElementById('profileMenu');
+    menu.style.display = menu.style.display === 'block' ? 'none' : 'block';
+}
+
+function toggleDropdown() {
+    var menu = document.getElementById('examMenu');
+    menu.style.display = menu.style.display === 'block' ? 'none' : 'block';
+}
+
+// Profil menyusidan tashqariga bosilganda menyuni yopish
+window.addEventListener('click', function(event) {
+    const menu = document.getElementById('profileMenu');
+    const profile = document.querySelector('.profile1');
+    if (menu && profile && !profile.contains(event.target)) {
+        menu.style.display = 'none';
+    }
+});
@@ -0,0 +1,73 @@
+from django.db import transaction
+
+from myapp.charts import chart_cache
+from myapp.models import Exam, GroupStudentSummary, Recommendation
+from myapp.recommendations import refresh_recommendations
+
+
+SUMMARY_FIELDS = ['result_count', 'score_sum', 'score_mean', 'latest_score', 'latest_exam_date', 'updated_at']
+
+
+def refresh_student_summaries(group_id, analytics, latest_dates):
+    """Guruhdagi barcha talabalar uchun yig'ma qatorlarni bitta o'tishda yangilaydi (load_group_analytics dan)."""
+    summaries = [
+        GroupStudentSummary(
+            group_id=group_id,
+            student_id=student_id,
+            result_count=count,
+            score_sum=score_sum,
+            score_mean=score_mean,
+            latest_score=latest_score,
+            latest_exam_date=latest_date,
+        )
+        for student_id, count, score_sum, score_mean, latest_score, latest_date in zip(
+            analytics.students.tolist(),
+            analytics.counts.tolist(),
+            analytics.sums.tolist(),
+            analytics.means.tolist(),
+            analytics.latest_scores.tolist(),
+            latest_dates,
+        )
+    ]
+
+    GroupStudentSummary.objects.filter(group_id=group_id).exclude(
+        student_id__in=analytics.students.tolist()
+    ).delete()
+    GroupStudentSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['group', 'student'],
+        update_fields=SUMMARY_FIELDS,
+    )
+
+
+def refresh_group_analytics(group_id):
+    """Talabalar yig'malari va tavsiyalar guruh natijalarini bitta o'qishdan hisoblanadi."""
+    # NumPy faqat baholash vaqtida kerak, ishga tushishda yuklanmaydi
+    from myapp.analytics import load_group_analytics
+
+    analytics, latest_dates = load_group_analytics(group_id)
+    refresh_student_summaries(group_id, analytics, latest_dates)
+    refresh_recommendations(group_id, analytics)
+
+
+@transaction.atomic
+def refresh_group_summaries(group_id):
+    """
+    Guruh natijalari o'zgargandan so'ng (baholash, natija yoki imtihon tahriri/o'chirilishi) talabalar
+    yig'malarini, tavsiyalarni va grafik keshini yangilaydi.
+    """
+    refresh_group_analytics(group_id)
+    # Eski grafiklar versiya kaliti orqali ham eskiradi, bu yerda xotira bo'shatiladi
+    chart_cache.invalidate_group(group_id)
+
+
+@transaction.atomic
+def rebuild_all_summaries():
+    """Barcha yig'ma jadvallarni noldan qayta quradi."""
+    GroupStudentSummary.objects.all().delete()
+    Recommendation.objects.all().delete()
+
+    for group_id in Exam.objects.values_list('group_id', flat=True).distinct():
+        refresh_group_analytics(group_id)
+    chart_cache.clear()
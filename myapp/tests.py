@@ -1,3 +1,1248 @@
-from django.test import TestCase
+import base64
+import csv
+import json
+import re
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+from datetime import datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib import messages
+from django.contrib.messages.storage.session import SessionStorage
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from myapp.caching import namespace_version
+from myapp.charts import ChartCache, chart_cache
+from myapp.checks import check_shared_cache
+from myapp.debtors import group_debts, student_debts
+from myapp.grading import save_exam_scores
+from myapp.images import UPLOAD_DIR, InvalidImage, delete_unused_images, set_profile_image
+from myapp.jobs import enqueue
+from myapp.membership import set_group_members
+from myapp.middleware import profile_cache_key
+from myapp.models import (
+    CustomUser, Group, Profile, ProfileGroup, Video, Payments, Exam, ExamResult, Job, Recommendation,
+    GroupStudentSummary,
+)
+from myapp.pdf_cache import payments_digest
+from myapp.search import _sqlite_fts_available, search_profiles
+from myapp.summaries import rebuild_all_summaries
+from myapp.youtube import parse_youtube_id
+
+
+# URL nomi: (rol, metod, maksimal so'rovlar soni). Sessiya va auth so'rovlari ham hisobga kiradi.
+QUERY_BUDGETS = {
+    'login': ('anonymous', 'get', 0),
+    'dashboard': ('teacher', 'get', 2),
+    'group_list': ('teacher', 'get', 3),
+    'group_detail': ('teacher', 'get', 4),
+    'home': ('student', 'get', 9),
+    'home_dashboard': ('student', 'get', 9),
+    'group_profile': ('student', 'get', 6),
+    'profile': ('student', 'get', 4),
+    'change_password': ('student', 'get', 2),
+    'upload_video': ('teacher', 'get', 3),
+    'select_group': ('student', 'get', 7),
+    'student_list_table': ('teacher', 'get', 3),
+    'video_detail': ('student', 'get', 3),
+    'toggle_student_status': ('teacher', 'get', 8),
+    'student_list': ('teacher', 'get', 3),
+    'payment_detail': ('teacher', 'get', 4),
+    'download_payments_pdf': ('teacher', 'get', 9),
+    'student_payments': ('student', 'get', 6),
+    'job_status': ('teacher', 'get', 3),
+    'debtors_report': ('teacher', 'get', 4),
+    'export_exam_results': ('teacher', 'get', 3),
+    'export_payments': ('teacher', 'get', 3),
+    'create_exam': ('teacher', 'get', 3),
+    'teacher_exams': ('teacher', 'get', 3),
+    'student_exam_list': ('student', 'get', 6),
+    'exam_evaluation': ('teacher', 'get', 3),
+    'get_exams_by_group': ('teacher', 'get', 3),
+    'exam_results': ('teacher', 'get', 6),
+    'exam_results_json': ('teacher', 'post', 15),
+    'import_exam_scores': ('teacher', 'post', 17),
+    'exam_results_table': ('teacher', 'get', 5),
+    'all_exam_results': ('teacher', 'get', 3),
+    'exams_list': ('teacher', 'get', 7),
+    'recommendations_view': ('student', 'get', 12),
+    'perf_stats': ('staff', 'get', 2),
+}
+
+
+def _named_urls(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            # admin va boshqa ilovalar (namespace) tekshirilmaydi
+            if pattern.namespace:
+                continue
+            yield from _named_urls(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+
+
+def shared_cache_settings(location):
+    """Workerlar orasida umumiy kesh (productionda Redis) o'rniga fayl keshi."""
+    return override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+    })
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Har bir sahifa uchun SQL so'rovlar soni ma'lumot hajmiga bog'liq emasligini tekshiradi:
+    kichik va katta ma'lumotlar to'plamida so'rovlar soni bir xil va byudjetdan oshmasligi kerak.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('budget_teacher', password='parol12345', is_teacher=True)
+        cls.staff = CustomUser.objects.create_user('budget_staff', password='parol12345', is_staff=True)
+        cls.student = CustomUser.objects.create_user('budget_student', password='parol12345')
+        Profile.objects.create(user=cls.teacher, familiya='Adilov', ismi='Eldor')
+        cls.profile = Profile.objects.create(user=cls.student, familiya='Karimov', ismi='Aziz')
+        # Holati almashtiriladigan alohida talaba (asosiy talaba aktiv qolishi kerak)
+        cls.toggled = CustomUser.objects.create_user('budget_toggled', password='parol12345')
+        Profile.objects.create(user=cls.toggled, familiya='Rahimov', ismi='Jamshid')
+        cls.group = Group.objects.create(name='Budget')
+        cls.video = Video.objects.create(title='Kirish', youtube_link='https://youtu.be/abcdefghijk', is_general=True)
+        cls.job = Job.objects.create(kind='payments_pdf', subject='student:0', requested_by=cls.teacher)
+        cls._grow(2)
+
+    @classmethod
+    def _grow(cls, size):
+        """Asosiy guruh, talaba va o'qituvchiga bog'liq qatorlarni `size` martaga ko'paytiradi."""
+        start = Profile.objects.count()
+        users = [
+            CustomUser.objects.create_user(f'budget_{start + i}', password='parol12345')
+            for i in range(size)
+        ]
+        profiles = [Profile.objects.create(user=user, familiya=f'F{i}', ismi=f'I{i}') for i, user in enumerate(users)]
+        group_members = profiles + ([cls.profile] if not cls.group.students.filter(id=cls.profile.id).exists() else [])
+        cls.group.students.add(*group_members)
+
+        for i in range(size):
+            group = Group.objects.create(name=f'Budget {start + i}')
+            group.students.add(cls.profile)
+            exam = Exam.objects.create(
+                group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                exam_date=timezone.now() - timedelta(days=start + i), created_by=cls.teacher,
+            )
+            ExamResult.objects.bulk_create([
+                ExamResult(exam=exam, student=profile, score=50 + j % 50)
+                for j, profile in enumerate(cls.group.students.all())
+            ])
+            Payments.objects.create(names_ful=cls.profile, month='Yanvar', money_summ=Decimal('100'),
+                                    amount_paid=Decimal(i % 2 * 100), payment_date=timezone.now().date())
+            video = Video.objects.create(title=f'Dars {start + i}', youtube_link=f'https://youtu.be/v{start + i}')
+            video.groups.add(cls.group)
+        rebuild_all_summaries()
+        cls.exam = Exam.objects.filter(group=cls.group).latest('exam_date')
+
+    def _request(self, name, role, method):
+        kwargs = {
+            'group_detail': {'group_id': self.group.id},
+            'video_detail': {'video_id': self.video.id},
+            'toggle_student_status': {'user_id': self.toggled.id},
+            'payment_detail': {'student_id': self.profile.id},
+            'download_payments_pdf': {'student_id': self.profile.id},
+            'job_status': {'job_id': self.job.id},
+            'exam_results': {'exam_id': self.exam.id, 'group_id': self.group.id},
+            'exam_results_json': {'exam_id': self.exam.id, 'group_id': self.group.id},
+            'import_exam_scores': {'exam_id': self.exam.id},
+            'exam_results_table': {'exam_id': self.exam.id},
+            'exams_list': {'exam_id': self.exam.id, 'group_id': self.group.id},
+        }.get(name, {})
+        params = {
+            'get_exams_by_group': {'group_id': self.group.id},
+            'select_group': {'group': self.group.id},
+            'recommendations_view': {'group_id': self.group.id},
+        }.get(name, {})
+
+        self.client.logout()
+        user = {'teacher': self.teacher, 'student': self.student, 'staff': self.staff}.get(role)
+        if user is not None:
+            self.client.force_login(user)
+        cache.clear()
+
+        url = reverse(name, kwargs=kwargs)
+        if name == 'import_exam_scores':
+            rows = ''.join(f'{profile.id},75\n' for profile in self.group.students.all())
+            data = {'file': SimpleUploadedFile('baholar.csv', f'id,ball\n{rows}'.encode())}
+        elif method == 'post':
+            scores = {profile.id: 75 for profile in self.group.students.all()}
+            body = json.dumps({'scores': scores})
+        with CaptureQueriesContext(connection) as queries:
+            if name == 'import_exam_scores':
+                response = self.client.post(url, data)
+            elif method == 'post':
+                response = self.client.post(url, body, content_type='application/json')
+            else:
+                response = self.client.get(url, params)
+            if response.streaming:
+                # Oqimli javobda so'rovlar kontent o'qilayotganda bajariladi
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f'{name}: {response.status_code}')
+        return len(queries)
+
+    def _measure(self):
+        return {name: self._request(name, role, method) for name, (role, method, _budget) in QUERY_BUDGETS.items()}
+
+    def test_every_url_has_budget(self):
+        names = set(_named_urls(get_resolver().url_patterns))
+        self.assertEqual(names - set(QUERY_BUDGETS), set())
+
+    def test_query_counts_do_not_grow_with_data(self):
+        small = self._measure()
+        self._grow(25)
+        call_command('generate_school_data', students=60, groups=6, exams_per_group=2, videos=8, teachers=2,
+                     prefix='bg', stdout=StringIO())
+        large = self._measure()
+
+        for name, (_role, _method, budget) in QUERY_BUDGETS.items():
+            with self.subTest(url=name):
+                self.assertEqual(small[name], large[name], f'{name}: {small[name]} -> {large[name]} so\'rov')
+                self.assertLessEqual(large[name], budget, f'{name}: {large[name]} > {budget}')
+
+
+class AsyncViewTests(TestCase):
+    """Async viewlar ASGI zanjiri (AsyncClient, async middleware) orqali to'g'ri ishlaydi."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('async_teacher', password='parol12345', is_teacher=True)
+        cls.staff = CustomUser.objects.create_user('async_staff', password='parol12345', is_teacher=True,
+                                                   is_staff=True)
+        cls.student = CustomUser.objects.create_user('async_student', password='parol12345')
+        profile = Profile.objects.create(user=cls.student, familiya='Karimov', ismi='Aziz')
+        cls.group = Group.objects.create(name='Async')
+        cls.group.students.add(profile)
+        cls.exam = Exam.objects.create(group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                       exam_date=timezone.now(), created_by=cls.teacher)
+        ExamResult.objects.create(exam=cls.exam, student=profile, score=87)
+        cls.video = Video.objects.create(title='Guruh darsi', youtube_link='https://youtu.be/abcdefghijk')
+        cls.video.groups.add(cls.group)
+
+    @override_settings(PERF_SAMPLE_RATE=1.0)
+    async def test_async_views(self):
+        await self.async_client.aforce_login(self.teacher)
+        response = await self.async_client.get(reverse('get_exams_by_group'), {'group_id': self.group.id})
+        self.assertEqual(response.json(), [
+            {'id': self.exam.id, 'exam_date': self.exam.exam_date.strftime('%Y-%m-%d %H:%M')},
+        ])
+        # Server-Timing faqat xodimlarga
+        self.assertNotIn('Server-Timing', response)
+
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('student_exam_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([exam.student_score for exam in response.context['grouped_exams']['Async']], [87])
+        self.assertContains(response, 'Karimov')
+
+        response = await self.async_client.get(reverse('select_group'), {'group': self.group.id})
+        self.assertEqual(response.context['selected_group'], self.group.id)
+        self.assertEqual([video.id for video in response.context['videos']], [self.video.id])
+
+        # O'qituvchi bo'lmagan foydalanuvchi login sahifasiga yo'naltiriladi
+        response = await self.async_client.get(reverse('get_exams_by_group'), {'group_id': self.group.id})
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(PERF_SAMPLE_RATE=1.0)
+    async def test_server_timing_for_staff(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(reverse('get_exams_by_group'), {'group_id': self.group.id})
+        # Async rejimda ham SQL so'rovlari o'lchanadi
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    @override_settings(PERF_SAMPLE_RATE=1.0)
+    def test_server_timing_hidden_from_others(self):
+        self.client.force_login(self.staff)
+        self.assertRegex(self.client.get(reverse('login'))['Server-Timing'], r'desc="\d+ queries"')
+        for user in (self.teacher, self.student, None):
+            with self.subTest(user=user):
+                if user is None:
+                    self.client.logout()
+                else:
+                    self.client.force_login(user)
+                self.assertNotIn('Server-Timing', self.client.get(reverse('login')))
+                with override_settings(DEBUG=True):
+                    self.assertIn('Server-Timing', self.client.get(reverse('login')))
+
+
+def _xlsx(rows):
+    """Minimal XLSX fayl: matnlar sharedStrings da, sonlar <v> da."""
+    strings = []
+    sheet_rows = []
+    for number, row in enumerate(rows, start=1):
+        cells = []
+        for column, value in enumerate(row):
+            ref = f'{chr(ord("A") + column)}{number}'
+            if isinstance(value, str):
+                strings.append(value)
+                cells.append(f'<c r="{ref}" t="s"><v>{len(strings) - 1}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        sheet_rows.append(f'<row r="{number}">{"".join(cells)}</row>')
+
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    rel_ns = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('xl/workbook.xml', f'<workbook {ns} {rel_ns}><sheets>'
+                                            f'<sheet name="Baholar" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        archive.writestr('xl/_rels/workbook.xml.rels',
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         '<Relationship Id="rId1" Target="worksheets/baholar.xml"/></Relationships>')
+        archive.writestr('xl/sharedStrings.xml',
+                         f'<sst {ns}>{"".join(f"<si><t>{value}</t></si>" for value in strings)}</sst>')
+        archive.writestr('xl/worksheets/baholar.xml', f'<worksheet {ns}><sheetData>{"".join(sheet_rows)}'
+                                                      f'</sheetData></worksheet>')
+    return buffer.getvalue()
+
+
+class ProfileImageTests(TestCase):
+    """Profil rasmi: o'lchamlar bo'yicha variantlar, mazmun xeshidan nom va bir xil rasmni bir marta saqlash."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profiles = []
+        for i in range(2):
+            user = CustomUser.objects.create_user(f'image_student_{i}', password='parol12345')
+            cls.profiles.append(Profile.objects.create(user=user, familiya=f'F{i}', ismi=f'I{i}'))
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    @staticmethod
+    def _upload(size=(1600, 800), color=(200, 30, 30)):
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new('RGB', size, color).save(buffer, 'PNG')
+        return SimpleUploadedFile('rasm.png', buffer.getvalue(), content_type='image/png')
+
+    def _stored_files(self):
+        _dirs, files = default_storage.listdir(UPLOAD_DIR)
+        return sorted(files)
+
+    def test_variants_are_resized_and_named_by_content_hash(self):
+        from PIL import Image
+
+        profile = self.profiles[0]
+        set_profile_image(profile, self._upload())
+
+        expected_sizes = {'rasm': (1024, 512), 'rasm_medium': (320, 160), 'rasm_small': (96, 48)}
+        for field, size in expected_sizes.items():
+            with self.subTest(field=field), default_storage.open(getattr(profile, field).name) as stored:
+                self.assertEqual(Image.open(stored).size, size)
+
+        name_re = r'^users_img/(?P<stem>[0-9a-f]{32})(?P<suffix>_medium|_small)?\.(webp|jpg)$'
+        stems = {re.match(name_re, getattr(profile, field).name).group('stem') for field in expected_sizes}
+        self.assertEqual(len(stems), 1)
+        self.assertRegex(profile.rasm_medium.name, r'_medium\.(webp|jpg)$')
+
+    def test_identical_uploads_are_stored_once(self):
+        first, second = self.profiles
+        set_profile_image(first, self._upload())
+        first.save()
+        set_profile_image(second, self._upload())
+        second.save()
+
+        self.assertEqual(
+            (first.rasm.name, first.rasm_medium.name, first.rasm_small.name),
+            (second.rasm.name, second.rasm_medium.name, second.rasm_small.name),
+        )
+        self.assertEqual(len(self._stored_files()), 3)
+
+        # Birinchi profil rasmini almashtirsa, ikkinchisi ishlatayotgan fayllar o'chirilmaydi
+        stale = set_profile_image(first, self._upload(color=(30, 30, 200)))
+        first.save()
+        delete_unused_images(first, stale)
+        self.assertEqual(len(self._stored_files()), 6)
+        for field in ('rasm', 'rasm_medium', 'rasm_small'):
+            self.assertTrue(default_storage.exists(getattr(second, field).name))
+
+    def test_invalid_upload_is_rejected(self):
+        with self.assertRaises(InvalidImage):
+            set_profile_image(self.profiles[0], SimpleUploadedFile('rasm.png', b'rasm emas'))
+
+
+class ChartCacheTests(SimpleTestCase):
+    """Grafiklar LRU keshi: chiqarish tartibi, yozuvlar soni va hajm chegarasi, guruh bo'yicha bekor qilish."""
+
+    def test_evicts_least_recently_used(self):
+        charts = ChartCache(max_entries=2, max_bytes=1000)
+        charts.set((1, 1, 'v'), ('a', 'b'))
+        charts.set((1, 2, 'v'), ('c', 'd'))
+        # O'qilgan yozuv oxiriga o'tadi - eng eskisi (1, 2) chiqariladi
+        self.assertEqual(charts.get((1, 1, 'v')), ('a', 'b'))
+        charts.set((2, 1, 'v'), ('e', 'f'))
+        self.assertIsNone(charts.get((1, 2, 'v')))
+        self.assertEqual(list(charts._entries), [(1, 1, 'v'), (2, 1, 'v')])
+
+    def test_byte_limit(self):
+        charts = ChartCache(max_entries=10, max_bytes=10)
+        charts.set((1, 1, 'v'), ('aaa', 'bbb'))
+        charts.set((1, 2, 'v'), ('ccc', 'ddd'))
+        self.assertEqual((list(charts._entries), charts._size), ([(1, 2, 'v')], 6))
+        # Qayta yozilgan yozuv hajmi eski qiymat o'rniga hisoblanadi
+        charts.set((1, 2, 'v'), ('c', 'd'))
+        self.assertEqual(charts._size, 2)
+        # Chegaradan katta yozuv saqlanmaydi
+        charts.set((1, 3, 'v'), ('x' * 11, ''))
+        self.assertIsNone(charts.get((1, 3, 'v')))
+        self.assertEqual((len(charts._entries), charts._size), (0, 0))
+
+    def test_invalidate_group(self):
+        charts = ChartCache(max_entries=10, max_bytes=1000)
+        charts.set((1, 1, 'v'), ('a', 'b'))
+        charts.set((1, 2, 'v'), ('cc', 'dd'))
+        charts.set((2, 1, 'v'), ('e', 'f'))
+        charts.invalidate_group(1)
+        self.assertEqual((list(charts._entries), charts._size), ([(2, 1, 'v')], 2))
+
+
+class YoutubeLinkTests(SimpleTestCase):
+    """parse_youtube_id: YouTube havolalarining turli ko'rinishlari; yaroqsiz havola uchun bo'sh satr."""
+
+    VIDEO_ID = 'dQw4w9WgXcQ'
+    VALID_LINKS = [
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42s',
+        'https://m.youtube.com/watch?v=dQw4w9WgXcQ&list=PLx0sYbCqOb8TBPRdmBHs5Iftvv9TPboYG',
+        'http://youtu.be/dQw4w9WgXcQ',
+        'https://youtu.be/dQw4w9WgXcQ?si=Ab12Cd34&t=10',
+        'https://www.youtube.com/embed/dQw4w9WgXcQ?autoplay=1',
+        'https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ',
+        'https://youtube.com/shorts/dQw4w9WgXcQ?feature=share',
+        'https://www.youtube.com/live/dQw4w9WgXcQ',
+        '  https://YOUTU.BE/dQw4w9WgXcQ  ',
+    ]
+    INVALID_LINKS = [
+        None,
+        '',
+        "havola emas",
+        'https://example.com/watch?v=dQw4w9WgXcQ',
+        'https://notyoutube.com/watch?v=dQw4w9WgXcQ',
+        'https://youtu.be/',
+        'https://www.youtube.com/watch?v=bad id!',
+        'https://www.youtube.com/channel/UCuAXFkgsw1L7xaCfnd5JJOw',
+        'javascript:alert(1)',
+    ]
+
+    def test_valid_links(self):
+        for link in self.VALID_LINKS:
+            with self.subTest(link=link):
+                self.assertEqual(parse_youtube_id(link), self.VIDEO_ID)
+
+    def test_invalid_links_return_empty_id(self):
+        for link in self.INVALID_LINKS:
+            with self.subTest(link=link):
+                self.assertEqual(parse_youtube_id(link), '')
+
+
+class SearchTests(TestCase):
+    """Ism-familiya qidiruvi: istalgan qismdan moslik, ikkala tartib, tutuq belgisi va saralash."""
+
+    @classmethod
+    def setUpTestData(cls):
+        names = [('Karimov', 'Aziz'), ('Karimova', 'Aziza'), ("G'aniyev", 'Bekzod'), ('G‘ulomov', 'Jamshid'),
+                 ('Rahimov', 'Dilshod'), ('Azizov', 'Bekzod')]
+        for i, (familiya, ismi) in enumerate(names):
+            Profile.objects.create(user=CustomUser.objects.create_user(f'search_{i}', password='parol12345'),
+                                   familiya=familiya, ismi=ismi)
+
+    def _search(self, query):
+        return [(p.familiya, p.ismi) for p in search_profiles(Profile.objects.all(), query)]
+
+    def _backends(self):
+        # SQLite da FTS5 (trigram) va indekssiz icontains yo'llari bir xil natija berishi kerak
+        available = _sqlite_fts_available(connection)
+        self.addCleanup(setattr, connection, '_profile_fts_available', available)
+        for fts in sorted({available, False}):
+            connection._profile_fts_available = fts
+            yield fts
+
+    def test_substring_match(self):
+        for fts in self._backends():
+            with self.subTest(fts=fts):
+                # So'z boshidan emas, o'rtasidan ham: "ov" va "rimo" - Karimov
+                self.assertEqual(self._search('ov'), [
+                    ('Azizov', 'Bekzod'), ('G‘ulomov', 'Jamshid'), ('Karimov', 'Aziz'), ('Karimova', 'Aziza'),
+                    ('Rahimov', 'Dilshod'),
+                ])
+                self.assertEqual(self._search('rimo'), [('Karimov', 'Aziz'), ('Karimova', 'Aziza')])
+                self.assertEqual(self._search('zek'), [])
+
+    def test_exact_match_ranks_first_in_either_order(self):
+        for fts in self._backends():
+            with self.subTest(fts=fts):
+                for query in ('Aziz Karimov', 'karimov aziz'):
+                    self.assertEqual(self._search(query), [('Karimov', 'Aziz'), ('Karimova', 'Aziza')])
+                self.assertEqual(self._search('aziza karimova'), [('Karimova', 'Aziza')])
+                # To'liq mos ism boshidan mos kelganlardan oldin (alifbo bo'yicha keyin bo'lsa ham)
+                self.assertEqual(self._search('aziz'),
+                                 [('Karimov', 'Aziz'), ('Azizov', 'Bekzod'), ('Karimova', 'Aziza')])
+
+    def test_apostrophe_variants(self):
+        for fts in self._backends():
+            with self.subTest(fts=fts):
+                for query in ("g'aniyev", 'g‘aniyev', 'Gʻaniyev'):
+                    results = search_profiles(Profile.objects.all(), query)
+                    self.assertEqual([(p.familiya, p.search_rank) for p in results], [("G'aniyev", 2)])
+                self.assertEqual(self._search("g'ulom"), [('G‘ulomov', 'Jamshid')])
+
+
+class GradeImportTests(TestCase):
+    """CSV/XLSX dan baholarni yuklash: guruh ro'yxati bilan moslash va xatolar hisoboti."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('import_teacher', password='parol12345', is_teacher=True)
+        cls.group = Group.objects.create(name='Import')
+        cls.students = []
+        for familiya, ismi in [("G'aniyev", 'Aziz'), ('Karimova', 'Dilnoza'), ('Rahimov', 'Jamshid')]:
+            user = CustomUser.objects.create_user(f'import_{ismi.lower()}', password='parol12345')
+            profile = Profile.objects.create(user=user, familiya=familiya, ismi=ismi)
+            cls.group.students.add(profile)
+            cls.students.append(profile)
+        cls.exam = Exam.objects.create(group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                       exam_date=timezone.now(), created_by=cls.teacher)
+
+    def setUp(self):
+        self.client.force_login(self.teacher)
+
+    def _import(self, name, content):
+        response = self.client.post(reverse('import_exam_scores', kwargs={'exam_id': self.exam.id}),
+                                    {'file': SimpleUploadedFile(name, content)}, follow=True)
+        self.assertRedirects(response, reverse('exam_results', kwargs={'exam_id': self.exam.id,
+                                                                       'group_id': self.group.id}))
+        return [str(message) for message in response.context['messages']]
+
+    def _scores(self):
+        return dict(ExamResult.objects.filter(exam=self.exam).values_list('student_id', 'score'))
+
+    def test_csv_by_name(self):
+        aziz, dilnoza, jamshid = self.students
+        ExamResult.objects.create(exam=self.exam, student=jamshid, score=10)
+        content = '\n'.join([
+            'Familiya;Ismi;Ball',
+            'g‘aniyev ; AZIZ;87',      # apostrof va katta-kichik harf farq qilmaydi
+            'Dilnoza;Karimova;91,0',    # ism va familiya almashgan
+            'Rahimov;Jamshid;120',      # oraliqdan tashqari
+            'Toshmatov;Bekzod;50',      # guruhda yo'q
+            '',
+        ]).encode('utf-8-sig')
+
+        messages = self._import('baholar.csv', content)
+
+        self.assertEqual(self._scores(), {aziz.id: 87, dilnoza.id: 91, jamshid.id: 10})
+        self.assertEqual(messages[0], '2 ta ball saqlandi.')
+        self.assertTrue(messages[1].startswith('4-qator: Ball 0 va 100'))
+        self.assertTrue(messages[2].startswith("5-qator: O'quvchi guruhda topilmadi"))
+
+    def test_xlsx_by_id(self):
+        aziz, dilnoza, jamshid = self.students
+        content = _xlsx([
+            ['ID', 'Ism familiya', 'Ball'],
+            [aziz.id, 'Aziz', 70],
+            [dilnoza.id, 'Dilnoza', 75.5],
+            [jamshid.id, 'Jamshid', 80],
+            [aziz.id, 'Aziz', 90],
+        ])
+
+        messages = self._import('baholar.xlsx', content)
+
+        self.assertEqual(self._scores(), {aziz.id: 70, jamshid.id: 80})
+        self.assertEqual(messages, [
+            '2 ta ball saqlandi.',
+            "3-qator: Ball butun son bo'lishi kerak: '75.5'.",
+            "5-qator: O'quvchi 2-qatorda allaqachon bor.",
+        ])
+
+    def test_json_rejects_fractions_and_booleans(self):
+        aziz, dilnoza, jamshid = self.students
+        url = reverse('exam_results_json', kwargs={'exam_id': self.exam.id, 'group_id': self.group.id})
+        body = {'scores': {aziz.id: 87.9, dilnoza.id: True, jamshid.id: 80.0}}
+
+        response = self.client.post(url, json.dumps(body), content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual({error['student_id'] for error in response.json()['errors']}, {aziz.id, dilnoza.id})
+        self.assertEqual(self._scores(), {})
+
+        body = {'scores': {jamshid.id: 80.0}}
+        response = self.client.post(url, json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._scores(), {jamshid.id: 80})
+
+    def test_exam_from_other_group_is_404(self):
+        other = Group.objects.create(name='Boshqa')
+        outsider = Profile.objects.create(user=CustomUser.objects.create_user('import_outsider', password='parol12345'),
+                                          familiya='Toshmatov', ismi='Bekzod')
+        other.students.add(outsider)
+        body = json.dumps({'scores': {outsider.id: 90}})
+
+        for name, data, content_type in (
+            ('exam_results_json', body, 'application/json'),
+            ('exam_results', {f'student_{outsider.id}': '90'}, None),
+        ):
+            with self.subTest(name=name):
+                url = reverse(name, kwargs={'exam_id': self.exam.id, 'group_id': other.id})
+                if content_type:
+                    response = self.client.post(url, data, content_type=content_type)
+                else:
+                    response = self.client.post(url, data)
+                self.assertEqual(response.status_code, 404)
+        self.assertEqual(self._scores(), {})
+
+    def test_invalid_file(self):
+        messages = self._import('baholar.xlsx', b'PK\x03\x04 buzilgan')
+        self.assertEqual(messages, ['Fayl yuklanmadi: XLSX fayl buzilgan.'])
+        self.assertEqual(self._scores(), {})
+
+
+class DebtorsTests(TestCase):
+    """Qarzdorlar hisoboti: talaba va guruh bo'yicha qarz, faqat musbat qarz (HAVING) va CSV eksport."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('debt_teacher', password='parol12345', is_teacher=True)
+        cls.alpha, cls.beta, cls.gamma = (Group.objects.create(name=name) for name in ('Alpha', 'Beta', 'Gamma'))
+        cls.karimov, cls.rahimov, cls.toshmatov, cls.nazarov = (
+            Profile.objects.create(user=CustomUser.objects.create_user(f'debt_{i}', password='parol12345'),
+                                   familiya=familiya, ismi=ismi)
+            for i, (familiya, ismi) in enumerate([('Karimov', 'Aziz'), ('Rahimov', 'Jamshid'),
+                                                  ('Toshmatov', 'Bekzod'), ('Nazarov', 'Olim')])
+        )
+        # Karimov ikki guruhda, Rahimov ortiqcha to'lagan, Nazarov guruhsiz
+        cls.alpha.students.add(cls.karimov, cls.rahimov)
+        cls.beta.students.add(cls.karimov, cls.toshmatov)
+        cls.gamma.students.add(cls.rahimov)
+        for profile, month, due, paid in [
+            (cls.karimov, 'Yanvar', 300, 100),
+            (cls.karimov, 'Fevral', 300, 300),
+            (cls.rahimov, 'Yanvar', 200, 250),
+            (cls.toshmatov, 'Yanvar', 500, 0),
+            (cls.nazarov, 'Fevral', 100, 0),
+        ]:
+            Payments.objects.create(names_ful=profile, month=month, money_summ=Decimal(due), amount_paid=Decimal(paid))
+
+    def test_student_debts(self):
+        rows = [(row['names_ful'], row['total_due'], row['total_paid'], row['debt']) for row in student_debts()]
+        self.assertEqual(rows, [
+            (self.toshmatov.id, 500, 0, 500),
+            (self.karimov.id, 600, 400, 200),
+            (self.nazarov.id, 100, 0, 100),
+        ])
+        # Ortiqcha to'lagan (qarz < 0) talaba hisobotda yo'q
+        self.assertEqual([(row['names_ful'], row['debt']) for row in student_debts('Yanvar')],
+                         [(self.toshmatov.id, 500), (self.karimov.id, 200)])
+
+    def test_group_debts(self):
+        # Karimov qarzi Alpha va Beta da hisoblanadi; Gamma (faqat Rahimov, -50) va guruhsiz Nazarov yo'q
+        rows = [(row['group_name'], row['total_due'], row['total_paid'], row['debt']) for row in group_debts()]
+        self.assertEqual(rows, [('Beta', 1100, 400, 700), ('Alpha', 800, 650, 150)])
+        self.assertEqual([(row['group_name'], row['debt']) for row in group_debts('Fevral')], [])
+
+    def test_csv_export(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('debtors_report'), {'format': 'csv', 'month': 'Yanvar'})
+
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="qarzdorlar_Yanvar.csv"')
+        content = response.content.decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        header, *rows = csv.reader(StringIO(content[1:]))
+        self.assertEqual(header, ['Familiya', 'Ism', "To'lanadigan summa", "To'langan summa", 'Qarz'])
+        # Summalar yozilishi bazaga bog'liq (500 yoki 500.00) - qiymatlari solishtiriladi
+        self.assertEqual([[familiya, ismi, *map(Decimal, sums)] for familiya, ismi, *sums in rows], [
+            ['Toshmatov', 'Bekzod', 500, 0, 500],
+            ['Karimov', 'Aziz', 300, 100, 200],
+        ])
+
+        # Noma'lum oy - barcha oylar
+        response = self.client.get(reverse('debtors_report'), {'format': 'csv', 'month': 'Yo‘q'})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="qarzdorlar_barcha_oylar.csv"')
+        self.assertEqual(len(list(csv.reader(StringIO(response.content.decode('utf-8-sig'))))), 4)
+
+
+class ExportTests(TestCase):
+    """Oqimli CSV eksportlar: filtrlar, WSGI va ASGI rejimlarida bir xil natija."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('export_teacher', password='parol12345', is_teacher=True)
+        cls.groups = [Group.objects.create(name='Export A'), Group.objects.create(name='Export B')]
+        cls.profiles = []
+        for i, group in enumerate(cls.groups):
+            user = CustomUser.objects.create_user(f'export_{i}', password='parol12345')
+            profile = Profile.objects.create(user=user, familiya=f'Familiya{i}', ismi=f'Ism{i}')
+            ProfileGroup.objects.create(profile=profile, group=group)
+            cls.profiles.append(profile)
+            for day in (1, 15):
+                exam = Exam.objects.create(group=group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                           exam_date=datetime(2025, 3, day, 10, 30), created_by=cls.teacher)
+                ExamResult.objects.create(exam=exam, student=profile, score=50 + day)
+            Payments.objects.create(names_ful=profile, month='Mart', money_summ=Decimal('300'),
+                                    amount_paid=Decimal('100'), payment_date=datetime(2025, 3, 5).date())
+            Payments.objects.create(names_ful=profile, month='Aprel', money_summ=Decimal('300'),
+                                    amount_paid=Decimal('300'), payment_date=datetime(2025, 4, 5).date())
+
+    def setUp(self):
+        self.client.force_login(self.teacher)
+
+    def _rows(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(content.splitlines()))
+
+    def test_exam_results_filters(self):
+        header, *rows = self._rows('export_exam_results', group=self.groups[1].id, date_from='2025-03-15',
+                                   date_to='2025-03-15')
+        self.assertEqual(header[:3], ['Imtihon ID', 'Imtihon sanasi', 'Guruh'])
+        self.assertEqual([row[1:] for row in rows], [[
+            '2025-03-15 10:30', 'Export B', 'Adilov Eldor', '100', str(self.profiles[1].id), 'Familiya1', 'Ism1', '65',
+        ]])
+        self.assertEqual(len(self._rows('export_exam_results')), 1 + 4)
+
+    def test_payments_filters(self):
+        _header, *rows = self._rows('export_payments', month='Mart', group=self.groups[0].id)
+        self.assertEqual([row[1:] for row in rows], [[
+            str(self.profiles[0].id), 'Familiya0', 'Ism0', 'Mart', '300.00', '100.00', '200.00', '2025-03-05',
+        ]])
+        self.assertEqual(len(self._rows('export_payments', date_to='2025-03-31')), 1 + 2)
+
+    def test_invalid_filter(self):
+        response = self.client.get(reverse('export_payments'), {'date_from': '05.03.2025'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_async_stream(self):
+        await self.async_client.aforce_login(self.teacher)
+        response = await self.async_client.get(reverse('export_payments'))
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8-sig')
+        self.assertEqual(len(content.splitlines()), 1 + 4)
+
+
+class MembershipTests(TestCase):
+    """Guruh a'zoligi: yagona ProfileGroup jadvali va to'plamlar farqi bilan sinxronlash."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='Membership')
+        cls.profiles = [
+            Profile.objects.create(user=CustomUser.objects.create_user(f'member_{i}', password='parol12345'),
+                                   familiya=f'F{i}', ismi=f'I{i}')
+            for i in range(6)
+        ]
+
+    def test_sync_uses_constant_queries(self):
+        ids = [profile.id for profile in self.profiles]
+        self.group.students.add(*self.profiles[:3])
+        version = namespace_version('groups')
+
+        # SELECT + DELETE + INSERT (+ savepoint) - a'zolar soniga bog'liq emas
+        with self.assertNumQueries(5):
+            added, removed = set_group_members(self.group, ids[2:])
+        self.assertEqual((added, removed), (set(ids[3:]), set(ids[:2])))
+        self.assertEqual(set(self.group.students.values_list('id', flat=True)), set(ids[2:]))
+        self.assertEqual(set(ProfileGroup.objects.filter(group=self.group).values_list('profile_id', flat=True)),
+                         set(ids[2:]))
+        self.assertGreater(namespace_version('groups'), version)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(set_group_members(self.group, ids[2:]), (set(), set()))
+
+    def test_admin_form_saves_members(self):
+        admin = CustomUser.objects.create_superuser('member_admin', password='parol12345')
+        self.client.force_login(admin)
+        self.group.students.add(self.profiles[0])
+        response = self.client.post(reverse('admin:myapp_group_change', args=[self.group.id]), {
+            'name': 'Membership', 'information': '', 'members': [self.profiles[1].id, self.profiles[2].id],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(self.group.students.values_list('id', flat=True)),
+                         {self.profiles[1].id, self.profiles[2].id})
+
+
+class GroupDirectoryTests(TestCase):
+    """Guruhlar ro'yxati keshi guruh yoki a'zolik o'zgarganda bekor qilinadi; productionda kesh umumiy bo'lishi shart."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('directory_teacher', password='parol12345', is_teacher=True)
+        cls.group = Group.objects.create(name='Directory')
+        cls.profiles = [
+            Profile.objects.create(user=CustomUser.objects.create_user(f'directory_{i}', password='parol12345'),
+                                   familiya=f'F{i}', ismi=f'I{i}')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.enterContext(shared_cache_settings(self.enterContext(tempfile.TemporaryDirectory())))
+        cache.clear()
+        self.client.force_login(self.teacher)
+
+    def _directory(self):
+        response = self.client.get(reverse('group_list'))
+        return {data['group'].name: data['student_count'] for data in response.context['group_data']}
+
+    def test_changes_invalidate_cached_directory(self):
+        self.assertEqual(self._directory(), {'Directory': 0})
+        # Ikkinchi so'rov keshdan: faqat foydalanuvchi so'rovi
+        with self.assertNumQueries(1):
+            self.client.get(reverse('group_list'))
+
+        set_group_members(self.group, [profile.id for profile in self.profiles])
+        self.assertEqual(self._directory(), {'Directory': 3})
+        Group.objects.create(name='Yangi')
+        self.assertEqual(self._directory(), {'Directory': 3, 'Yangi': 0})
+        self.group.students.remove(self.profiles[0])
+        self.assertEqual(self._directory(), {'Directory': 2, 'Yangi': 0})
+
+    def test_local_cache_fails_deploy_check(self):
+        with override_settings(DEBUG=False, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        }):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['myapp.E001'])
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class DashboardTests(TestCase):
+    """Talaba bosh sahifasi: bitta o'qish modeli, kesh va hodisalar bo'yicha bekor qilish."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('dash_teacher', password='parol12345', is_teacher=True)
+        cls.student = CustomUser.objects.create_user('dash_student', password='parol12345')
+        cls.profile = Profile.objects.create(user=cls.student, familiya='Karimov', ismi='Aziz')
+        cls.group = Group.objects.create(name='Dashboard')
+        cls.group.students.add(cls.profile)
+        cls.past = Exam.objects.create(group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                       exam_date=timezone.now() - timedelta(days=3), created_by=cls.teacher)
+        cls.future = Exam.objects.create(group=cls.group, question_count=10, max_score=100,
+                                         teacher_name='Adilov Eldor', exam_date=timezone.now() + timedelta(days=3),
+                                         created_by=cls.teacher)
+        Payments.objects.create(names_ful=cls.profile, month='Yanvar', money_summ=Decimal('300'),
+                                amount_paid=Decimal('100'), payment_date=timezone.now().date())
+        Video.objects.create(title='Kirish', youtube_link='https://youtu.be/abcdefghijk', is_general=True)
+
+    def setUp(self):
+        self.enterContext(shared_cache_settings(self.enterContext(tempfile.TemporaryDirectory())))
+        cache.clear()
+        self.client.force_login(self.student)
+
+    def test_json_and_cache_invalidation(self):
+        data = self.client.get(reverse('home_dashboard')).json()
+        self.assertEqual([group['name'] for group in data['groups']], ['Dashboard'])
+        self.assertEqual([exam['id'] for exam in data['upcoming_exams']], [self.future.id])
+        self.assertEqual([(exam['id'], exam['score']) for exam in data['recent_exams']], [(self.past.id, None)])
+        self.assertEqual(Decimal(data['balance']), Decimal('200'))
+        self.assertEqual([video['title'] for video in data['videos']], ['Kirish'])
+
+        # Keshdan: faqat foydalanuvchi so'rovi (sessiya ham keshda)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('home_dashboard'))
+
+        save_exam_scores(self.past, {self.profile.id: 87})
+        payment = Payments.objects.get(names_ful=self.profile)
+        payment.amount_paid = Decimal('300')
+        payment.save()
+        data = self.client.get(reverse('home_dashboard')).json()
+        self.assertEqual(data['recent_exams'][0]['score'], 87)
+        self.assertEqual(data['debts'], [])
+
+    def test_home_page(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Dashboard')
+        self.assertContains(response, 'Qarzdorlik: 200')
+
+
+class ConditionalPageTests(TestCase):
+    """ETag/Last-Modified: o'zgarmagan sahifa render qilinmaydi (304), o'zgarganda yangi ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('etag_teacher', password='parol12345', is_teacher=True)
+        cls.student = CustomUser.objects.create_user('etag_student', password='parol12345')
+        cls.profile = Profile.objects.create(user=cls.student, familiya='Karimov', ismi='Aziz')
+        cls.group = Group.objects.create(name='ETag')
+        cls.group.students.add(cls.profile)
+        cls.exam = Exam.objects.create(group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                       exam_date=timezone.now(), created_by=cls.teacher)
+        cls.payment = Payments.objects.create(names_ful=cls.profile, month='Yanvar', money_summ=Decimal('300'),
+                                              amount_paid=Decimal('100'), payment_date=timezone.now().date())
+        Video.objects.create(title='Kirish', youtube_link='https://youtu.be/abcdefghijk', is_general=True)
+
+    def setUp(self):
+        self.enterContext(shared_cache_settings(self.enterContext(tempfile.TemporaryDirectory())))
+        cache.clear()
+        self.client.force_login(self.student)
+
+    def _revalidate(self, name):
+        first = self.client.get(reverse(name))
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Last-Modified', first)
+        return first['ETag']
+
+    def test_unchanged_pages_return_304(self):
+        for name in ('student_exam_list', 'student_payments', 'select_group', 'group_profile'):
+            with self.subTest(name=name):
+                etag = self._revalidate(name)
+                # Foydalanuvchi so'rovi + bitta validator so'rovi
+                with self.assertNumQueries(2):
+                    response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_pending_messages_skip_304(self):
+        etag = self._revalidate('student_payments')
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        storage = SessionStorage(request)
+        storage.add(messages.SUCCESS, "To'lov saqlandi.")
+        storage.update(HttpResponse())
+        request.session.save()
+
+        response = self.client.get(reverse('student_payments'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([str(message) for message in response.context['messages']], ["To'lov saqlandi."])
+
+    def test_changes_produce_new_etag(self):
+        etag = self._revalidate('student_exam_list')
+        save_exam_scores(self.exam, {self.profile.id: 90})
+        self.assertEqual(self.client.get(reverse('student_exam_list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self._revalidate('student_payments')
+        self.payment.delete()
+        self.assertEqual(self.client.get(reverse('student_payments'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self._revalidate('select_group')
+        Video.objects.create(title='Guruh darsi', youtube_link='https://youtu.be/bcdefghijkl').groups.add(self.group)
+        self.assertEqual(self.client.get(reverse('select_group'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class JobQueueTests(TestCase):
+    """Fon vazifalari: navbatga qo'yish, run_jobs bilan bajarish, qayta urinish va holatni so'rash."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('job_teacher', password='parol12345', is_teacher=True)
+        cls.student = CustomUser.objects.create_user('job_student', password='parol12345')
+        cls.profile = Profile.objects.create(user=cls.student, familiya='Karimov', ismi='Aziz')
+        cls.group = Group.objects.create(name='Jobs')
+        cls.group.students.add(cls.profile)
+        # Tavsiya grafiklari uchun kamida ikkita natija kerak
+        for days, score in ((7, 60), (0, 80)):
+            exam = Exam.objects.create(group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                       exam_date=timezone.now() - timedelta(days=days), created_by=cls.teacher)
+            ExamResult.objects.create(exam=exam, student=cls.profile, score=score)
+        Payments.objects.create(names_ful=cls.profile, month='Yanvar', money_summ=Decimal('300'),
+                                amount_paid=Decimal('100'), payment_date=timezone.now().date())
+        rebuild_all_summaries()
+
+    def setUp(self):
+        cache.clear()
+
+    def _run_jobs(self):
+        call_command('run_jobs', once=True, workers=0, stdout=StringIO(), stderr=StringIO())
+
+    def test_enqueue_reuses_active_job(self):
+        first = enqueue('payments_pdf', 'student:1', {'student_id': 1}, version='a')
+        self.assertEqual(enqueue('payments_pdf', 'student:1', {'student_id': 1}, version='a'), first)
+        self.assertNotEqual(enqueue('payments_pdf', 'student:1', {'student_id': 1}, version='b'), first)
+
+    def test_pdf_is_built_in_background(self):
+        self.client.force_login(self.teacher)
+        url = reverse('download_payments_pdf', args=[self.profile.id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 202)
+        job = response.context['job']
+        self.assertEqual(self.client.get(reverse('job_status', args=[job.id])).json()['status'], Job.QUEUED)
+
+        self._run_jobs()
+        self.assertEqual(self.client.get(reverse('job_status', args=[job.id])).json()['status'], Job.DONE)
+        cache.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+        # Boshqa talaba vazifasi ko'rinmaydi
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(reverse('job_status', args=[job.id])).status_code, 404)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = enqueue('payments_pdf', 'student:0', {'student_id': 0}, max_attempts=2)
+        self._run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('DoesNotExist', job.error)
+
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        self._run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+        # Eski muvaffaqiyatsiz vazifalar worker tozalashida o'chiriladi
+        Job.objects.filter(id=job.id).update(finished_at=timezone.now() - timedelta(days=30))
+        self._run_jobs()
+        self.assertFalse(Job.objects.filter(id=job.id).exists())
+
+    def test_pdf_job_stores_digest_of_rendered_payments(self):
+        def digest():
+            return payments_digest(self.profile, list(Payments.objects.filter(names_ful=self.profile).order_by('id')))
+
+        old_digest = digest()
+        job = enqueue('payments_pdf', f'student:{self.profile.id}', {'student_id': self.profile.id},
+                      version=old_digest)
+        # To'lov navbatga qo'yilgandan keyin, vazifa bajarilishidan oldin o'zgardi
+        Payments.objects.create(names_ful=self.profile, month='Fevral', money_summ=Decimal('300'),
+                                amount_paid=Decimal('300'), payment_date=timezone.now().date())
+
+        self._run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.version, digest())
+        self.assertNotEqual(job.version, old_digest)
+
+    def test_recommendation_charts_are_served_after_job(self):
+        self.client.force_login(self.student)
+        url = reverse('recommendations_view')
+        response = self.client.get(url, {'group_id': self.group.id})
+        self.assertIsNotNone(response.context['charts_job'])
+        self.assertIsNone(response.context['chart_url'])
+
+        self._run_jobs()
+        response = self.client.get(url, {'group_id': self.group.id})
+        self.assertIsNone(response.context['charts_job'])
+        self.assertTrue(response.context['chart_url'])
+
+
+class RecommendationTests(TestCase):
+    """Baholashdan keyin guruhning barcha talabalari uchun tavsiyalar yoziladi, sahifa ularni o'qiydi."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('rec_teacher', password='parol12345', is_teacher=True)
+        cls.group = Group.objects.create(name='Tavsiya')
+        cls.students = []
+        for i in range(3):
+            user = CustomUser.objects.create_user(f'rec_student_{i}', password='parol12345')
+            cls.students.append(Profile.objects.create(user=user, familiya=f'F{i}', ismi=f'I{i}'))
+        cls.group.students.add(*cls.students)
+        cls.exams = [
+            Exam.objects.create(group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                exam_date=timezone.now() - timedelta(days=days), created_by=cls.teacher)
+            for days in (14, 7)
+        ]
+
+    def test_grading_writes_recommendations_for_whole_group(self):
+        first, second, third = self.students
+        save_exam_scores(self.exams[0], {first.id: 50, second.id: 80, third.id: 70})
+        # Bitta natija bilan tavsiya yozilmaydi
+        self.assertFalse(Recommendation.objects.exists())
+
+        save_exam_scores(self.exams[1], {first.id: 90, second.id: 60})
+        recommendations = {r.student_id: r for r in Recommendation.objects.filter(group=self.group)}
+        self.assertEqual(set(recommendations), {first.id, second.id})
+
+        # Guruh o'rtachasi: (50 + 80 + 70 + 90 + 60) / 5 = 70
+        up, down = recommendations[first.id], recommendations[second.id]
+        self.assertEqual((up.trend, up.previous_mean, up.group_mean, up.above_group_mean),
+                         (Recommendation.TREND_UP, 50.0, 70.0, True))
+        self.assertEqual((down.trend, down.previous_mean, down.above_group_mean),
+                         (Recommendation.TREND_DOWN, 80.0, False))
+
+        # Qayta baholashda qatorlar yangilanadi, ko'paymaydi
+        save_exam_scores(self.exams[1], {first.id: 40})
+        self.assertEqual(Recommendation.objects.filter(group=self.group).count(), 2)
+        self.assertEqual(Recommendation.objects.get(group=self.group, student=first).trend, Recommendation.TREND_DOWN)
+
+    def test_view_reads_stored_recommendation(self):
+        first, second, _third = self.students
+        save_exam_scores(self.exams[0], {first.id: 50, second.id: 80})
+        save_exam_scores(self.exams[1], {first.id: 90, second.id: 60})
+        Recommendation.objects.filter(student=first).update(suggestion='Saqlangan tavsiya')
+
+        self.client.force_login(first.user)
+        response = self.client.get(reverse('recommendations_view'), {'group_id': self.group.id})
+        self.assertEqual(response.context['suggestion'], 'Saqlangan tavsiya')
+
+        self.client.force_login(self.students[2].user)
+        response = self.client.get(reverse('recommendations_view'), {'group_id': self.group.id})
+        self.assertIn('yetarli emas', response.context['suggestion'])
+        self.assertIsNone(response.context['charts_job'])
+
+
+class SummarySignalTests(TestCase):
+    """Natija yoki imtihon baholash sahifasidan tashqarida (admin) o'zgarsa ham yig'malar yangilanadi."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('sig_teacher', password='parol12345', is_teacher=True)
+        cls.group = Group.objects.create(name='Signal')
+        cls.students = []
+        for i in range(2):
+            user = CustomUser.objects.create_user(f'sig_student_{i}', password='parol12345')
+            cls.students.append(Profile.objects.create(user=user, familiya=f'F{i}', ismi=f'I{i}'))
+        cls.group.students.add(*cls.students)
+        cls.exams = [
+            Exam.objects.create(group=cls.group, question_count=10, max_score=100, teacher_name='Adilov Eldor',
+                                exam_date=timezone.now() - timedelta(days=days), created_by=cls.teacher)
+            for days in (14, 7)
+        ]
+        first, second = cls.students
+        save_exam_scores(cls.exams[0], {first.id: 50, second.id: 80})
+        save_exam_scores(cls.exams[1], {first.id: 90, second.id: 60})
+
+    def test_grade_save_invalidates_group_charts(self):
+        other = Group.objects.create(name='Boshqa')
+        self.addCleanup(chart_cache.clear)
+        chart_cache.set((self.group.id, self.students[0].id, 'v1'), ('a', 'b'))
+        chart_cache.set((other.id, self.students[0].id, 'v1'), ('c', 'd'))
+
+        save_exam_scores(self.exams[1], {self.students[0].id: 70})
+
+        self.assertIsNone(chart_cache.get((self.group.id, self.students[0].id, 'v1')))
+        self.assertEqual(chart_cache.get((other.id, self.students[0].id, 'v1')), ('c', 'd'))
+
+    def test_result_edit_refreshes_summaries_after_commit(self):
+        first = self.students[0]
+        result = ExamResult.objects.get(exam=self.exams[1], student=first)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            result.score = 30
+            result.save()
+        self.assertEqual(len(callbacks), 1)
+
+        summary = GroupStudentSummary.objects.get(group=self.group, student=first)
+        self.assertEqual((summary.latest_score, summary.score_sum), (30, 80))
+        self.assertEqual(Recommendation.objects.get(group=self.group, student=first).trend, Recommendation.TREND_DOWN)
+
+    def test_exam_delete_refreshes_group_once(self):
+        # Har bir natija uchun signal keladi, lekin yangilanish bitta
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.exams[1].delete()
+        self.assertEqual(len(callbacks), 1)
+
+        summaries = {s.student_id: s for s in GroupStudentSummary.objects.filter(group=self.group)}
+        self.assertEqual([summaries[s.id].latest_score for s in self.students], [50, 80])
+        # Bitta natija qoldi - tavsiya uchun yetarli emas
+        self.assertFalse(Recommendation.objects.filter(group=self.group).exists())
+
+
+class CursorPaginationTests(TestCase):
+    """Kursorli sahifalash: oldinga va orqaga o'tishda qator tushib qolmaydi; buzilgan kursor - birinchi sahifa."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = CustomUser.objects.create_user('cursor_teacher', password='parol12345', is_teacher=True)
+        for i in range(5):
+            user = CustomUser.objects.create_user(f'cursor_{i}', password='parol12345')
+            Profile.objects.create(user=user, familiya=f'F{i}', ismi=f'I{i}')
+
+    def setUp(self):
+        self.client.force_login(self.teacher)
+
+    def _page(self, cursor=None, search=''):
+        params = {'page_size': 2, 'search': search}
+        if cursor is not None:
+            params['cursor'] = cursor
+        response = self.client.get(reverse('student_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page']
+
+    def _walk(self, search):
+        pages = [self._page(search=search)]
+        while pages[-1].has_next:
+            pages.append(self._page(pages[-1].next_cursor, search))
+        forward = [[profile.id for profile in page] for page in pages]
+
+        backward = [forward[-1]]
+        page = pages[-1]
+        while page.has_previous:
+            page = self._page(page.previous_cursor, search)
+            backward.append([profile.id for profile in page])
+        self.assertEqual(backward[::-1], forward)
+        return [profile_id for page_ids in forward for profile_id in page_ids]
+
+    def test_walk_pages_without_gaps_or_duplicates(self):
+        names = [('Karimov', 'Aziz'), ('Karimova', 'Aziza'), ('Azizov', 'Bekzod'), ('Rahimov', 'Aziz'),
+                 ('Toshmatov', 'Azizbek'), ('Nazizova', 'Olima')]
+        for i, (familiya, ismi) in enumerate(names):
+            Profile.objects.create(user=CustomUser.objects.create_user(f'cursor_walk_{i}', password='parol12345'),
+                                   familiya=familiya, ismi=ismi)
+        students = Profile.objects.filter(user__is_teacher=False, user__is_superuser=False)
+
+        for search in ('', 'aziz'):
+            with self.subTest(search=search):
+                expected = students.order_by('familiya', 'ismi', 'id')
+                if search:
+                    # Sahifa chegaralari turli rank (2, 1, 0) li qatorlar orasidan o'tadi
+                    expected = search_profiles(students, search)
+                    self.assertEqual(sorted({profile.search_rank for profile in expected}), [0, 1, 2])
+                self.assertEqual(self._walk(search), [profile.id for profile in expected])
+
+    def test_invalid_cursor_returns_first_page(self):
+        first = self._page()
+        self.assertTrue(first.has_next)
+        second = self._page(first.next_cursor)
+        self.assertEqual([p.familiya for p in second], ['F2', 'F3'])
+
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        for cursor in (
+            'buzilgan!', encode([{}, 1]), encode(['next', [{}, 'I0', 1]]), encode(['next', ['F0', 'I0']]),
+            encode(['next', ['F0', 'I0', True]]), encode(['next', ['F0', 'I0', 'abc']]), encode(['prev', 'F0']),
+        ):
+            with self.subTest(cursor=cursor):
+                page = self._page(cursor)
+                self.assertEqual([p.familiya for p in page], ['F0', 'F1'])
+                self.assertFalse(page.has_previous)
+
+
+class ProfileContextTests(TestCase):
+    """request.group_ids a'zolik o'zgarishini keyingi so'rovdayoq ko'radi (kesh umumiy bo'lsa ham, bo'lmasa ham)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = CustomUser.objects.create_user('context_student', password='parol12345')
+        cls.profile = Profile.objects.create(user=cls.student, familiya='Karimov', ismi='Aziz')
+        cls.group = Group.objects.create(name='Context')
+        cls.group.students.add(cls.profile)
+        Video.objects.create(title='Guruh darsi', youtube_link='https://youtu.be/abcdefghijk').groups.add(cls.group)
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def _check_membership_change(self):
+        cache.clear()
+        self.assertContains(self.client.get(reverse('select_group')), 'Guruh darsi')
+        set_group_members(self.group, [])
+        self.assertNotContains(self.client.get(reverse('select_group')), 'Guruh darsi')
+        set_group_members(self.group, [self.profile.id])
+        self.assertContains(self.client.get(reverse('select_group')), 'Guruh darsi')
+
+    def test_local_cache_is_not_used(self):
+        # LocMemCache: boshqa workerlar bekor qilishni ko'rmaydi - guruhlar har so'rovda o'qiladi
+        self._check_membership_change()
+        self.assertIsNone(cache.get(profile_cache_key(self.student.pk)))
+
+    def test_shared_cache_is_invalidated(self):
+        with shared_cache_settings(self.enterContext(tempfile.TemporaryDirectory())):
+            self._check_membership_change()
+            self.assertIsNotNone(cache.get(profile_cache_key(self.student.pk)))
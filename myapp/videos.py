@@ -0,0 +1,46 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from myapp.caching import cache_key
+from myapp.models import Video
+
+
+VIDEO_FEED_TIMEOUT = 60 * 60
+
+
+def visible_videos(group_ids):
+    """
+    Umumiy videolar va berilgan guruhlarga biriktirilgan videolar, yangilari birinchi.
+    Bitta so'rov: guruh sharti subquery orqali, shuning uchun JOIN/DISTINCT kerak emas.
+    """
+    group_videos = Video.groups.through.objects.filter(group_id__in=group_ids).values('video_id')
+    return Video.objects.filter(Q(is_general=True) | Q(id__in=group_videos)).order_by('-created_time', '-id')
+
+
+def _feed_key(group_ids):
+    # Bir xil guruhlardagi talabalar bitta kesh yozuvidan foydalanadi
+    digest = hashlib.md5(','.join(map(str, sorted(group_ids))).encode()).hexdigest()
+    return cache_key('videos', 'feed', digest)
+
+
+def video_feed(group_ids):
+    """Talaba ko'ra oladigan videolar ro'yxati (keshlangan)."""
+    key = _feed_key(group_ids)
+    videos = cache.get(key)
+    if videos is None:
+        videos = list(visible_videos(group_ids).only('id', 'title', 'youtube_id', 'is_general', 'created_time'))
+        cache.set(key, videos, VIDEO_FEED_TIMEOUT)
+    return videos
+
+
+async def avideo_feed(group_ids):
+    """video_feed ning async varianti (async viewlar uchun)."""
+    key = _feed_key(group_ids)
+    videos = await cache.aget(key)
+    if videos is None:
+        videos = [video async for video in
+                  visible_videos(group_ids).only('id', 'title', 'youtube_id', 'is_general', 'created_time')]
+        await cache.aset(key, videos, VIDEO_FEED_TIMEOUT)
+    return videos
@@ -1,18 +1,33 @@
-import os
-from io import BytesIO
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from django.db.models import Q
-from django.http import  HttpResponse
+import hashlib
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Q, Count, Max
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
-from myapp.models import Profile, Group, Video, Payments, ProfileGroup, CustomUser
-from myproject import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from myapp.models import Profile, Group, Video, Payments, ProfileGroup, CustomUser, Job
+from myapp.caching import cache_key, namespace_version
+from myapp.conditional import conditional_page
+from myapp.dashboard import student_dashboard
+from myapp.images import InvalidImage, set_profile_image, delete_unused_images
+from myapp.pagination import paginate
+from myapp.jobs import enqueue, finished_job
+from myapp.pdf_cache import payments_digest, cached_payments_pdf, store_payments_pdf
+from myapp.perf import perf_stats
+from myapp.search import search_profiles
+from myapp.videos import avideo_feed, visible_videos
+
+
+GROUP_DIRECTORY_TIMEOUT = 60 * 60
+
+# Talabalar ro'yxatlari uchun barqaror tartib (kursorli sahifalash shu tartibga tayanadi)
+STUDENT_ORDERING = ('familiya', 'ismi', 'id')
 
 
 def login_view(request):
@@ -33,29 +48,30 @@ def logout_view(request):
 
 @login_required
 def profile_view(request):
-    profile, created = Profile.objects.get_or_create(user=request.user)
-    groups = Group.objects.filter(students=profile)
+    profile = request.profile or Profile.objects.get_or_create(user=request.user)[0]
+    groups = Group.objects.filter(id__in=request.group_ids)
 
     if request.method == 'POST':  # Faqat profil ma'lumotlarini yangilash
         profile.familiya = request.POST.get('familiya', '').strip()
         profile.ismi = request.POST.get('ismi', '').strip()
         profile.telefon = request.POST.get('telefon', '').strip()
 
-        if request.FILES.get('rasm'):
-            if profile.rasm:
-                old_rasm_path = os.path.join(settings.MEDIA_ROOT, str(profile.rasm))
-                if os.path.exists(old_rasm_path):
-                    try:
-                        os.remove(old_rasm_path)
-                    except Exception as e:
-                        messages.warning(request, f"Eski rasm o‘chirilmadi: {e}")
-            profile.rasm = request.FILES.get('rasm')
-
         if not profile.familiya or not profile.ismi:
             messages.error(request, "Ism va familiya maydonlari to‘ldirilishi shart!")
-        else:
-            profile.save()
-            messages.success(request, "Profil muvaffaqiyatli yangilandi!")
+            return redirect('profile')
+
+        stale_images = set()
+        if request.FILES.get('rasm'):
+            # Rasm bir marta shu yerda kichraytiriladi va barcha o'lchamlari saqlanadi
+            try:
+                stale_images = set_profile_image(profile, request.FILES['rasm'])
+            except InvalidImage:
+                messages.error(request, "Rasm fayli o‘qilmadi. JPG, PNG yoki WebP rasm yuklang.")
+                return redirect('profile')
+
+        profile.save()
+        delete_unused_images(profile, stale_images)
+        messages.success(request, "Profil muvaffaqiyatli yangilandi!")
 
         return redirect('profile')
     return render(request, 'profile.html', {'profile': profile, 'groups': groups})
@@ -65,6 +81,12 @@ def is_teacher(user):
     return user.is_authenticated and (user.is_superuser or user.is_teacher)
 
 
+@staff_member_required
+def perf_stats_view(request):
+    # Har bir URL nomi bo'yicha so'rovlar soni, SQL, view va render vaqtlari (p50/p95/p99)
+    return JsonResponse(perf_stats.collect())
+
+
 @user_passes_test(is_teacher)
 def teacher_home(request):
     user = request.user
@@ -99,17 +121,22 @@ def change_password(request):
 @user_passes_test(is_teacher)
 def group_list_view(request):
     query = request.GET.get('q', '')
-    groups = Group.objects.filter(
-        Q(name__icontains=query) | Q(information__icontains=query)) if query else Group.objects.all()
-
-    group_data = [
-        {'group': group, 'student_count': group.students.filter(
-            user__is_active=True,
-            user__is_staff=False,
-            user__is_superuser=False
-        ).count()}
-        for group in groups
-    ]
+
+    key = cache_key('groups', 'directory', hashlib.md5(query.encode()).hexdigest())
+    group_data = cache.get(key)
+    if group_data is None:
+        groups = Group.objects.filter(
+            Q(name__icontains=query) | Q(information__icontains=query)) if query else Group.objects.all()
+
+        # Aktiv o'quvchilar soni bitta so'rovda hisoblanadi
+        groups = groups.annotate(student_count=Count('students', filter=Q(
+            students__user__is_active=True,
+            students__user__is_staff=False,
+            students__user__is_superuser=False
+        )))
+
+        group_data = [{'group': group, 'student_count': group.student_count} for group in groups]
+        cache.set(key, group_data, GROUP_DIRECTORY_TIMEOUT)
 
     return render(request, 'group_list.html', {'group_data': group_data})
 
@@ -120,23 +147,44 @@ def group_detail_view(request, group_id):
     profile_groups = ProfileGroup.objects.filter(group=group, profile__user__is_active=True).select_related('profile')
 
     search_query = request.GET.get('q', '')
+    ordering = ('profile__familiya', 'profile__ismi', 'id')
     if search_query:
-        profile_groups = profile_groups.filter(
-            Q(profile__ismi__icontains=search_query) | Q(profile__familiya__icontains=search_query)
-        )
-    return render(request, 'group_detail.html', {'group': group, 'profile_groups': profile_groups})
+        profile_groups = search_profiles(profile_groups, search_query, prefix='profile__')
+        ordering = ('-search_rank',) + ordering
+
+    page = paginate(request, profile_groups, ordering)
+    return render(request, 'group_detail.html', {'group': group, 'profile_groups': page, 'page': page})
 
 
 @login_required
 def home(request):
-    profile, created = Profile.objects.get_or_create(user=request.user)
-    return render(request, 'home.html', {'profile': profile})
+    profile = request.profile or Profile.objects.get_or_create(user=request.user)[0]
+    return render(request, 'home.html', {
+        'profile': profile,
+        'dashboard': student_dashboard(profile, request.group_ids),
+    })
+
+
+@login_required
+def home_dashboard(request):
+    # Bosh sahifa ma'lumotlari JSON ko'rinishida (mobil ilova va sahifani yangilash uchun)
+    profile = request.profile
+    if profile is None:
+        return JsonResponse({'error': "Profil topilmadi."}, status=404)
+    return JsonResponse(student_dashboard(profile, request.group_ids))
+
+
+def _group_profile_state(request):
+    # A'zoliklar soni/vaqti; guruh nomi yoki ma'lumoti o'zgarsa 'groups' versiyasi oshadi
+    state = ProfileGroup.objects.filter(profile=request.profile).aggregate(count=Count('id'), updated=Max('added_time'))
+    return (state['count'], state['updated'], namespace_version('groups')), state['updated']
 
 
 @login_required
+@conditional_page(_group_profile_state)
 def group_profile(request):
-    profile = Profile.objects.get(user=request.user)
-    profile_groups = ProfileGroup.objects.filter(profile=profile)
+    profile = request.profile
+    profile_groups = ProfileGroup.objects.filter(profile=profile).select_related('group')
     return render(request, 'group_profile.html', {'profile': profile, 'profile_groups': profile_groups})
 
 
@@ -188,52 +236,46 @@ def upload_video(request):
     return render(request, 'upload_video.html', {'groups': groups})
 
 
-def extract_youtube_id(youtube_link):
-    """
-    YouTube havolasidan video ID ni ajratib olish.
-    """
-    import re
-
-    if 'youtu.be' in youtube_link:
-        return youtube_link.split('/')[-1].split('?')[0]
-
-    elif 'youtube.com' in youtube_link:
-        match = re.search(r'(?<=v=)[^&]+', youtube_link)
-        if match:
-            return match.group(0)
-        match = re.search(r'(?<=be/)[^&]+', youtube_link)
-        if match:
-            return match.group(0)
-
-    return None
+def _video_list_state(request):
+    group_ids = request.group_ids
+    selected_group = request.GET.get('group', '')
+    if selected_group.isdigit() and int(selected_group) in group_ids:
+        videos = Video.objects.filter(groups__id=int(selected_group))
+    else:
+        videos = visible_videos(group_ids)
+    state = videos.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return (sorted(group_ids), state['count'], state['updated'], namespace_version('groups')), state['updated']
 
 
 @login_required
-def video_list(request):
-    profile = Profile.objects.get(user=request.user)
-    profile_groups = ProfileGroup.objects.filter(profile__user=request.user)
-    groups = [pg.group for pg in profile_groups]
+@conditional_page(_video_list_state)
+async def video_list(request):
+    # Async view: ASGI (uvicorn) da DB va kesh kutilayotganda worker boshqa so'rovlarga xizmat qiladi
+    profile = await request.aprofile()
+    group_ids = await request.agroup_ids()
+    groups = [pg.group async for pg in ProfileGroup.objects.filter(profile=profile).select_related('group')]
 
     selected_group = request.GET.get('group', '')
 
-    if selected_group == 'all' or not selected_group:
-        videos = Video.objects.filter(is_general=True)
+    if selected_group.isdigit() and int(selected_group) in group_ids:
+        # Bitta guruh videolari (faqat talaba a'zo bo'lgan guruhlar)
+        selected_group = int(selected_group)
+        videos = Video.objects.filter(groups__id=selected_group).order_by('-created_time', '-id')
+        videos = [video async for video in videos]
     else:
-        videos = Video.objects.filter(groups__id=selected_group)
+        # Umumiy videolar va talabaning barcha guruhlari videolari
+        selected_group = ''
+        videos = await avideo_feed(group_ids)
 
-    videos = videos.distinct()
-
-    for video in videos:
-        video.youtube_id = extract_youtube_id(video.youtube_link)
-
-    return render(request, 'select_group.html', {'videos': videos, 'groups': groups, 'profile': profile})
+    # Shablon render qilish sinxron (kontekst protsessorlari sessiyaga murojaat qiladi)
+    return await sync_to_async(render)(request, 'select_group.html', {
+        'videos': videos, 'groups': groups, 'profile': profile, 'selected_group': selected_group,
+    })
 
 
 @login_required
 def video_detail(request, video_id):
     video = get_object_or_404(Video, id=video_id)
-    video.youtube_id = extract_youtube_id(video.youtube_link)
-
     return render(request, 'video_detail.html', {'video': video})
 
 
@@ -243,23 +285,27 @@ def student_list(request):
 
     students = Profile.objects.filter(user__is_teacher=False, user__is_superuser=False)
 
+    ordering = STUDENT_ORDERING
     if search_query:
-        students = students.filter(
-            familiya__icontains=search_query
-        ) | students.filter(
-            ismi__icontains=search_query
-        )
-    return render(request, 'student_list.html', {'students': students, 'search_query': search_query})
+        students = search_profiles(students, search_query)
+        ordering = ('-search_rank',) + ordering
+
+    page = paginate(request, students, ordering)
+    return render(request, 'student_list.html', {'students': page, 'page': page, 'search_query': search_query})
 
 
 @user_passes_test(is_teacher)
 def student_list_table(request):
     search_query = request.GET.get('search', '')
-    students = Profile.objects.filter(user__is_teacher=False, user__is_superuser=False)
+    students = Profile.objects.filter(user__is_teacher=False, user__is_superuser=False).select_related('user')
 
+    ordering = STUDENT_ORDERING
     if search_query:
-        students = students.filter(familiya__icontains=search_query) | students.filter(ismi__icontains=search_query)
-    return render(request, 'student_list_table.html', {'students': students, 'search_query': search_query})
+        students = search_profiles(students, search_query)
+        ordering = ('-search_rank',) + ordering
+
+    page = paginate(request, students, ordering)
+    return render(request, 'student_list_table.html', {'students': page, 'page': page, 'search_query': search_query})
 
 
 @user_passes_test(is_teacher)
@@ -316,69 +362,69 @@ def payment_detail(request, student_id):
 def download_payments_pdf(request, student_id):
     # Talabani va uning to'lovlarini olish
     student = get_object_or_404(Profile, id=student_id)
-    payments = Payments.objects.filter(names_ful=student)
+    payments = list(Payments.objects.filter(names_ful=student).order_by('id'))
 
     # To'lovlar bo'sh bo'lsa, xabar qaytarish
-    if not payments.exists():
+    if not payments:
         return HttpResponse("To'lovlar ma\'lumotlari topilmadi.", content_type='text/plain')
 
-    # PDF faylni yaratish uchun bufer
-    buffer = BytesIO()
-    pdf = SimpleDocTemplate(buffer, pagesize=letter)
-
-    # Sarlavha matni
-    styles = getSampleStyleSheet()
-    title = f"{student.ismi} {student.familiya} - To\'lov Ro'yxati"
-    title_paragraph = Paragraph(title, styles['Title'])
-
-    # Jadval uchun sarlavha va ma'lumotlar
-    data = [
-        ["No", "Oy", "To\'lanadigan summa", "To\'langan summa", "To\'lov sanasi"]
-    ]
-
-    for idx, payment in enumerate(payments, start=1):
-        data.append([
-            idx,
-            payment.month,
-            f"{payment.money_summ} so\'m",
-            f"{payment.amount_paid} so\'m",
-            payment.payment_date.strftime('%d-%m-%Y') if payment.payment_date else "—",
-        ])
-
-    # Jadvalni yaratish
-    table = Table(data, colWidths=[30, 100, 150, 150, 150])
-
-    # Jadval stilini o'rnatish
-    style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),  # Sarlavha qatori foni
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),  # Sarlavha matni rangi
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),  # Markazlashgan matn
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),  # Sarlavha uchun shrift
-        ('FONTSIZE', (0, 0), (-1, 0), 12),  # Sarlavha shrift o'lchami
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),  # Sarlavha pastki bo'shligi
-        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),  # Jadval satrlari foni
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),  # Chegara chiziqlari
-    ])
-    table.setStyle(style)
-
-    # PDF elementlarini yig'ish
-    elements = [title_paragraph, table]
-
-    # PDFni yaratish
-    pdf.build(elements)
+    # To'lovlar o'zgarmagan bo'lsa, brauzerdagi nusxa ishlatiladi (304)
+    digest = payments_digest(student, payments)
+    etag = f'"{digest}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    # PDF keshdan yoki tayyor fon vazifasidan; bo'lmasa navbatga qo'yiladi (run_jobs yaratadi)
+    pdf = cached_payments_pdf(digest)
+    if pdf is None:
+        job = finished_job('payments_pdf', f'student:{student.id}', version=digest)
+        if job is None:
+            job = enqueue('payments_pdf', f'student:{student.id}', {'student_id': student.id},
+                          version=digest, requested_by=request.user)
+            return render(request, 'job_pending.html', {
+                'job': job, 'title': f"{student.ismi} {student.familiya} - to'lovlar PDF",
+                'back_url': reverse('payment_detail', args=[student.id]),
+            }, status=202)
+        pdf = bytes(job.result)
+        store_payments_pdf(student.id, digest, pdf)
 
     # PDFni HTTP javobga qaytarish
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
+    response = HttpResponse(pdf, content_type='application/pdf')
     filename = f"{student.ismi}_{student.familiya}_tolovlar.pdf"
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Content-Length'] = len(pdf)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
     return response
 
 
 @login_required
+def job_status(request, job_id):
+    """Fon vazifasi holati (sahifalar natija tayyor bo'lguncha so'rab turadi)."""
+    job = get_object_or_404(Job.objects.only('id', 'kind', 'status', 'attempts', 'max_attempts', 'requested_by_id'),
+                            id=job_id)
+    if job.requested_by_id != request.user.id and not is_teacher(request.user):
+        return JsonResponse({'error': "Vazifa topilmadi."}, status=404)
+    return JsonResponse({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+    })
+
+
+def _student_payments_state(request):
+    state = Payments.objects.filter(names_ful=request.profile).aggregate(count=Count('id'), updated=Max('updated_at'))
+    return (state['count'], state['updated']), state['updated']
+
+
+@login_required
+@conditional_page(_student_payments_state)
 def student_payments(request):
     # Talaba va uning to‘lov ma'lumotlarini olish
-    student = Profile.objects.get(user=request.user)
+    student = request.profile
     payments = Payments.objects.filter(names_ful=student)
 
     return render(request, 'student_payments.html', {
@@ -0,0 +1,29 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+PATH_PREFIXES = ('embed', 'shorts', 'live', 'v')
+
+
+def parse_youtube_id(link):
+    """
+    YouTube havolasidan video ID ni ajratib oladi (youtu.be/ID, watch?v=ID, /embed/ID, /shorts/ID, ...).
+    ID topilmasa bo'sh satr qaytaradi.
+    """
+    if not link:
+        return ''
+    parsed = urlparse(link.strip())
+    host = (parsed.hostname or '').lower()
+    parts = [part for part in parsed.path.split('/') if part]
+
+    candidate = ''
+    if host == 'youtu.be' or host.endswith('.youtu.be'):
+        candidate = parts[0] if parts else ''
+    elif host == 'youtube.com' or host.endswith('.youtube.com') or host == 'youtube-nocookie.com' \
+            or host.endswith('.youtube-nocookie.com'):
+        candidate = parse_qs(parsed.query).get('v', [''])[0]
+        if not candidate and len(parts) >= 2 and parts[0] in PATH_PREFIXES:
+            candidate = parts[1]
+
+    return candidate if VIDEO_ID_RE.match(candidate) else ''
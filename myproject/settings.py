@@ -46,11 +46,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise Middleware
+    'myapp.middleware.StaticFilesMiddleware',  # WhiteNoise (sync va async rejimda)
+    'myapp.middleware.PerformanceMiddleware',  # Server-Timing va so'rovlar statistikasi
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'myapp.middleware.ProfileMiddleware',  # request.profile va request.group_ids (keshlangan)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,7 +63,7 @@ ROOT_URLCONF = 'myproject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'myapp.perf.TimedDjangoTemplates',  # DjangoTemplates + render vaqtini o'lchash
         'DIRS': [str(BASE_DIR) + '/templates', str(BASE_DIR) + '/static'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -131,14 +133,57 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [os.path.join(BASE_DIR / 'myapp/static'),]
 
+# collectstatic fayl nomlariga kontent xeshini qo'shadi (styles.3f2a9c.css) va gzip/brotli nusxalarini yaratadi.
+# WhiteNoise xeshlangan fayllarni "Cache-Control: max-age=315360000, immutable" bilan beradi.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'myapp.CustomUser'
 LOGIN_URL = 'login'
 
+# Kesh: REDIS_URL berilsa barcha workerlar uchun umumiy Redis, aks holda jarayon ichidagi xotira.
+# Productionda umumiy kesh shart: guruhlar ro'yxati, bosh sahifa, video lentasi va request.group_ids keshlari
+# bump_namespace bilan bekor qilinadi, jarayon ichidagi keshda esa bu faqat bitta workerga yetadi.
+# DEBUG=False va REDIS_URL siz `manage.py check --deploy` (va gunicorn ishga tushishi) myapp.E001 bilan to'xtaydi.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Sessiyalar: sukut bo'yicha cached_db (keshdan o'qiladi, DB ga faqat yoziladi).
+# SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies bilan DB umuman ishlatilmaydi.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
 MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 
+
+# Unumdorlik o'lchovi: so'rovlarning qancha qismi o'lchanadi (0 - o'chirilgan, 1 - hammasi)
+PERF_SAMPLE_RATE = float(os.getenv('PERF_SAMPLE_RATE', '0.01'))
+PERF_WINDOW = 500  # har bir URL uchun saqlanadigan oxirgi namunalar soni
+
+# Kursorli sahifalash: sukut bo'yicha va eng katta sahifa hajmi
+PAGINATION_PAGE_SIZE = 50
+PAGINATION_MAX_PAGE_SIZE = 200
+
+# Tavsiyalar sahifasi grafiklari uchun jarayon ichidagi LRU kesh chegaralari
+CHART_CACHE_MAX_ENTRIES = 256
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024
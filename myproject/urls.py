@@ -19,16 +19,18 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
 from myapp import views, description
-from myapp import createxam
+from myapp import createxam, debtors, exports
 
 
 urlpatterns = [
+    path('admin/perf/', views.perf_stats_view, name='perf_stats'),
     path('admin/', admin.site.urls),
     path('', views.login_view, name='login'),
     path('dashboard/', views.teacher_home, name='dashboard'),
     path('groups/', views.group_list_view, name='group_list'),  # Guruhlar ro'yxati
     path('groups/<int:group_id>/', views.group_detail_view, name='group_detail'),
     path('home/', views.home, name='home'),
+    path('home/dashboard.json', views.home_dashboard, name='home_dashboard'),
     path('group_profile/', views.group_profile, name='group_profile'),
     path('profile/', views.profile_view, name='profile'),
     path('change-password/', views.change_password, name='change_password'),
@@ -40,13 +42,19 @@ urlpatterns = [
     path('student_list/', views.student_list, name='student_list'),
     path('payment_detail/<int:student_id>/', views.payment_detail, name='payment_detail'),
     path('download_payments_pdf/<int:student_id>/', views.download_payments_pdf, name='download_payments_pdf'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
     path('student_payments/', views.student_payments, name='student_payments'),
+    path('debtors/', debtors.debtors_report, name='debtors_report'),
+    path('exports/exam-results.csv', exports.export_exam_results, name='export_exam_results'),
+    path('exports/payments.csv', exports.export_payments, name='export_payments'),
     path('create_exam/', createxam.create_exam, name='create_exam'),
     path('teacher_exams/', createxam.teacher_exams, name='teacher_exams'),
     path('student_exam_list/', createxam.student_exam_list, name='student_exam_list'),
     path('exam_evaluation/', createxam.exam_evaluation, name='exam_evaluation'),
     path('get-exams-by-group/', createxam.get_exams_by_group, name='get_exams_by_group'),
     path('exam-results/<int:exam_id>/<int:group_id>/', createxam.exam_results, name='exam_results'),
+    path('exam-results/<int:exam_id>/<int:group_id>/json/', createxam.exam_results_json, name='exam_results_json'),
+    path('exam-results/<int:exam_id>/import/', createxam.import_exam_scores, name='import_exam_scores'),
     path('exam-results-table/<int:exam_id>/', createxam.exam_results_table, name='exam_results_table'),
     path('all_exam_results/', createxam.all_exam_results, name='all_exam_results'),
     path('exams_list/<int:exam_id>/<int:group_id>/', createxam.exams_list, name='exams_list'),